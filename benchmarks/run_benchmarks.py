@@ -0,0 +1,318 @@
+"""Times the explorer's hot paths on a synthetic project.
+
+    python benchmarks/run_benchmarks.py --profile small --output results.json
+    python benchmarks/run_benchmarks.py --baseline results.json
+    python benchmarks/run_benchmarks.py --compare old.json new.json
+
+Every benchmark runs `--repeat` times after its setup and reports min, median and
+mean wall time. Comparisons flag a benchmark whose median grew by more than
+`--threshold` (and by more than the noise floor); the exit code is 1 if any did.
+Benchmarks needing PyQt5 or markdown2 are skipped when those are not installed.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, os.pardir, "src"))
+
+import project_cache
+from engine import Engine
+from large_file import LineIndex
+from synthetic_project import PROFILES, NEEDLE, MANIFEST_FILE, generate_project
+
+RESULTS_VERSION = 1
+# Median changes smaller than this are treated as noise, whatever the ratio
+NOISE_FLOOR = 0.005
+# The QApplication of the Qt benchmarks, created on first use
+_qt_app = None
+
+
+class Skip(Exception):
+    """Raised by a benchmark setup when a dependency is missing."""
+
+
+def load_qt():
+    """Imports the GUI module with an offscreen QApplication, or raises Skip."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt5.QtWidgets import QApplication
+        import Py_Project_Explorer as explorer
+    except ImportError as e:
+        raise Skip(f"PyQt5 unavailable ({e})")
+    global _qt_app
+    if QApplication.instance() is None:
+        _qt_app = QApplication([sys.argv[0]])
+    return explorer
+
+
+class Suite:
+    """The benchmarks, sharing one generated project and worker pool."""
+
+    def __init__(self, manifest, executor, repeat):
+        self.manifest = manifest
+        self.root = manifest['root']
+        self.executor = executor
+        self.repeat = repeat
+        self.scratch = tempfile.mkdtemp(prefix="pycentric-bench-")
+        self.results = {}
+
+    def close(self):
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+    def measure(self, name, run, setup=None, teardown=None):
+        """Times `run` once per repetition, calling `setup` and `teardown` untimed around it."""
+        times = []
+        try:
+            for _ in range(self.repeat):
+                state = setup() if setup else None
+                start = time.perf_counter()
+                run(state)
+                times.append(time.perf_counter() - start)
+                if teardown:
+                    teardown(state)
+        except Skip as e:
+            self.results[name] = {'skipped': str(e)}
+            print(f"  {name:<28} skipped: {e}")
+            return
+        self.results[name] = {'min': min(times), 'median': statistics.median(times),
+                              'mean': statistics.fmean(times), 'runs': times}
+        print(f"  {name:<28} median {statistics.median(times) * 1000:9.1f} ms   min {min(times) * 1000:9.1f} ms")
+
+    def clear_caches(self):
+        shutil.rmtree(project_cache.CACHE_ROOT, ignore_errors=True)
+
+    # --- Qt-free paths ---
+    def bench_search(self):
+        expected = self.manifest['needle_files']
+
+        def check(matches):
+            if len(matches) != expected:
+                raise AssertionError(f"search found {len(matches)} files, expected {expected}")
+
+        # What SearchWorker.run does: refresh the content index, then query it
+        def cold():
+            self.clear_caches()
+            return Engine(self.root)
+
+        self.measure("search.cold", lambda engine: check(engine.search(NEEDLE, self.executor)), cold)
+        warm = Engine(self.root)
+        warm.search(NEEDLE, self.executor)
+        self.measure("search.warm", lambda engine: check(engine.search(NEEDLE, self.executor)), lambda: warm)
+        # A new session: the index comes from the on-disk cache
+        self.measure("search.reopen", lambda engine: check(engine.search(NEEDLE, self.executor)),
+                     lambda: Engine(self.root))
+
+    def bench_archives(self):
+        engine = Engine(self.root)
+        zip_path = os.path.join(self.scratch, "project.zip")
+
+        def remove(path):
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            elif os.path.exists(path):
+                os.remove(path)
+
+        self.measure("zip_item", lambda _: engine.zip(self.root, zip_path), teardown=lambda _: remove(zip_path))
+        engine.zip(self.root, zip_path)
+        extract_dir = os.path.join(self.scratch, "extracted")
+        self.measure("unzip_file", lambda _: engine.unzip(zip_path, extract_dir),
+                     teardown=lambda _: remove(extract_dir))
+        remove(zip_path)
+
+    def bench_large_file(self):
+        def index(line_index):
+            while not line_index.index_more():
+                pass
+            line_index.read_lines(line_index.line_count() // 2, 200)
+            line_index.close()
+
+        self.measure("large_file.index", index, lambda: LineIndex(self.manifest['large_file']))
+
+    # --- Qt paths ---
+    def bench_load_file(self):
+        def setup():
+            explorer = load_qt()
+            return explorer, explorer.FileLoadWorker()
+
+        def load(state):
+            # The loader thread's read plus what on_file_loaded builds on the GUI thread
+            explorer, worker = state
+            results = []
+            worker.loaded.connect(lambda *args: results.append(args))
+            worker.load(1, self.manifest['big_module'])
+            content, _ = results[0][2]
+            document = explorer.QTextDocument()
+            document.setDocumentLayout(explorer.QPlainTextDocumentLayout(document))
+            explorer.PythonHighlighter(document)
+            document.setPlainText(content)
+
+        self.measure("load_file_content", load, setup)
+
+    def bench_highlighter(self):
+        def setup():
+            explorer = load_qt()
+            with open(self.manifest['big_module'], 'r', encoding='utf-8') as f:
+                content = f.read()
+            document = explorer.QTextDocument()
+            document.setDocumentLayout(explorer.QPlainTextDocumentLayout(document))
+            document.setPlainText(content)
+            explorer.PythonHighlighter.block_cache.clear()
+            return explorer, document
+
+        def highlight(state):
+            # The whole document at once, rather than in timer-driven chunks
+            explorer, document = state
+            highlighter = explorer.PythonHighlighter(document)
+            highlighter.highlight_limit = document.blockCount()
+            highlighter.rehighlight()
+
+        self.measure("highlighter.full_document", highlight, setup)
+
+    def bench_markdown(self):
+        def setup():
+            explorer = load_qt()
+            try:
+                import markdown2  # noqa: F401
+            except ImportError as e:
+                raise Skip(f"markdown2 unavailable ({e})")
+            with open(self.manifest['big_markdown'], 'r', encoding='utf-8') as f:
+                text = f.read()
+            worker = explorer.MarkdownRenderWorker()
+            sections = []
+            worker.rendered.connect(lambda request_id, key, result: sections.append(result))
+            return worker, text, sections
+
+        def render(state):
+            worker, text, sections = state
+            worker.latest_request = 1
+            worker.render(1, "bench", text)
+            if not sections:
+                raise AssertionError("preview produced no sections")
+
+        self.measure("markdown_preview", render, setup)
+
+    def run(self):
+        for bench in (self.bench_search, self.bench_archives, self.bench_large_file,
+                      self.bench_load_file, self.bench_highlighter, self.bench_markdown):
+            bench()
+        return self.results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(old, new, threshold):
+    """Prints median changes between two result files; returns the names that regressed."""
+    if old.get('shape') != new.get('shape'):
+        print("warning: the runs used different project shapes; timings are not comparable")
+    regressions = []
+    print(f"  {'benchmark':<28}{'old':>11}{'new':>11}{'change':>9}")
+    for name in sorted(set(old['results']) | set(new['results'])):
+        before = old['results'].get(name, {})
+        after = new['results'].get(name, {})
+        if 'median' not in before or 'median' not in after:
+            print(f"  {name:<28}{'':>11}{'':>11}   n/a")
+            continue
+        change = after['median'] / before['median'] - 1 if before['median'] else 0.0
+        regressed = change > threshold and after['median'] - before['median'] > NOISE_FLOOR
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:<28}{before['median'] * 1000:9.1f}ms{after['median'] * 1000:9.1f}ms"
+              f"{change:+8.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def reusable_manifest(root, shape):
+    """Returns the manifest of a project generated earlier with the same shape, or None."""
+    try:
+        with open(os.path.join(root, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if any(manifest.get(key) != value for key, value in shape.items()):
+        return None
+    manifest['root'] = root
+    return manifest
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != RESULTS_VERSION:
+        raise SystemExit(f"{path}: unsupported results version {data.get('version')}")
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--project", help="generate into (or reuse) this folder instead of a temporary one")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare this run against an earlier results file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="only compare two results files")
+    parser.add_argument("--threshold", type=float, default=0.10, help="median growth flagged as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        return 1 if compare(load_results(args.compare[0]), load_results(args.compare[1]), args.threshold) else 0
+
+    shape = dict(PROFILES[args.profile], seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="pycentric-bench-")
+    # Keep the user's real caches out of the measurements
+    project_cache.CACHE_ROOT = os.path.join(workdir, "cache")
+    root = os.path.abspath(args.project) if args.project else os.path.join(workdir, "project")
+    try:
+        manifest = reusable_manifest(root, shape)
+        if manifest is None:
+            if os.path.isdir(root) and os.listdir(root):
+                raise SystemExit(f"{root} is not an empty folder or a project generated with this shape")
+            print(f"Generating '{args.profile}' project in {root} ...")
+            manifest = generate_project(root, **shape)
+        print(f"Running benchmarks ({args.repeat} runs each):")
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4)) as executor:
+            suite = Suite(manifest, executor, args.repeat)
+            try:
+                results = suite.run()
+            finally:
+                suite.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    data = {
+        'version': RESULTS_VERSION,
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'profile': args.profile,
+        'shape': shape,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.baseline:
+        return 1 if compare(load_results(args.baseline), data, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import os
+import json
+import random
+import argparse
+
+# Project shapes used by the benchmark suite; any field can be overridden
+PROFILES = {
+    'small': dict(files=200, depth=3, file_kb=4, venv_files=1000, big_module_lines=5000, large_file_mb=16),
+    'medium': dict(files=2000, depth=5, file_kb=8, venv_files=10000, big_module_lines=20000, large_file_mb=64),
+    'large': dict(files=10000, depth=6, file_kb=16, venv_files=50000, big_module_lines=60000, large_file_mb=256),
+}
+
+# A word that only appears in a known fraction of files, so searches have real matches
+NEEDLE = "quasarflux"
+# Written inside the ignored logs/ folder so a generated tree can be reused
+MANIFEST_FILE = os.path.join("logs", "manifest.json")
+
+WORDS = ("data", "value", "result", "config", "index", "item", "path", "node", "cache", "state",
+         "buffer", "handler", "request", "token", "record", "entry", "stream", "worker", "batch", "event")
+
+
+def python_source(rng, target_bytes, with_needle=False):
+    """Returns plausible Python source of about `target_bytes`: classes, functions, docstrings."""
+    parts = ['"""Generated module for benchmarking."""\n', "import os\nimport sys\n\n"]
+    size = sum(map(len, parts))
+    counter = 0
+    while size < target_bytes:
+        counter += 1
+        name = f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{counter}"
+        if counter % 4 == 0:
+            chunk = (f"class {name.title().replace('_', '')}:\n"
+                     f'    """Holds the {rng.choice(WORDS)} of a {rng.choice(WORDS)}.\n\n'
+                     f"    Spans several lines so the highlighter carries string state.\n"
+                     f'    """\n'
+                     f"    limit = {rng.randint(1, 10000)}\n\n"
+                     f"    def __init__(self, {rng.choice(WORDS)}=None):\n"
+                     f"        self.items = [x * {rng.random():.3f} for x in range(self.limit)]\n\n")
+        else:
+            arg = rng.choice(WORDS)
+            chunk = (f"def {name}({arg}, *args, **kwargs):\n"
+                     f"    # Combine the {arg} with {rng.choice(WORDS)} values\n"
+                     f"    total = 0\n"
+                     f"    for i, item in enumerate({arg}):\n"
+                     f"        if item and i % {rng.randint(2, 9)} == 0:\n"
+                     f"            total += len(str(item)) + {rng.randint(0, 999)}\n"
+                     f"    return {{'name': '{name}', 'total': total, 'ok': True}}\n\n\n")
+        parts.append(chunk)
+        size += len(chunk)
+    if with_needle:
+        parts.insert(2, f"{NEEDLE.upper()}_ENABLED = True  # marker\n\n")
+    return "".join(parts)
+
+
+def markdown_source(rng, sections):
+    parts = []
+    for number in range(1, sections + 1):
+        parts.append(f"## Section {number}: {rng.choice(WORDS)} {rng.choice(WORDS)}\n\n"
+                     f"Some *emphasis* and `inline code` about the {rng.choice(WORDS)}.\n\n"
+                     f"- first {rng.choice(WORDS)}\n- second {rng.choice(WORDS)}\n\n"
+                     f"| key | value |\n|-----|-------|\n| {rng.choice(WORDS)} | {rng.randint(0, 99)} |\n\n"
+                     f"```python\nprint({number})\n```\n\n")
+    return "# Generated document\n\n" + "".join(parts)
+
+
+def package_dirs(root, depth, rng, count):
+    """Returns about `count` folders under `root`, at least one of them `depth` levels deep."""
+    folders = [(root, 0)]
+    # One chain reaches the full depth; the rest hang off random shallower folders
+    for level in range(1, depth + 1):
+        folders.append((os.path.join(folders[-1][0], f"pkg_{level}"), level))
+    while len(folders) < count + 1:
+        parent, level = rng.choice([folder for folder in folders if folder[1] < depth])
+        folders.append((os.path.join(parent, f"pkg_{len(folders)}"), level + 1))
+    return [path for path, _ in folders]
+
+
+def generate_project(root, files=200, depth=3, file_kb=4, venv_files=1000, big_module_lines=5000,
+                     large_file_mb=16, seed=0):
+    """Writes a synthetic project under `root` and returns a manifest of what it holds.
+
+    Regular files are spread over nested packages (mostly .py, some .md, .txt and
+    .json), about one in ten contains NEEDLE, and a venv/ folder adds `venv_files`
+    modules the ignore rules should skip. A big module, a big Markdown document
+    and an ignored `large_file_mb` log file exercise the editor, preview and large-file paths.
+    """
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    folders = package_dirs(root, depth, rng, max(1, files // 20))
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+        if folder != root:
+            with open(os.path.join(folder, "__init__.py"), 'w', encoding='utf-8') as f:
+                f.write("")
+    needles = 0
+    total_bytes = 0
+    for number in range(files):
+        folder = rng.choice(folders)
+        kind = rng.random()
+        target = int(file_kb * 1024 * rng.uniform(0.5, 1.5))
+        with_needle = number % 10 == 0
+        needles += with_needle
+        if kind < 0.8:
+            path = os.path.join(folder, f"module_{number}.py")
+            content = python_source(rng, target, with_needle)
+        elif kind < 0.9:
+            path = os.path.join(folder, f"notes_{number}.md")
+            content = markdown_source(rng, max(1, target // 300)) + (f"\n{NEEDLE}\n" if with_needle else "")
+        elif kind < 0.95:
+            path = os.path.join(folder, f"readme_{number}.txt")
+            content = " ".join(rng.choice(WORDS) for _ in range(target // 6)) + (f" {NEEDLE}" if with_needle else "")
+        else:
+            path = os.path.join(folder, f"settings_{number}.json")
+            content = json.dumps({rng.choice(WORDS) + str(i): rng.randint(0, 10 ** 6) for i in range(target // 20)})
+            if with_needle:
+                content = content[:-1] + f', "{NEEDLE}": 1}}'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        total_bytes += len(content)
+
+    # Environment bloat: never searched, linted or archived when the ignore rules work
+    site_packages = os.path.join(root, "venv", "lib", "site-packages")
+    for number in range(venv_files):
+        folder = os.path.join(site_packages, f"dist_{number // 200}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"mod_{number}.py"), 'w', encoding='utf-8') as f:
+            f.write(python_source(rng, 1024, with_needle=True))
+
+    big_module = os.path.join(root, "big_module.py")
+    with open(big_module, 'w', encoding='utf-8') as f:
+        f.write(python_source(rng, big_module_lines * 32))
+    big_markdown = os.path.join(root, "big_document.md")
+    with open(big_markdown, 'w', encoding='utf-8') as f:
+        f.write(markdown_source(rng, max(10, big_module_lines // 50)))
+    # Logs are kept out of search and archives through the project's own ignore file
+    with open(os.path.join(root, ".pycentricignore"), 'w', encoding='utf-8') as f:
+        f.write("logs/\n")
+    os.makedirs(os.path.join(root, "logs"), exist_ok=True)
+    large_file = os.path.join(root, "logs", "large.log")
+    line = b"2024-01-01 12:00:00,000 INFO worker-3 processed batch of 512 records in 0.042s\n"
+    with open(large_file, 'wb') as f:
+        block = line * (1024 * 1024 // len(line))
+        for _ in range(large_file_mb):
+            f.write(block)
+    manifest = {
+        'root': root, 'files': files, 'depth': depth, 'file_kb': file_kb, 'venv_files': venv_files,
+        'big_module_lines': big_module_lines, 'large_file_mb': large_file_mb, 'seed': seed,
+        'needle': NEEDLE, 'needle_files': needles, 'content_bytes': total_bytes,
+        'big_module': big_module, 'big_markdown': big_markdown, 'large_file': large_file,
+    }
+    with open(os.path.join(root, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic project tree for benchmarking.")
+    parser.add_argument("root")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--files", type=int)
+    parser.add_argument("--depth", type=int)
+    parser.add_argument("--file-kb", type=int)
+    parser.add_argument("--venv-files", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    shape = dict(PROFILES[args.profile])
+    for key in ('files', 'depth', 'file_kb', 'venv_files'):
+        if getattr(args, key) is not None:
+            shape[key] = getattr(args, key)
+    print(json.dumps(generate_project(args.root, seed=args.seed, **shape), indent=2))
+
+
+if __name__ == '__main__':
+    main()
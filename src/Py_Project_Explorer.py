@@ -1,54 +1,106 @@
+import time
+# Start-up is timed from here for --startup-report
+STARTUP_BEGIN = time.perf_counter()
 import sys
 import os
 import shutil
-import zipfile
-import subprocess
-import venv
-import markdown2
 import datetime
+import threading
+import hashlib
+import json
+import re
+import tempfile
+import multiprocessing
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from engine import Engine, default_zip_path, default_extract_dir
+from large_file import LineIndex, LARGE_FILE_THRESHOLD
+from ignore_rules import shared_rules
+from run_stats import wrap_command, read_stats, describe
+from project_stats import format_bytes
+import perf
 
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTreeView, QFileSystemModel, QVBoxLayout,
-                             QWidget, QTextEdit, QPushButton, QHBoxLayout, QLabel, QFileDialog,
+                             QWidget, QPushButton, QHBoxLayout, QLabel, QFileDialog,
                              QMessageBox, QMenu, QAction, QInputDialog, QSplitter, QLineEdit,
-                             QPlainTextEdit)
-from PyQt5.QtCore import Qt, QDir, QUrl, QProcess, QObject, QThread, pyqtSignal, QTimer
-from PyQt5.QtGui import QFont, QSyntaxHighlighter, QTextCharFormat, QColor
-from PyQt5.QtWebEngineWidgets import QWebEngineView
+                             QPlainTextEdit, QScrollBar, QPlainTextDocumentLayout, QDockWidget,
+                             QTreeWidget, QTreeWidgetItem, QProgressDialog, QCheckBox, QShortcut,
+                             QDialog, QListWidget, QListWidgetItem, QTabWidget, QTabBar, QSpinBox,
+                             QAbstractItemView)
+from PyQt5.QtCore import (Qt, QDir, QUrl, QProcess, QObject, QThread, pyqtSignal, QTimer,
+                          QSortFilterProxyModel, QEvent)
+from PyQt5.QtGui import (QFont, QSyntaxHighlighter, QTextCharFormat, QColor, QTextDocument,
+                         QTextCursor, QKeySequence)
 
+# QtWebEngine, markdown2 and Pygments are imported on first use; they dominate
+# start-up time and most sessions never need them.
+STARTUP_IMPORTED = time.perf_counter()
 
 # --- Pygments for Syntax Highlighting ---
-from pygments import highlight
-from pygments.lexers import PythonLexer
-from pygments.formatter import Formatter
+_lexer_class = None
 
-# Helper class to bridge Pygments and QSyntaxHighlighter
-class QFormatter(Formatter):
-    def __init__(self):
-        super().__init__()
-        self.data = []
+def stateful_python_lexer():
+    """Returns a new stateful Python lexer, importing Pygments on first use.
 
-    def format(self, tokensource, outfile):
-        self.data = []
-        for ttype, value in tokensource:
-            self.data.append((ttype, value))
+    PythonLexer's rules are driven by an ExtendedRegexLexer, whose LexerContext
+    exposes the state stack once a line is lexed. That stack is carried from block
+    to block, so multi-line strings keep their state across lines.
+    """
+    global _lexer_class
+    if _lexer_class is None:
+        from pygments.lexer import ExtendedRegexLexer
+        from pygments.lexers import PythonLexer
+
+        class StatefulPythonLexer(ExtendedRegexLexer):
+            name = 'Python (stateful)'
+            flags = PythonLexer.flags
+            tokens = PythonLexer.tokens
+
+        _lexer_class = StatefulPythonLexer
+    return _lexer_class()
 
 class PythonHighlighter(QSyntaxHighlighter):
+    """Incremental Pygments highlighter.
+
+    Each block stores the id of the lexer state it ends in. Qt only re-highlights
+    following blocks while that state changes, so an edit re-lexes just the affected
+    region. Token formats are cached per (start state, block text), which makes
+    unchanged lines free to re-highlight. A freshly loaded document is lexed top to
+    bottom in chunks from a zero-delay timer so large files never stall the UI.
+    """
+    CHUNK_BLOCKS = 200
+    PENDING_STATE = -2
+    MAX_CACHED_BLOCKS = 50000
+
+    # Lexer state stacks and token caches are shared by every highlighter; 0 is the root state
+    state_ids = {('root',): 0}
+    state_stacks = [('root',)]
+    block_cache = {}
+
     def __init__(self, parent):
         super().__init__(parent)
-        self.formatter = QFormatter()
-        self.lexer = PythonLexer()
+        from pygments.lexer import LexerContext
+        from pygments.token import Keyword, Name, String, Comment, Operator, Number
+        self.lexer = stateful_python_lexer()
+        self.lexer_context = LexerContext
+        self.format_cache = {}
+        self.highlight_limit = self.CHUNK_BLOCKS
+        self.chunk_timer = QTimer(self)
+        self.chunk_timer.setInterval(0)
+        self.chunk_timer.timeout.connect(self.highlight_next_chunk)
 
         # Define styles for different token types (Monokai-inspired dark theme)
         self.styles = {
-            'Token.Keyword': self.create_format(QColor("#F92672")),
-            'Token.Name.Function': self.create_format(QColor("#A6E22E")),
-            'Token.Name.Class': self.create_format(QColor("#A6E22E"), bold=True),
-            'Token.String': self.create_format(QColor("#E6DB74")),
-            'Token.Comment': self.create_format(QColor("#75715E"), italic=True),
-            'Token.Operator': self.create_format(QColor("#F92672")),
-            'Token.Number': self.create_format(QColor("#AE81FF")),
-            'Token.Keyword.Constant': self.create_format(QColor("#AE81FF")),
-            'Token.Name.Builtin': self.create_format(QColor("#66D9EF"), italic=True),
+            Keyword: self.create_format(QColor("#F92672")),
+            Name.Function: self.create_format(QColor("#A6E22E")),
+            Name.Class: self.create_format(QColor("#A6E22E"), bold=True),
+            String: self.create_format(QColor("#E6DB74")),
+            Comment: self.create_format(QColor("#75715E"), italic=True),
+            Operator: self.create_format(QColor("#F92672")),
+            Number: self.create_format(QColor("#AE81FF")),
+            Keyword.Constant: self.create_format(QColor("#AE81FF")),
+            Name.Builtin: self.create_format(QColor("#66D9EF"), italic=True),
         }
 
     def create_format(self, color, bold=False, italic=False):
@@ -61,47 +113,1019 @@ class PythonHighlighter(QSyntaxHighlighter):
             fmt.setFontItalic(True)
         return fmt
 
+    def format_for(self, ttype):
+        """Returns the format of a token type, inherited from its closest styled parent."""
+        if ttype not in self.format_cache:
+            styled = ttype
+            while styled not in self.styles and styled.parent:
+                styled = styled.parent
+            self.format_cache[ttype] = self.styles.get(styled)
+        return self.format_cache[ttype]
+
+    def state_id(self, stack):
+        key = tuple(stack)
+        if key not in self.state_ids:
+            self.state_ids[key] = len(self.state_stacks)
+            self.state_stacks.append(key)
+        return self.state_ids[key]
+
+    def lex_block(self, text, start_state):
+        """Lexes one block from a start state; returns (formats, end state)."""
+        # The trailing newline lets end-of-line rules and state changes fire
+        context = self.lexer_context(text + "\n", 0, list(self.state_stacks[start_state]))
+        formats = []
+        for index, ttype, value in self.lexer.get_tokens_unprocessed(context=context):
+            fmt = self.format_for(ttype)
+            if fmt is not None and index < len(text):
+                formats.append((index, min(len(value), len(text) - index), fmt))
+        return formats, self.state_id(context.stack)
+
+    def highlight_next_chunk(self):
+        doc = self.document()
+        if doc is None or self.highlight_limit >= doc.blockCount():
+            self.chunk_timer.stop()
+            return
+        block = doc.findBlockByNumber(self.highlight_limit)
+        self.highlight_limit += self.CHUNK_BLOCKS
+        # Qt keeps going block by block until it reaches a still-pending block
+        self.rehighlightBlock(block)
+
+    @perf.timed()
     def highlightBlock(self, text):
-        """Highlights a block of text using Pygments."""
-        highlight(text, self.lexer, self.formatter)
-        
-        start_index = 0
-        for ttype, value in self.formatter.data:
-            length = len(value)
-            while ttype not in self.styles and ttype.parent:
-                ttype = ttype.parent
-            
-            if ttype in self.styles:
-                self.setFormat(start_index, length, self.styles[ttype])
-            start_index += length
+        """Highlights a block of text, reusing cached tokens when possible."""
+        if self.currentBlock().blockNumber() >= self.highlight_limit:
+            self.setCurrentBlockState(self.PENDING_STATE)
+            if not self.chunk_timer.isActive():
+                self.chunk_timer.start()
+            return
+        start_state = max(self.previousBlockState(), 0)
+        key = (start_state, text)
+        cached = self.block_cache.get(key)
+        if cached is None:
+            if len(self.block_cache) >= self.MAX_CACHED_BLOCKS:
+                self.block_cache.clear()
+            cached = self.block_cache[key] = self.lex_block(text, start_state)
+        formats, end_state = cached
+        for start, length, fmt in formats:
+            self.setFormat(start, length, fmt)
+        self.setCurrentBlockState(end_state)
 
 class SearchWorker(QObject):
-    """A worker that searches files in the background."""
-    finished = pyqtSignal(list)
+    """A worker that searches files in the background.
+
+    Matches are streamed in batches through `matches_found`; both signals carry
+    the search generation so results of superseded queries can be ignored.
+    """
+    matches_found = pyqtSignal(int, list)
+    finished = pyqtSignal(int)
 
-    def __init__(self, root_path, search_text):
+    def __init__(self, engine, search_text, generation, executor):
         super().__init__()
-        self.root_path = root_path
+        self.engine = engine
         self.search_text = search_text
+        self.generation = generation
+        self.executor = executor
+        self.cancelled = threading.Event()
 
+    def cancel(self):
+        """Asks the running search to stop as soon as possible."""
+        self.cancelled.set()
+
+    @perf.timed()
     def run(self):
-        """Performs the long-running search task."""
-        matches = []
-        for root, _, files in os.walk(self.root_path):
-            for file in files:
-                if file.endswith(('.py', '.txt', '.md', '.markdown', '.ini', '.json')):
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            if self.search_text in f.read().lower():
-                                # *** THE FIX IS HERE: Use basename for the filter ***
-                                matches.append(os.path.basename(file_path))
-                    except Exception:
-                        continue
-        self.finished.emit(matches)
+        """Streams the query results from the engine's content index."""
+        for batch in self.engine.search_batches(self.search_text, self.executor, self.cancelled):
+            self.matches_found.emit(self.generation, batch)
+        self.finished.emit(self.generation)
+
+class FindWorker(QObject):
+    """Finds matching lines across the project in the background.
+
+    Results are streamed as lists of (path, hits, truncated) through `hits_found`;
+    both signals carry the find generation, like SearchWorker's.
+    """
+    hits_found = pyqtSignal(int, object)
+    finished = pyqtSignal(int, str)
+
+    def __init__(self, engine, text, options, generation, executor):
+        super().__init__()
+        self.engine = engine
+        self.text = text
+        self.options = options  # (regex, case_sensitive, whole_word)
+        self.generation = generation
+        self.executor = executor
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    @perf.timed()
+    def run(self):
+        """Streams hits and emits finished(error message)."""
+        error = ""
+        try:
+            for batch in self.engine.find_batches(self.text, *self.options, executor=self.executor,
+                                                  cancelled=self.cancelled):
+                self.hits_found.emit(self.generation, batch)
+        except Exception as e:
+            error = str(e)
+        self.finished.emit(self.generation, error)
+
+class SymbolWorker(QObject):
+    """Refreshes the project's symbol index in the background."""
+    finished = pyqtSignal(object, str)
+
+    def __init__(self, engine, executor):
+        super().__init__()
+        self.engine = engine
+        self.executor = executor
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    @perf.timed()
+    def run(self):
+        """Refreshes and saves the index, then emits finished(engine, error message)."""
+        error = ""
+        try:
+            self.engine.refresh_symbols(self.executor, self.cancelled)
+        except Exception as e:
+            error = str(e)
+        self.finished.emit(self.engine, error)
+
+class StatsWorker(QObject):
+    """Refreshes the project statistics in the background."""
+    finished = pyqtSignal(object, object, str)
+
+    def __init__(self, engine, executor, top):
+        super().__init__()
+        self.engine = engine
+        self.executor = executor
+        self.top = top
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    @perf.timed()
+    def run(self):
+        """Refreshes and saves the statistics, then emits finished(engine, summary, error message)."""
+        summary, error = None, ""
+        try:
+            summary = self.engine.statistics(self.top, self.executor, self.cancelled)
+        except Exception as e:
+            error = str(e)
+        self.finished.emit(self.engine, summary, error)
+
+class SymbolFinder(QDialog):
+    """Fuzzy finder over the project's classes, functions and modules."""
+    MAX_RESULTS = 200
+
+    def __init__(self, parent, open_location):
+        super().__init__(parent)
+        self.setWindowTitle("Go to Symbol")
+        self.resize(640, 420)
+        self.engine = None
+        self.open_location = open_location
+        layout = QVBoxLayout(self)
+        self.query = QLineEdit()
+        self.query.setPlaceholderText("Type a class, function or module name...")
+        self.query.textChanged.connect(lambda: self.update_results())
+        self.query.returnPressed.connect(self.accept_current)
+        self.results = QListWidget()
+        self.results.setUniformItemSizes(True)
+        self.results.itemActivated.connect(self.accept_item)
+        self.status = QLabel()
+        layout.addWidget(self.query)
+        layout.addWidget(self.results)
+        layout.addWidget(self.status)
+
+    def open_for(self, engine, indexing):
+        self.engine = engine
+        self.set_indexing(indexing)
+        self.query.selectAll()
+        self.query.setFocus()
+        self.update_results()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def set_indexing(self, indexing):
+        self.status.setText("Indexing symbols..." if indexing else "")
+
+    @perf.timed()
+    def update_results(self):
+        self.results.clear()
+        if self.engine is None:
+            return
+        root = self.engine.root_path
+        for symbol, path in self.engine.find_symbols(self.query.text(), self.MAX_RESULTS):
+            item = QListWidgetItem(f"{symbol.qualname}    {symbol.kind} · {os.path.relpath(path, root)}:{symbol.line}")
+            item.setData(Qt.UserRole, (path, symbol.line, symbol.column + 1))
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+
+    def accept_current(self):
+        item = self.results.currentItem()
+        if item is not None:
+            self.accept_item(item)
+
+    def accept_item(self, item):
+        self.hide()
+        self.open_location(*item.data(Qt.UserRole))
+
+    def keyPressEvent(self, event):
+        # Arrow keys move through the results while typing in the query field
+        if event.key() in (Qt.Key_Up, Qt.Key_Down) and self.results.count():
+            row = self.results.currentRow() + (1 if event.key() == Qt.Key_Down else -1)
+            self.results.setCurrentRow(max(0, min(row, self.results.count() - 1)))
+            return
+        super().keyPressEvent(event)
+
+class ProjectStatsDialog(QDialog):
+    """Lines per language, folder sizes, largest files and duplicate files of the project."""
+    TOP_ROWS = 50
+
+    def __init__(self, parent, open_location, refresh):
+        super().__init__(parent)
+        self.setWindowTitle("Project Statistics")
+        self.resize(760, 520)
+        self.open_location = open_location
+        layout = QVBoxLayout(self)
+        header = QHBoxLayout()
+        self.status = QLabel()
+        btn_refresh = QPushButton("Refresh")
+        btn_refresh.clicked.connect(refresh)
+        header.addWidget(self.status, 1)
+        header.addWidget(btn_refresh)
+        self.tabs = QTabWidget()
+        self.languages = self.add_table("Languages", ["Language", "Files", "Lines", "Blank", "Size"])
+        self.folders = self.add_table("Folders", ["Folder", "Size", "Files"])
+        self.largest = self.add_table("Largest Files", ["File", "Size"])
+        self.duplicates = self.add_table("Duplicates", ["File", "Size"])
+        self.duplicates.setRootIsDecorated(True)
+        for table in (self.largest, self.duplicates):
+            table.itemActivated.connect(self.open_item)
+        layout.addLayout(header)
+        layout.addWidget(self.tabs)
+        self.summary_text = ""
+
+    def add_table(self, title, headers):
+        table = QTreeWidget()
+        table.setHeaderLabels(headers)
+        table.setColumnWidth(0, 380 if len(headers) < 4 else 200)
+        table.setRootIsDecorated(False)
+        table.setUniformRowHeights(True)
+        self.tabs.addTab(table, title)
+        return table
+
+    def add_row(self, table, texts, path=None, parent=None):
+        item = QTreeWidgetItem(texts)
+        for column in range(1, len(texts)):
+            item.setTextAlignment(column, Qt.AlignRight | Qt.AlignVCenter)
+        if path:
+            item.setData(0, Qt.UserRole, path)
+            item.setToolTip(0, path)
+        if parent is None:
+            table.addTopLevelItem(item)
+        else:
+            parent.addChild(item)
+        return item
+
+    def set_scanning(self, scanning):
+        self.status.setText(f"Scanning... {self.summary_text}" if scanning else self.summary_text)
+
+    @perf.timed()
+    def show_summary(self, summary, root_path):
+        for table in (self.languages, self.folders, self.largest, self.duplicates):
+            table.clear()
+        for name, files, lines, blank, size in summary['languages']:
+            self.add_row(self.languages, [name, f"{files:,}", f"{lines:,}", f"{blank:,}", format_bytes(size)])
+        for folder, size, files in summary['directories']:
+            self.add_row(self.folders, [folder, format_bytes(size), f"{files:,}"],
+                         os.path.join(root_path, folder))
+        for path, size in summary['largest']:
+            self.add_row(self.largest, [os.path.relpath(path, root_path), format_bytes(size)], path)
+        for size, paths in summary['duplicates']:
+            group = self.add_row(self.duplicates, [f"{len(paths)} copies", format_bytes(size)])
+            for path in paths:
+                self.add_row(self.duplicates, [os.path.relpath(path, root_path), ""], path, group)
+        self.duplicates.expandAll()
+        self.summary_text = (f"{summary['files']:,} files, {format_bytes(summary['bytes'])}; "
+                             f"{format_bytes(summary['wasted_bytes'])} in duplicate copies")
+        self.set_scanning(False)
+
+    def open_item(self, item):
+        path = item.data(0, Qt.UserRole)
+        if path and os.path.isfile(path):
+            self.open_location(path, 1)
+
+def normalize_path(path):
+    """Normalises a path so Qt and os.walk spellings of it compare equal."""
+    return os.path.normcase(os.path.normpath(path))
+
+class PathFilterProxyModel(QSortFilterProxyModel):
+    """Filters a QFileSystemModel down to an exact set of paths.
+
+    Matched paths and all their ancestor directories are kept in a set, so each
+    row is accepted with a single membership check no matter how many paths match.
+    Rows matching the project's ignore rules are always hidden, so ignored folders
+    are never expanded and QFileSystemModel never populates them.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.allowed = None  # None disables filtering
+        self.ignore_rules = None
+
+    def set_ignore_rules(self, rules):
+        self.ignore_rules = rules
+        self.invalidateFilter()
+
+    def set_paths(self, paths, root_path):
+        """Shows only `paths`; the root itself always stays visible."""
+        self.allowed = set()
+        self._include(root_path)
+        self.add_paths(paths)
+
+    def add_paths(self, paths):
+        for path in paths:
+            self._include(path)
+        self.invalidateFilter()
+
+    def clear_paths(self):
+        self.allowed = None
+        self.invalidateFilter()
+
+    def _include(self, path):
+        path = normalize_path(path)
+        while path not in self.allowed:
+            self.allowed.add(path)
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        model = self.sourceModel()
+        index = model.index(source_row, 0, source_parent)
+        if self.ignore_rules is not None and self.ignore_rules.is_ignored(model.filePath(index), model.isDir(index)):
+            return False
+        if self.allowed is None:
+            return True
+        return normalize_path(model.filePath(index)) in self.allowed
+
+class LargeFileView(QWidget):
+    """Read-only viewer that pages a huge file through a memory-mapped line index.
+
+    Only the visible lines plus WINDOW_LINES on either side are ever held in the
+    text widget. The line index is extended a chunk at a time from a timer, and
+    positions past the indexed part are mapped proportionally onto byte offsets.
+    """
+    WINDOW_LINES = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.index = None
+        self.window_start = 0
+        self.window_lines = 0
+        self.window_exact = False
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.text.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.text.viewport().installEventFilter(self)
+        self.scrollbar = QScrollBar(Qt.Vertical)
+        self.scrollbar.valueChanged.connect(self.show_line)
+        self.status = QLabel()
+
+        self.index_timer = QTimer(self)
+        self.index_timer.setInterval(0)
+        self.index_timer.timeout.connect(self.index_next_chunk)
+
+        text_layout = QHBoxLayout()
+        text_layout.setContentsMargins(0, 0, 0, 0)
+        text_layout.addWidget(self.text)
+        text_layout.addWidget(self.scrollbar)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(text_layout)
+        layout.addWidget(self.status)
+        self.setLayout(layout)
+
+    def open_file(self, path):
+        self.close_file()
+        self.index = LineIndex(path)
+        self.index.index_more()
+        self.window_lines = 0
+        self.update_range()
+        self.scrollbar.setValue(0)
+        self.show_line(0)
+        if not self.index.complete:
+            self.index_timer.start()
+
+    def close_file(self):
+        self.index_timer.stop()
+        if self.index:
+            self.index.close()
+            self.index = None
+        self.text.clear()
+
+    def visible_lines(self):
+        return max(1, self.text.viewport().height() // self.text.fontMetrics().lineSpacing())
+
+    def index_next_chunk(self):
+        if self.index is None or self.index.index_more():
+            self.index_timer.stop()
+        self.update_range()
+
+    def update_range(self):
+        total = self.index.line_count()
+        self.scrollbar.blockSignals(True)
+        self.scrollbar.setRange(0, max(0, total - self.visible_lines()))
+        self.scrollbar.setPageStep(self.visible_lines())
+        self.scrollbar.blockSignals(False)
+        state = "" if self.index.complete else f" (indexing {100 * self.index.scanned // self.index.size}%)"
+        prefix = "" if self.index.complete else "~"
+        self.status.setText(f"Large file, read-only: {prefix}{total:,} lines, "
+                            f"{self.index.size / (1024 * 1024):.1f} MB{state}")
+
+    def show_line(self, line):
+        """Scrolls so `line` is at the top, reloading the window only when needed."""
+        if self.index is None:
+            return
+        visible = self.visible_lines()
+        exact = line + visible < self.index.indexed_lines()
+        in_window = (self.window_exact and exact and self.window_start <= line
+                     and line + visible <= self.window_start + self.window_lines)
+        if not in_window:
+            if exact:
+                self.window_start = max(0, line - self.WINDOW_LINES)
+                count = line - self.window_start + visible + self.WINDOW_LINES
+                content = self.index.read_lines(self.window_start, count)
+            else:
+                # Not indexed yet: jump to the proportional byte offset
+                self.window_start = line
+                count = visible + self.WINDOW_LINES
+                offset = int(self.index.size * line / max(1, self.index.line_count()))
+                content = self.index.read_at_offset(offset, count)
+            self.window_exact = exact
+            self.window_lines = count
+            self.text.setPlainText(content)
+        self.text.verticalScrollBar().setValue(line - self.window_start)
+
+    def eventFilter(self, obj, event):
+        # The text widget only holds a window, so wheel scrolling drives our scrollbar
+        if event.type() == QEvent.Wheel:
+            steps = event.angleDelta().y() // 40
+            self.scrollbar.setValue(self.scrollbar.value() - steps)
+            return True
+        return super().eventFilter(obj, event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.index:
+            self.update_range()
+            self.window_lines = 0
+            self.show_line(self.scrollbar.value())
+
+class FileLoadWorker(QObject):
+    """Reads files for the editor on a background thread."""
+    loaded = pyqtSignal(int, str, object, str)
+
+    @perf.timed()
+    def load(self, request_id, path):
+        """Reads a file and emits (request_id, path, (content, stat), error)."""
+        try:
+            stat = os.stat(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            self.loaded.emit(request_id, path, (content, stat), "")
+        except Exception as e:
+            self.loaded.emit(request_id, path, None, str(e))
+
+class CachedDocument:
+    """An opened file's document, highlighter and view state."""
+
+    def __init__(self, path, document, highlighter, stat):
+        self.path = path
+        self.document = document
+        self.highlighter = highlighter
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.scroll = 0
+        self.cursor_position = 0
+
+    def is_current(self, stat):
+        # Unsaved edits win over changes on disk, as they did before caching
+        return self.document.isModified() or (self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size)
+
+class DocumentCache:
+    """Bounded LRU cache of opened documents, invalidated by mtime and size."""
+
+    def __init__(self, capacity=20):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, stat, keep=None):
+        entry = self.entries.get(path)
+        if entry is not None and entry.is_current(stat):
+            self.entries.move_to_end(path)
+            self.hits += 1
+            return entry
+        if entry is not None:
+            self.discard(path, keep)
+        self.misses += 1
+        return None
+
+    def put(self, entry, keep=None):
+        """Adds an entry, evicting least recently used ones other than `keep`."""
+        self.discard(entry.path, keep)
+        self.entries[entry.path] = entry
+        for path in list(self.entries):
+            if len(self.entries) <= self.capacity:
+                break
+            if self.entries[path] is not keep and path != entry.path:
+                self.discard(path)
+
+    def discard(self, path, keep=None):
+        """Drops an entry; the document of `keep`, still in the editor, is left to its owner."""
+        entry = self.entries.pop(path, None)
+        if entry is not None and entry is not keep:
+            entry.document.deleteLater()
+
+    def holds(self, entry):
+        return self.entries.get(entry.path) is entry
+
+class LintWorker(QObject):
+    """Runs the lint service in the background, streaming results file by file.
+
+    Both signals carry the lint generation so results of superseded runs can be ignored.
+    """
+    file_linted = pyqtSignal(int, str, object)
+    finished = pyqtSignal(int, int, str)
+
+    def __init__(self, service, paths, generation, executor):
+        super().__init__()
+        self.service = service
+        self.paths = paths
+        self.generation = generation
+        self.executor = executor
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    @perf.timed()
+    def run(self):
+        """Lints the files and emits finished(file count, error message)."""
+        count = 0
+        error = ""
+        try:
+            for path, problems in self.service.lint(self.paths, self.executor, self.cancelled):
+                self.file_linted.emit(self.generation, path, list(problems))
+                count += 1
+        except Exception as e:
+            error = str(e)
+        self.service.save()
+        self.finished.emit(self.generation, count, error)
+
+class JobWorker(QObject):
+    """Runs a long job in the background with throttled progress and cancellation.
+
+    The job is called as job(report, cancelled), where report(done, total, text)
+    publishes progress and `cancelled` is a threading.Event it should poll.
+    Both signals carry the job id, since the worker may be gone by the time
+    they are delivered.
+    """
+    progress = pyqtSignal(int, float, str)
+    finished = pyqtSignal(int, object, str)
+
+    def __init__(self, job_id, job):
+        super().__init__()
+        self.job_id = job_id
+        self.job = job
+        self.cancelled = threading.Event()
+        self.last_report = 0.0
+
+    def report(self, done, total, text):
+        now = time.monotonic()
+        if now - self.last_report >= 0.05 or done >= total:
+            self.last_report = now
+            self.progress.emit(self.job_id, done / total if total else 1.0, text)
+
+    @perf.timed()
+    def run(self):
+        """Runs the job and emits finished(result, error message)."""
+        try:
+            result = self.job(self.report, self.cancelled)
+        except Exception as e:
+            self.finished.emit(self.job_id, None, str(e) or type(e).__name__)
+            return
+        self.finished.emit(self.job_id, result, "")
+
+# The preview page is loaded once; later renders patch its sections through JavaScript
+PREVIEW_SHELL = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head>
+<body><div id="pc-root"></div>
+<script>
+var root = document.getElementById('pc-root');
+function pcReplace(sections) {
+    root.innerHTML = sections.map(function (html) { return '<div class="pc-section">' + html + '</div>'; }).join('');
+}
+function pcPatch(index, html) {
+    root.children[index].innerHTML = html;
+}
+</script></body></html>"""
+
+def split_html_sections(html):
+    """Splits rendered Markdown at top-level headings so sections can be patched separately."""
+    return [section for section in re.split(r'(?=^<h[1-6][\s>])', html, flags=re.M) if section]
+
+class MarkdownRenderWorker(QObject):
+    """Renders Markdown to HTML sections on a background thread."""
+    rendered = pyqtSignal(int, str, list)
+
+    def __init__(self):
+        super().__init__()
+        # Set from the GUI thread; queued requests older than this are skipped
+        self.latest_request = 0
+
+    @perf.timed()
+    def render(self, request_id, key, text):
+        """Renders `text` and emits (request_id, content key, sections)."""
+        if request_id != self.latest_request:
+            return
+        try:
+            import markdown2
+            html = markdown2.markdown(text, extras=["fenced-code-blocks", "codehilite", "tables"])
+        except Exception as e:
+            html = f"<h3>Error</h3><p>Could not render preview: {str(e)}</p>"
+        self.rendered.emit(request_id, key, split_html_sections(html))
+
+class OutputConsole(QPlainTextEdit):
+    """Read-only process output with a line cap and coalesced repaints.
+
+    Incoming text is queued and flushed into the widget at most FRAME_RATE times
+    a second. The document keeps only the last `line_cap` lines (Qt drops the
+    oldest blocks), and the queue is trimmed the same way before a flush, so
+    memory stays bounded however chatty the process is. Optionally every chunk is
+    also written to a log file, which then holds the full output.
+    """
+    FRAME_RATE = 30
+
+    def __init__(self, line_cap=10000, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.pending = deque()
+        self.ends_with_newline = True
+        self.log_file = None
+        self.set_line_cap(line_cap)
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(1000 // self.FRAME_RATE)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def set_line_cap(self, line_cap):
+        self.line_cap = line_cap
+        self.setMaximumBlockCount(line_cap)
+
+    def write(self, text):
+        """Queues text for the next repaint."""
+        if not text:
+            return
+        self.pending.append(text)
+        self.ends_with_newline = text.endswith("\n")
+        if self.log_file:
+            self.log_file.write(text)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def append(self, text):
+        """Queues text as a line of its own."""
+        self.write(("" if self.ends_with_newline else "\n") + text + "\n")
+
+    @perf.timed()
+    def flush(self):
+        if not self.pending:
+            self.flush_timer.stop()
+            return
+        text = "".join(self.pending)
+        self.pending.clear()
+        # Lines that would be evicted straight away are never inserted
+        if text.count("\n") > self.line_cap:
+            text = "\n".join(text.split("\n")[-(self.line_cap + 1):])
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 2
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+        if self.log_file:
+            self.log_file.flush()
+
+    def clear(self):
+        self.pending.clear()
+        self.ends_with_newline = True
+        super().clear()
+
+    def start_log(self, path):
+        """Writes all further output, uncapped, to `path`."""
+        self.stop_log()
+        self.log_file = open(path, 'a', encoding='utf-8')
+
+    def stop_log(self):
+        if self.log_file:
+            self.log_file.close()
+            self.log_file = None
+
+    def contextMenuEvent(self, event):
+        menu = self.createStandardContextMenu()
+        menu.addSeparator()
+        menu.addAction(f"Line Limit ({self.line_cap:,})...", self.ask_line_cap)
+        if self.log_file:
+            menu.addAction(f"Stop Logging to {os.path.basename(self.log_file.name)}", self.stop_log)
+        else:
+            menu.addAction("Log Full Output to File...", self.ask_log_file)
+        menu.addAction("Clear", self.clear)
+        menu.exec_(event.globalPos())
+
+    def ask_line_cap(self):
+        line_cap, ok = QInputDialog.getInt(self, "Line Limit", "Lines kept in the console:",
+                                           self.line_cap, 100, 10000000, 1000)
+        if ok:
+            self.set_line_cap(line_cap)
+
+    def ask_log_file(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Log Output To", os.getcwd(), "Log files (*.log);;All files (*)")
+        if path:
+            try:
+                self.start_log(path)
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Failed to open log file: {str(e)}")
+
+# Shown in front of a run's tab title
+RUN_STATE_MARKS = {'queued': "⏳", 'running': "▶", 'finished': "✅", 'failed': "❌", 'stopped': "⏹"}
+
+class Run:
+    """One script or pip job of the run manager, with its console and results."""
+
+    def __init__(self, number, title, command, cwd, console):
+        self.number = number
+        self.title = title
+        self.command = command
+        self.cwd = cwd
+        self.console = console
+        self.process = None
+        self.state = 'queued'  # queued, running, finished, failed or stopped
+        self.stats = {}
+        self.stats_path = None
+        self.started = None
+
+class RunManager(QObject):
+    """Runs processes side by side, at most `limit` at a time; the rest wait in a queue.
+
+    Every process runs under the run_stats wrapper, which records the exit code,
+    CPU time and peak RSS of exactly that process once it ends. Output goes to
+    the run's own console.
+    """
+    run_changed = pyqtSignal(object)
+    STOP_GRACE_MS = 3000
+
+    def __init__(self, limit, parent=None):
+        super().__init__(parent)
+        self.limit = max(1, limit)
+        self.queue = deque()
+        self.running = {}  # QProcess -> Run
+        self.count = 0
+        self.stats_dir = tempfile.mkdtemp(prefix="pycentric-runs-")
+
+    def submit(self, title, command, cwd, console):
+        self.count += 1
+        run = Run(self.count, title, command, cwd, console)
+        console.append(f"--- Queued {title} ---")
+        self.queue.append(run)
+        self.run_changed.emit(run)
+        self.start_queued()
+        return run
+
+    def set_limit(self, limit):
+        self.limit = max(1, limit)
+        self.start_queued()
+
+    def start_queued(self):
+        while self.queue and len(self.running) < self.limit:
+            run = self.queue.popleft()
+            process = QProcess(self)
+            process.setWorkingDirectory(run.cwd)
+            process.readyReadStandardOutput.connect(self.handle_stdout)
+            process.readyReadStandardError.connect(self.handle_stderr)
+            process.finished.connect(self.on_process_finished)
+            process.errorOccurred.connect(self.on_process_error)
+            run.process = process
+            run.state = 'running'
+            run.stats_path = os.path.join(self.stats_dir, f"run-{run.number}.json")
+            run.started = time.perf_counter()
+            self.running[process] = run
+            run.console.append(f"--- Running {run.title} ---")
+            program, *args = wrap_command(run.command, run.stats_path)
+            process.start(program, args)
+            self.run_changed.emit(run)
+
+    @perf.timed()
+    def handle_stdout(self):
+        process = self.sender()
+        run = self.running.get(process)
+        if run:
+            run.console.write(process.readAllStandardOutput().data().decode(errors='ignore'))
+
+    @perf.timed()
+    def handle_stderr(self):
+        process = self.sender()
+        run = self.running.get(process)
+        data = process.readAllStandardError().data().decode(errors='ignore')
+        if run and data:
+            run.console.write(f"ERROR: {data}")
+
+    def on_process_finished(self, exit_code, exit_status):
+        process = self.sender()
+        run = self.running.get(process)
+        if run is None:
+            return
+        self.handle_stdout()
+        self.handle_stderr()
+        stats = read_stats(run.stats_path) or {}
+        if os.path.exists(run.stats_path):
+            os.remove(run.stats_path)
+        if stats.get('returncode') is None and exit_status == QProcess.NormalExit:
+            stats['returncode'] = exit_code
+        # The wrapper's own wall time leaves out its start-up; fall back to ours
+        stats.setdefault('wall_seconds', time.perf_counter() - run.started)
+        self.finish(process, run, stats)
+
+    def on_process_error(self, error):
+        # A process that never started emits no finished signal
+        if error == QProcess.FailedToStart:
+            process = self.sender()
+            run = self.running.get(process)
+            if run:
+                run.console.append(f"Failed to start: {process.errorString()}")
+                self.finish(process, run, {'returncode': None})
+
+    def finish(self, process, run, stats):
+        del self.running[process]
+        process.deleteLater()
+        run.process = None
+        run.stats = stats
+        if run.state != 'stopped':
+            run.state = 'finished' if stats.get('returncode') == 0 else 'failed'
+        run.console.append(f"\n--- {run.title} {run.state}: {describe(stats)} ---")
+        self.run_changed.emit(run)
+        self.start_queued()
+
+    def stop(self, run):
+        """Stops a running run (killing it if it ignores the request) or drops a queued one."""
+        if run.state == 'queued':
+            self.queue.remove(run)
+            run.state = 'stopped'
+            run.console.append(f"--- {run.title} removed from the queue ---")
+            self.run_changed.emit(run)
+        elif run.state == 'running':
+            run.state = 'stopped'
+            process = run.process
+            # The wrapper passes the request on to the program and still records its stats
+            process.terminate()
+            QTimer.singleShot(self.STOP_GRACE_MS, lambda: self.running.get(process) is run and process.kill())
+            self.run_changed.emit(run)
+
+    def shutdown(self):
+        """Stops everything; used when the window closes."""
+        self.queue.clear()
+        for process in list(self.running):
+            process.terminate()
+        for process in list(self.running):
+            if not process.waitForFinished(1000):
+                process.kill()
+                process.waitForFinished(1000)
+        shutil.rmtree(self.stats_dir, ignore_errors=True)
 
 # --- Main Application ---
+class PerfPanel(QWidget):
+    """Per-operation latency table and event-loop stall detection.
+
+    Instrumented handlers report to the perf module while recording is on. A
+    STALL_INTERVAL_MS timer measures how late the event loop delivers it; a tick
+    more than STALL_THRESHOLD_MS late is recorded as a stall. The table is redrawn
+    from a timer while the panel is visible, never from the hooks themselves.
+    """
+    STALL_INTERVAL_MS = 50
+    STALL_THRESHOLD_MS = 100
+    SPARK = " ▁▂▃▄▅▆▇█"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        buttons = QHBoxLayout()
+        self.record_button = QPushButton("Record")
+        self.record_button.setCheckable(True)
+        self.record_button.toggled.connect(self.set_recording)
+        btn_reset = QPushButton("Reset")
+        btn_reset.clicked.connect(self.reset)
+        btn_export = QPushButton("Export Chrome Trace...")
+        btn_export.clicked.connect(self.export_trace)
+        self.stall_label = QLabel()
+        buttons.addWidget(self.record_button)
+        buttons.addWidget(btn_reset)
+        buttons.addWidget(btn_export)
+        buttons.addWidget(self.stall_label, 1)
+        self.table = QTreeWidget()
+        self.table.setRootIsDecorated(False)
+        self.table.setSortingEnabled(True)
+        bounds = " / ".join(f"{bound:g}" for bound in perf.BUCKET_BOUNDS_MS)
+        self.table.setHeaderLabels(["Operation", "Calls", "Mean ms", "p95 ms", "Max ms", "Total ms",
+                                    f"Histogram (≤ {bounds} ms, more)"])
+        self.table.setColumnWidth(0, 320)
+        layout.addLayout(buttons)
+        layout.addWidget(self.table)
+
+        self.last_tick = None
+        self.stall_timer = QTimer(self)
+        self.stall_timer.setInterval(self.STALL_INTERVAL_MS)
+        self.stall_timer.timeout.connect(self.check_stall)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(500)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.record_button.setChecked(perf.is_enabled())
+        self.set_recording(perf.is_enabled())
+
+    def set_recording(self, enabled):
+        perf.set_enabled(enabled)
+        if enabled:
+            self.last_tick = time.perf_counter_ns()
+            self.stall_timer.start()
+            self.refresh_timer.start()
+        else:
+            self.stall_timer.stop()
+            self.refresh_timer.stop()
+            self.refresh()
+
+    def check_stall(self):
+        now = time.perf_counter_ns()
+        late_ns = now - self.last_tick - self.STALL_INTERVAL_MS * 1000000
+        if late_ns > self.STALL_THRESHOLD_MS * 1000000:
+            perf.record(perf.STALL_NAME, self.last_tick + self.STALL_INTERVAL_MS * 1000000, now)
+        self.last_tick = now
+
+    def reset(self):
+        perf.reset()
+        self.refresh()
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        stats = perf.snapshot()
+        stalls = stats.get(perf.STALL_NAME)
+        self.stall_label.setText(f"Stalls: {stalls.count}, longest {stalls.max_ns / 1e6:.0f} ms"
+                                 if stalls else "Stalls: none")
+        self.table.setSortingEnabled(False)
+        self.table.clear()
+        for name, op in stats.items():
+            peak = max(op.buckets)
+            spark = "".join(self.SPARK[0 if not count else 1 + count * (len(self.SPARK) - 2) // peak]
+                            for count in op.buckets)
+            item = QTreeWidgetItem([name, "", "", "", "", "", spark])
+            for column, value in enumerate((op.count, op.total_ns / op.count / 1e6, op.percentile_ms(0.95),
+                                            op.max_ns / 1e6, op.total_ns / 1e6), 1):
+                item.setData(column, Qt.DisplayRole, round(value, 2) if isinstance(value, float) else value)
+            item.setToolTip(6, ", ".join(str(count) for count in op.buckets))
+            item.setFont(6, QFont("Courier New", 10))
+            self.table.addTopLevelItem(item)
+        self.table.setSortingEnabled(True)
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Chrome Trace", "pycentric-trace.json",
+                                              "Trace files (*.json)")
+        if not path:
+            return
+        try:
+            count = perf.export_chrome_trace(path)
+            QMessageBox.information(self, "Success", f"Exported {count} events to {os.path.basename(path)}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export trace: {str(e)}")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
 class PythonProjectExplorer(QMainWindow):
+    request_file_load = pyqtSignal(int, str)
+    request_preview_render = pyqtSignal(int, str, str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("PyCentric Project Explorer")
@@ -109,18 +1133,82 @@ class PythonProjectExplorer(QMainWindow):
         
         # Initialize variables
         self.current_file_path = None
-        self.venv_path = None
+        self.engine = None
         self.showing_preview = False
 
-        # Setup QProcess for real-time script execution
-        self.process = QProcess(self)
-        self.process.readyReadStandardOutput.connect(self.handle_stdout)
-        self.process.readyReadStandardError.connect(self.handle_stderr)
-        self.process.finished.connect(self.on_process_finished)
+        # Scripts and pip jobs run side by side, each with its own console tab
+        self.runs = RunManager(min(4, os.cpu_count() or 1), self)
+        self.runs.run_changed.connect(self.on_run_changed)
+        self.run_items = {}  # Run -> row of the Runs table
+        self.run_callbacks = {}  # Run -> called once it has ended
+        self.venv_run = None
         
-        # Setup search thread and timer
-        self.search_thread = None
+        # Setup search threads, worker pool and timer
+        self.search_threads = []
         self.search_worker = None
+        self.search_generation = 0
+        self.search_matches = []
+        self.search_pool = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4))
+
+        # Setup background file loading and the document cache
+        self.document_cache = DocumentCache()
+        self.current_document = None
+        self.load_request = 0
+        self.load_thread = QThread(self)
+        self.load_worker = FileLoadWorker()
+        self.load_worker.moveToThread(self.load_thread)
+        self.request_file_load.connect(self.load_worker.load)
+        self.load_worker.loaded.connect(self.on_file_loaded)
+        self.load_thread.start()
+
+        # Setup the live Markdown preview: debounced, rendered off-thread, cached by content hash
+        self.preview_cache = OrderedDict()
+        self.preview_request = 0
+        self.preview_loading = False
+        self.preview_ready = False
+        self.preview_sections = None
+        self.pending_sections = None
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(300)
+        self.preview_timer.timeout.connect(self.render_preview)
+        self.render_thread = QThread(self)
+        self.render_worker = MarkdownRenderWorker()
+        self.render_worker.moveToThread(self.render_thread)
+        self.request_preview_render.connect(self.render_worker.render)
+        self.render_worker.rendered.connect(self.on_preview_rendered)
+        self.render_thread.start()
+
+        # Setup project linting: flake8 batches run on their own pool
+        self.lint_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+        self.lint_worker = None
+        self.lint_generation = 0
+        self.lint_threads = []
+        self.problem_items = {}
+        self.pending_jump = None
+
+        # Symbol index: parsed on a process pool created on first use
+        self.symbol_pool = None
+        self.symbol_worker = None
+        self.symbol_threads = []
+        self.symbol_finder = None
+        self.pending_definition = None
+
+        # Find in Files runs on the search pool, one query at a time
+        self.find_worker = None
+        self.find_generation = 0
+        self.find_threads = []
+        self.find_hit_count = 0
+
+        # Project statistics are refreshed on the search pool while the dialog is open
+        self.stats_worker = None
+        self.stats_threads = []
+        self.stats_dialog = None
+
+        # Background jobs (archiving, ...) with their progress dialogs
+        self.jobs = {}  # job id -> (worker, dialog, title, on_success)
+        self.job_count = 0
+        self.job_threads = []
         self.search_timer = QTimer(self)
         self.search_timer.setSingleShot(True)
         self.search_timer.setInterval(500)
@@ -131,13 +1219,14 @@ class PythonProjectExplorer(QMainWindow):
         
         # Set initial project directory
         current_dir = os.getcwd()
-        self.model.setRootPath(current_dir)
-        self.tree.setRootIndex(self.model.index(current_dir))
+        self.set_tree_root(current_dir)
         self.file_info.setText(f"Current project folder: {current_dir}")
         self.check_venv()
 
     def setup_ui(self):    
         self.statusBar()
+        self.cache_label = QLabel()
+        self.statusBar().addPermanentWidget(self.cache_label)
         splitter = QSplitter(Qt.Horizontal)
         self.setCentralWidget(splitter)
         
@@ -153,9 +1242,13 @@ class PythonProjectExplorer(QMainWindow):
         self.model.setNameFilters(["*.py", "*.txt", "*.md", "*.markdown", "*.ini", "*.json", "*.zip", "requirements.txt"])
         self.model.setNameFilterDisables(False)
         
+        self.proxy = PathFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+
         self.tree = QTreeView()
-        self.tree.setModel(self.model)
+        self.tree.setModel(self.proxy)
         self.tree.setColumnWidth(0, 250)
+        self.tree.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.tree.clicked.connect(self.on_tree_clicked)
         self.tree.setContextMenuPolicy(Qt.CustomContextMenu)
         self.tree.customContextMenuRequested.connect(self.open_context_menu)
@@ -179,19 +1272,45 @@ class PythonProjectExplorer(QMainWindow):
         self.editor = QPlainTextEdit()
         self.editor.setFont(QFont("Consolas", 11))
         self.editor.setStyleSheet("background-color: #272822; color: #F8F8F2;")
-        self.highlighter = PythonHighlighter(self.editor.document())
+        # Messages and errors are shown in this scratch document; files get their own
+        self.scratch_document = self.editor.document()
+        self.editor.textChanged.connect(self.on_editor_text_changed)
+
+        self.large_view = LargeFileView()
+        self.large_view.setVisible(False)
         
-        self.preview_frame = QWebEngineView()
-        self.preview_frame.setVisible(False)
+        # The web view is created by ensure_preview_frame the first time a preview is shown
+        self.preview_frame = None
         
         self.editor_splitter.addWidget(self.editor)
-        self.editor_splitter.addWidget(self.preview_frame)
+        self.editor_splitter.addWidget(self.large_view)
         self.editor_splitter.setSizes([600, 200])
         
-        self.output = QTextEdit()
+        self.output = OutputConsole()
         self.output.setFont(QFont("Courier New", 10))
-        self.output.setReadOnly(True)
-        self.output.setMaximumHeight(200)
+
+        # Runs: a table to compare them, plus a closable console tab per run
+        self.runs_table = QTreeWidget()
+        self.runs_table.setHeaderLabels(["Run", "Status", "Exit", "Wall", "CPU", "Peak RSS"])
+        self.runs_table.setColumnWidth(0, 260)
+        self.runs_table.setRootIsDecorated(False)
+        self.runs_table.itemActivated.connect(self.show_run_output)
+        self.runs_table.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.runs_table.customContextMenuRequested.connect(self.open_runs_menu)
+        self.output_tabs = QTabWidget()
+        self.output_tabs.setTabsClosable(True)
+        self.output_tabs.tabCloseRequested.connect(self.close_output_tab)
+        for widget, title in ((self.output, "Output"), (self.runs_table, "Runs")):
+            index = self.output_tabs.addTab(widget, title)
+            for side in (QTabBar.LeftSide, QTabBar.RightSide):
+                self.output_tabs.tabBar().setTabButton(index, side, None)
+        run_limit = QSpinBox()
+        run_limit.setPrefix("Parallel runs: ")
+        run_limit.setRange(1, 64)
+        run_limit.setValue(self.runs.limit)
+        run_limit.valueChanged.connect(self.runs.set_limit)
+        self.output_tabs.setCornerWidget(run_limit)
+        self.output_tabs.setMaximumHeight(200)
         
         button_layout = QHBoxLayout()
         btn_save = QPushButton("Save File")
@@ -200,6 +1319,8 @@ class PythonProjectExplorer(QMainWindow):
         btn_run.clicked.connect(self.run_python_file)
         btn_lint = QPushButton("Lint with flake8")
         btn_lint.clicked.connect(self.lint_python_file)
+        btn_lint_project = QPushButton("Lint Project")
+        btn_lint_project.clicked.connect(self.lint_project)
         btn_create_venv = QPushButton("Create Virtual Env")
         btn_create_venv.clicked.connect(self.create_venv)
         btn_toggle_preview = QPushButton("Toggle Markdown Preview")
@@ -208,15 +1329,81 @@ class PythonProjectExplorer(QMainWindow):
         button_layout.addWidget(btn_save)
         button_layout.addWidget(btn_run)
         button_layout.addWidget(btn_lint)
+        button_layout.addWidget(btn_lint_project)
         button_layout.addWidget(btn_create_venv)
         button_layout.addWidget(btn_toggle_preview)
         
         right_layout.addWidget(self.file_info)
         right_layout.addWidget(self.editor_splitter)
-        right_layout.addWidget(self.output)
+        right_layout.addWidget(self.output_tabs)
         right_layout.addLayout(button_layout)
         right_widget.setLayout(right_layout)
         
+        # --- Problems Dock ---
+        self.problems = QTreeWidget()
+        self.problems.setHeaderLabels(["Location", "Code", "Message"])
+        self.problems.setColumnWidth(0, 260)
+        self.problems.itemActivated.connect(self.on_problem_activated)
+        self.problems.itemClicked.connect(self.on_problem_activated)
+        problems_dock = QDockWidget("Problems", self)
+        problems_dock.setWidget(self.problems)
+        self.addDockWidget(Qt.BottomDockWidgetArea, problems_dock)
+
+        # --- Find in Files Dock ---
+        find_widget = QWidget()
+        find_layout = QVBoxLayout(find_widget)
+        find_options = QHBoxLayout()
+        self.find_bar = QLineEdit()
+        self.find_bar.setPlaceholderText("Find in files...")
+        self.find_bar.returnPressed.connect(self.start_find)
+        self.find_regex = QCheckBox("Regex")
+        self.find_case = QCheckBox("Match case")
+        self.find_word = QCheckBox("Whole word")
+        btn_find = QPushButton("Find")
+        btn_find.clicked.connect(lambda: self.start_find())
+        find_options.addWidget(self.find_bar, 1)
+        for widget in (self.find_regex, self.find_case, self.find_word, btn_find):
+            find_options.addWidget(widget)
+        self.find_status = QLabel()
+        self.find_results = QTreeWidget()
+        self.find_results.setHeaderLabels(["Location", "Text"])
+        self.find_results.setColumnWidth(0, 260)
+        self.find_results.setUniformRowHeights(True)
+        self.find_results.itemActivated.connect(self.on_find_hit_activated)
+        self.find_results.itemClicked.connect(self.on_find_hit_activated)
+        find_layout.addLayout(find_options)
+        find_layout.addWidget(self.find_status)
+        find_layout.addWidget(self.find_results)
+        self.find_dock = QDockWidget("Find in Files", self)
+        self.find_dock.setWidget(find_widget)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.find_dock)
+        self.tabifyDockWidget(problems_dock, self.find_dock)
+        QShortcut(QKeySequence("Ctrl+Shift+F"), self, self.show_find)
+
+        # --- Performance Dock ---
+        self.perf_panel = PerfPanel()
+        perf_dock = QDockWidget("Performance", self)
+        perf_dock.setWidget(self.perf_panel)
+        self.addDockWidget(Qt.BottomDockWidgetArea, perf_dock)
+        self.tabifyDockWidget(problems_dock, perf_dock)
+        problems_dock.raise_()
+        perf_dock.setVisible(perf.is_enabled())
+
+        go_menu = self.menuBar().addMenu("Go")
+        go_symbol = go_menu.addAction("Go to Symbol...")
+        go_symbol.setShortcut(QKeySequence("Ctrl+T"))
+        go_symbol.triggered.connect(self.show_symbol_finder)
+        go_definition = go_menu.addAction("Go to Definition")
+        go_definition.setShortcut(QKeySequence("F12"))
+        go_definition.triggered.connect(self.go_to_definition)
+
+        view_menu = self.menuBar().addMenu("View")
+        view_menu.addAction(problems_dock.toggleViewAction())
+        view_menu.addAction(self.find_dock.toggleViewAction())
+        view_menu.addAction(perf_dock.toggleViewAction())
+        view_menu.addSeparator()
+        view_menu.addAction("Project Statistics...", self.show_project_stats)
+
         splitter.addWidget(left_widget)
         splitter.addWidget(right_widget)
         splitter.setSizes([400, 800])
@@ -224,44 +1411,60 @@ class PythonProjectExplorer(QMainWindow):
     def select_project_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Project Folder", os.getcwd())
         if folder:
-            self.model.setRootPath(folder)
-            self.tree.setRootIndex(self.model.index(folder))
+            self.set_tree_root(folder)
             self.file_info.setText("Selected project folder: " + folder)
-            self.editor.clear()
+            self.show_large_view(False)
+            self.show_editor_message()
             self.output.clear()
-            self.preview_frame.setHtml("")
-            self.preview_frame.setVisible(False)
+            self.clear_preview()
+            self.hide_preview_frame()
             self.showing_preview = False
-            self.venv_path = None
             self.check_venv()
+            self.start_search_thread()
+
+    def set_tree_root(self, folder):
+        self.engine = Engine(folder)
+        self.proxy.set_ignore_rules(shared_rules(folder))
+        self.model.setRootPath(folder)
+        self.tree.setRootIndex(self.proxy.mapFromSource(self.model.index(folder)))
+
+    def refresh_ignore_rules(self):
+        """Hides what the project's ignore files say now; shared_rules rebuilds after edits."""
+        rules = shared_rules(self.engine.root_path)
+        if rules is not self.proxy.ignore_rules:
+            self.proxy.set_ignore_rules(rules)
+
+    def changeEvent(self, event):
+        # Ignore files are edited in other programs; pick up their changes on return
+        if event.type() == QEvent.ActivationChange and self.isActiveWindow():
+            self.refresh_ignore_rules()
+        super().changeEvent(event)
+
+    def source_path(self, index):
+        """Returns the file path of a tree (proxy) index."""
+        return self.model.filePath(self.proxy.mapToSource(index))
             
     def check_venv(self):
-        venv_dirs = ['venv', '.venv']
-        root = self.model.rootPath()
-        for venv_dir in venv_dirs:
-            path = os.path.join(root, venv_dir)
-            if os.path.isdir(path):
-                self.venv_path = path
-                self.output.append(f"✅ Virtual environment found: {path}")
-                break
-        else:
-            self.venv_path = None
+        path = self.engine.detect_venv()
+        if path:
+            self.output.append(f"✅ Virtual environment found: {path}")
             
+    @perf.timed()
     def on_tree_clicked(self, index):
-        path = self.model.filePath(index)
+        self.pending_jump = None
+        path = self.source_path(index)
         if os.path.isfile(path):
             self.current_file_path = path
             self.update_file_info(path)
             if path.endswith(('.py', '.txt', '.md', '.markdown', '.ini', '.json', 'requirements.txt')):
                 self.load_file_content(path)
-                if path.endswith(('.md', '.markdown')) and self.showing_preview:
-                    self.load_markdown_preview(path)
             else:
-                self.editor.setPlainText("Binary or unsupported file.\nCannot display content.")
-                self.editor.setReadOnly(True)
+                self.show_large_view(False)
+                self.show_editor_message("Binary or unsupported file.\nCannot display content.")
         else:
             self.current_file_path = None
-            self.editor.clear()
+            self.show_large_view(False)
+            self.show_editor_message()
             self.update_file_info(path)
             
     def update_file_info(self, path):
@@ -273,46 +1476,233 @@ class PythonProjectExplorer(QMainWindow):
             info.append(f"Modified: {datetime.datetime.fromtimestamp(file_info.st_mtime).strftime('%Y-%m-%d %H:%M:%S')}")
         self.file_info.setText("\n".join(info))
         
+    @perf.timed()
     def load_file_content(self, path):
+        if os.path.getsize(path) >= LARGE_FILE_THRESHOLD:
+            self.load_large_file(path)
+            return
+        self.show_large_view(False)
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                self.editor.setPlainText(content)
-                self.editor.setReadOnly(False)
-        except Exception as e:
-            self.editor.setPlainText(f"Error loading file: {str(e)}")
-            self.editor.setReadOnly(True)
+            entry = self.document_cache.get(path, os.stat(path), keep=self.current_document)
+        except OSError as e:
+            self.show_editor_message(f"Error loading file: {str(e)}")
+            return
+        self.update_cache_label()
+        if entry is not None:
+            self.show_document(entry)
+            return
+        # Cache miss: read on the loader thread; only the latest request is shown. The
+        # previous document stays visible meanwhile, so it must not be edited or saved.
+        self.editor.setReadOnly(True)
+        self.load_request += 1
+        self.statusBar().showMessage(f"Loading {os.path.basename(path)}...")
+        self.request_file_load.emit(self.load_request, path)
+
+    @perf.timed()
+    def on_file_loaded(self, request_id, path, result, error):
+        if request_id != self.load_request:
+            return
+        self.statusBar().clearMessage()
+        if result is None:
+            self.show_editor_message(f"Error loading file: {error}")
+            return
+        content, stat = result
+        document = QTextDocument(self)
+        document.setDocumentLayout(QPlainTextDocumentLayout(document))
+        document.setDefaultFont(self.editor.font())
+        highlighter = PythonHighlighter(document)
+        document.setPlainText(content)
+        document.setModified(False)
+        entry = CachedDocument(path, document, highlighter, stat)
+        self.document_cache.put(entry, keep=self.current_document)
+        self.show_document(entry)
+
+    def remember_view_state(self):
+        if self.current_document is not None:
+            self.current_document.scroll = self.editor.verticalScrollBar().value()
+            self.current_document.cursor_position = self.editor.textCursor().position()
+
+    @perf.timed()
+    def show_document(self, entry):
+        """Puts a cached document in the editor and restores its view state."""
+        self.remember_view_state()
+        previous, self.current_document = self.current_document, entry
+        self.editor.setDocument(entry.document)
+        self.release_document(previous)
+        self.editor.setReadOnly(False)
+        cursor = QTextCursor(entry.document)
+        cursor.setPosition(min(entry.cursor_position, entry.document.characterCount() - 1))
+        self.editor.setTextCursor(cursor)
+        self.editor.verticalScrollBar().setValue(entry.scroll)
+        if self.pending_jump and self.pending_jump[0] == entry.path:
+            _, line, column = self.pending_jump
+            self.pending_jump = None
+            self.jump_to(line, column)
+        if self.showing_preview and self.is_markdown_open():
+            self.render_preview()
+
+    def jump_to(self, line, column=1):
+        """Moves the editor cursor to a 1-based line and column."""
+        block = self.editor.document().findBlockByNumber(max(0, line - 1))
+        cursor = QTextCursor(block)
+        cursor.movePosition(QTextCursor.Right, QTextCursor.MoveAnchor, min(max(0, column - 1), block.length() - 1))
+        self.editor.setTextCursor(cursor)
+        self.editor.centerCursor()
+        self.editor.setFocus()
+
+    def open_location(self, path, line, column=1):
+        """Opens a file in the editor and moves the cursor once it is shown."""
+        self.pending_jump = (path, line, column)
+        self.current_file_path = path
+        self.update_file_info(path)
+        index = self.proxy.mapFromSource(self.model.index(path))
+        if index.isValid():
+            self.tree.setCurrentIndex(index)
+        self.load_file_content(path)
+
+    def show_editor_message(self, text=""):
+        """Shows read-only text in the scratch document instead of a file."""
+        self.remember_view_state()
+        previous, self.current_document = self.current_document, None
+        self.load_request += 1  # drop any load still in flight
+        self.editor.setDocument(self.scratch_document)
+        self.release_document(previous)
+        self.scratch_document.setPlainText(text)
+        self.editor.setReadOnly(True)
+
+    def release_document(self, entry):
+        """Deletes the document of an entry the cache dropped while it was in the editor."""
+        if entry is not None and entry is not self.current_document and not self.document_cache.holds(entry):
+            entry.document.deleteLater()
+
+    def update_cache_label(self):
+        cache = self.document_cache
+        self.cache_label.setText(f"Doc cache: {cache.hits} hits / {cache.misses} misses")
             
-    def load_markdown_preview(self, path):
+    def load_large_file(self, path):
+        """Opens a file too big for the editor in the paged read-only viewer."""
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                html_content = markdown2.markdown(f.read(), extras=["fenced-code-blocks", "codehilite", "tables"])
-                self.preview_frame.setHtml(html_content)
-                self.preview_frame.setVisible(True)
+            self.large_view.open_file(path)
         except Exception as e:
-            self.preview_frame.setHtml(f"<h3>Error</h3><p>Could not load file: {str(e)}</p>")
-            self.preview_frame.setVisible(True)
-            
+            self.show_large_view(False)
+            self.show_editor_message(f"Error loading file: {str(e)}")
+            return
+        self.show_editor_message()
+        self.show_large_view(True)
+
+    def show_large_view(self, visible):
+        if not visible:
+            self.large_view.close_file()
+        self.large_view.setVisible(visible)
+        self.editor.setVisible(not visible)
+
+    def is_markdown_open(self):
+        return self.current_document is not None and self.current_document.path.endswith(('.md', '.markdown'))
+
+    def on_editor_text_changed(self):
+        if self.showing_preview and self.is_markdown_open():
+            self.preview_timer.start()
+
+    @perf.timed()
+    def render_preview(self):
+        """Renders the editor's Markdown, from the cache when the content was seen before."""
+        self.preview_timer.stop()
+        if not self.showing_preview or not self.is_markdown_open():
+            return
+        text = self.editor.toPlainText()
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        self.preview_request += 1
+        if key in self.preview_cache:
+            self.preview_cache.move_to_end(key)
+            self.show_preview_sections(self.preview_cache[key])
+            return
+        self.render_worker.latest_request = self.preview_request
+        self.request_preview_render.emit(self.preview_request, key, text)
+
+    @perf.timed()
+    def on_preview_rendered(self, request_id, key, sections):
+        self.preview_cache[key] = sections
+        if len(self.preview_cache) > 32:
+            self.preview_cache.popitem(last=False)
+        if request_id == self.preview_request and self.showing_preview:
+            self.show_preview_sections(sections)
+
+    def show_preview_sections(self, sections):
+        """Updates the preview page, patching only sections whose HTML changed."""
+        self.ensure_preview_frame().setVisible(True)
+        if not self.preview_ready:
+            self.pending_sections = sections
+            if not self.preview_loading:
+                self.preview_loading = True
+                self.preview_frame.setHtml(PREVIEW_SHELL)
+            return
+        page = self.preview_frame.page()
+        old = self.preview_sections
+        if old is not None and len(old) == len(sections):
+            for index, (before, after) in enumerate(zip(old, sections)):
+                if before != after:
+                    page.runJavaScript(f"pcPatch({index}, {json.dumps(after)})")
+        else:
+            page.runJavaScript(f"pcReplace({json.dumps(sections)})")
+        self.preview_sections = sections
+
+    def ensure_preview_frame(self):
+        """Returns the preview web view, starting QtWebEngine on first use."""
+        if self.preview_frame is None:
+            from PyQt5.QtWebEngineWidgets import QWebEngineView
+            self.preview_frame = QWebEngineView()
+            self.preview_frame.setVisible(False)
+            self.preview_frame.loadFinished.connect(self.on_preview_loaded)
+            self.editor_splitter.addWidget(self.preview_frame)
+        return self.preview_frame
+
+    def hide_preview_frame(self):
+        if self.preview_frame is not None:
+            self.preview_frame.setVisible(False)
+
+    def on_preview_loaded(self, ok):
+        if not self.preview_loading:
+            return
+        self.preview_loading = False
+        self.preview_ready = ok
+        if ok and self.pending_sections is not None:
+            sections, self.pending_sections = self.pending_sections, None
+            self.show_preview_sections(sections)
+
+    def clear_preview(self):
+        """Empties the preview page while keeping it loaded for the next render."""
+        self.preview_timer.stop()
+        self.pending_sections = None
+        if self.preview_ready and self.preview_sections:
+            self.preview_frame.page().runJavaScript("pcReplace([])")
+        self.preview_sections = []
+
     def toggle_preview(self):
         if not self.current_file_path or not self.current_file_path.endswith(('.md', '.markdown')):
             QMessageBox.information(self, "Info", "Preview is only for Markdown (.md, .markdown) files.")
             return
         self.showing_preview = not self.showing_preview
         if self.showing_preview:
-            self.load_markdown_preview(self.current_file_path)
+            self.render_preview()
             self.editor_splitter.setSizes([400, 400])
         else:
-            self.preview_frame.setHtml("")
-            self.preview_frame.setVisible(False)
+            self.clear_preview()
+            self.hide_preview_frame()
             self.editor_splitter.setSizes([800, 0])
             
     def save_file(self):
-        if self.current_file_path and not self.editor.isReadOnly():
+        # The shown document's own path: the selection may already point at a file still loading
+        entry = self.current_document
+        if entry is not None and not self.editor.isReadOnly():
             try:
-                with open(self.current_file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.editor.toPlainText())
-                if self.current_file_path.endswith(('.md', '.markdown')) and self.showing_preview:
-                    self.load_markdown_preview(self.current_file_path)
+                with open(entry.path, 'w', encoding='utf-8') as f:
+                    f.write(entry.document.toPlainText())
+                stat = os.stat(entry.path)
+                entry.mtime_ns = stat.st_mtime_ns
+                entry.size = stat.st_size
+                entry.document.setModified(False)
+                if entry.path.endswith('.py'):
+                    self.engine.file_saved(entry.path)
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to save file: {str(e)}")
                 
@@ -320,99 +1710,487 @@ class PythonProjectExplorer(QMainWindow):
         if not self.current_file_path or not self.current_file_path.endswith('.py'):
             QMessageBox.critical(self, "Error", "Please select a Python (.py) file to run.")
             return
-        if self.process.state() == QProcess.Running:
-            QMessageBox.information(self, "Info", "A process is already running.")
-            return
-        self.output.clear()
-        self.output.append(f"--- Running {os.path.basename(self.current_file_path)} ---")
-        python_cmd = sys.executable
-        if self.venv_path:
-            python_cmd = os.path.join(self.venv_path, "Scripts" if sys.platform == "win32" else "bin", "python")
-        self.process.start(python_cmd, [self.current_file_path])
+        self.run_python_files([self.current_file_path])
 
-    def handle_stdout(self):
-        data = self.process.readAllStandardOutput().data().decode(errors='ignore')
-        self.output.insertPlainText(data)
+    def run_python_files(self, paths):
+        for path in paths:
+            self.start_run(os.path.basename(path), self.engine.run_command(path))
 
-    def handle_stderr(self):
-        data = self.process.readAllStandardError().data().decode(errors='ignore')
-        self.output.insertPlainText(f"ERROR: {data}")
+    def selected_scripts(self):
+        """Returns the .py files selected in the tree."""
+        paths = (self.source_path(index) for index in self.tree.selectionModel().selectedRows())
+        return [path for path in paths if path.endswith('.py') and os.path.isfile(path)]
+
+    # --- Runs ---
+    def start_run(self, title, command, cwd=None, on_finished=None):
+        """Queues a command in the run manager, with a console tab of its own.
+
+        `on_finished` is called with the run once it has ended, whatever the outcome.
+        """
+        console = OutputConsole()
+        console.setFont(QFont("Courier New", 10))
+        self.output_tabs.addTab(console, title)
+        self.output_tabs.setCurrentWidget(console)
+        run = self.runs.submit(title, command, cwd or self.engine.root_path, console)
+        if on_finished:
+            self.run_callbacks[run] = on_finished
+        return run
+
+    @perf.timed()
+    def on_run_changed(self, run):
+        item = self.run_items.get(run)
+        if item is None:
+            item = self.run_items[run] = QTreeWidgetItem([f"#{run.number} {run.title}"])
+            item.setData(0, Qt.UserRole, run)
+            item.setToolTip(0, " ".join(run.command))
+            self.runs_table.addTopLevelItem(item)
+        stats = run.stats
+        item.setText(1, run.state)
+        item.setText(2, "" if stats.get('returncode') is None else str(stats['returncode']))
+        item.setText(3, "" if stats.get('wall_seconds') is None else f"{stats['wall_seconds']:.2f} s")
+        item.setText(4, "" if stats.get('cpu_seconds') is None else f"{stats['cpu_seconds']:.2f} s")
+        item.setText(5, "" if stats.get('peak_rss_bytes') is None
+                     else f"{stats['peak_rss_bytes'] / (1024 * 1024):.1f} MB")
+        index = self.output_tabs.indexOf(run.console)
+        if index >= 0:
+            self.output_tabs.setTabText(index, f"{RUN_STATE_MARKS[run.state]} {run.title}")
+            self.output_tabs.setTabToolTip(index, describe(stats) if stats else run.state)
+        if run.state not in ('queued', 'running') and run in self.run_callbacks:
+            self.run_callbacks.pop(run)(run)
+
+    def show_run_output(self, item):
+        """Brings up a run's console, reopening its tab if it was closed."""
+        run = item.data(0, Qt.UserRole)
+        if self.output_tabs.indexOf(run.console) < 0:
+            self.output_tabs.addTab(run.console, run.title)
+            self.on_run_changed(run)
+        self.output_tabs.setCurrentWidget(run.console)
+
+    def close_output_tab(self, index):
+        console = self.output_tabs.widget(index)
+        if console in (self.output, self.runs_table):
+            return
+        run = next((run for run in self.run_items if run.console is console), None)
+        if run and run.state in ('queued', 'running'):
+            reply = QMessageBox.question(self, "Stop Run", f"{run.title} is still running. Stop it?",
+                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+            self.runs.stop(run)
+        # The console stays with the run; the Runs table can bring it back
+        self.output_tabs.removeTab(index)
+
+    def open_runs_menu(self, position):
+        item = self.runs_table.itemAt(position)
+        menu = QMenu()
+        if item:
+            run = item.data(0, Qt.UserRole)
+            menu.addAction("Show Output", lambda: self.show_run_output(item))
+            if run.state in ('queued', 'running'):
+                menu.addAction("Stop", lambda: self.runs.stop(run))
+            else:
+                menu.addAction("Run Again", lambda: self.start_run(run.title, run.command, run.cwd))
+            menu.addSeparator()
+        menu.addAction("Clear Finished Runs", self.clear_finished_runs)
+        menu.exec_(self.runs_table.viewport().mapToGlobal(position))
 
-    def on_process_finished(self):
-        self.output.append("\n--- Script finished ---")
+    def clear_finished_runs(self):
+        for run, item in list(self.run_items.items()):
+            # A stopped run may still be winding down and writing to its console
+            if run.state == 'queued' or run.process is not None:
+                continue
+            index = self.output_tabs.indexOf(run.console)
+            if index >= 0:
+                self.output_tabs.removeTab(index)
+            self.runs_table.takeTopLevelItem(self.runs_table.indexOfTopLevelItem(item))
+            run.console.stop_log()
+            run.console.deleteLater()
+            del self.run_items[run]
 
     def lint_python_file(self):
         if not self.current_file_path or not self.current_file_path.endswith('.py'):
             QMessageBox.critical(self, "Error", "Please select a Python (.py) file to lint.")
             return
+        self.start_lint([self.current_file_path])
+
+    def lint_project(self):
+        self.start_lint(None)
+
+    def start_lint(self, paths):
+        """Lints `paths` (None for the whole project) in the background."""
+        if self.lint_worker:
+            self.lint_worker.cancel()
+        self.lint_generation += 1
+        if paths is None:
+            self.problems.clear()
+            self.problem_items = {}
         self.output.clear()
         self.output.append("--- Running flake8 ---")
-        try:
-            python_cmd = sys.executable
-            if self.venv_path:
-                python_cmd = os.path.join(self.venv_path, "Scripts" if sys.platform == "win32" else "bin", "python")
-            result = subprocess.run([python_cmd, "-m", "flake8", self.current_file_path], capture_output=True, text=True, timeout=15)
-            self.output.append(result.stdout if result.stdout else "✅ No issues found.")
-        except Exception as e:
-            self.output.append(f"Error running flake8: {str(e)}")
+        lint_thread = QThread()
+        self.lint_worker = LintWorker(self.engine.lint_service(), paths, self.lint_generation, self.lint_pool)
+        self.lint_worker.moveToThread(lint_thread)
+        lint_thread.started.connect(self.lint_worker.run)
+        self.lint_worker.file_linted.connect(self.on_file_linted)
+        self.lint_worker.finished.connect(self.on_lint_finished)
+        self.lint_worker.finished.connect(lint_thread.quit)
+        self.lint_worker.finished.connect(self.lint_worker.deleteLater)
+        lint_thread.finished.connect(lint_thread.deleteLater)
+        lint_thread.finished.connect(lambda: self.lint_threads.remove(lint_thread))
+        self.lint_threads.append(lint_thread)
+        lint_thread.start()
+
+    @perf.timed()
+    def on_file_linted(self, generation, path, problems):
+        if generation != self.lint_generation:
+            return
+        old_item = self.problem_items.pop(path, None)
+        if old_item is not None:
+            self.problems.takeTopLevelItem(self.problems.indexOfTopLevelItem(old_item))
+        if not problems:
+            return
+        root = self.model.rootPath()
+        file_item = QTreeWidgetItem([f"{os.path.relpath(path, root)} ({len(problems)})", "", ""])
+        file_item.setData(0, Qt.UserRole, (path, 1, 1))
+        for problem in problems:
+            item = QTreeWidgetItem(file_item, [f"Line {problem.line}, Col {problem.col}", problem.code, problem.message])
+            item.setData(0, Qt.UserRole, (path, problem.line, problem.col))
+        self.problems.addTopLevelItem(file_item)
+        self.problem_items[path] = file_item
+
+    def on_lint_finished(self, generation, count, error):
+        if generation != self.lint_generation:
+            return
+        self.lint_worker = None
+        if error:
+            self.output.append(f"Error running flake8: {error}")
+            return
+        total = sum(item.childCount() for item in self.problem_items.values())
+        if total:
+            self.output.append(f"Found {total} issues in {len(self.problem_items)} files ({count} files checked).")
+        else:
+            self.output.append(f"✅ No issues found ({count} files checked).")
+
+    def on_problem_activated(self, item, column=0):
+        location = item.data(0, Qt.UserRole)
+        if location:
+            self.open_location(*location)
+
+    def refresh_symbols(self):
+        """Brings the symbol index up to date in the background, unless that is already running."""
+        if self.symbol_worker is not None:
+            return
+        if self.symbol_pool is None:
+            # Forking a process that runs Qt and worker threads can deadlock the child
+            self.symbol_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+        symbol_thread = QThread()
+        self.symbol_worker = SymbolWorker(self.engine, self.symbol_pool)
+        self.symbol_worker.moveToThread(symbol_thread)
+        symbol_thread.started.connect(self.symbol_worker.run)
+        self.symbol_worker.finished.connect(self.on_symbols_refreshed)
+        self.symbol_worker.finished.connect(symbol_thread.quit)
+        self.symbol_worker.finished.connect(self.symbol_worker.deleteLater)
+        symbol_thread.finished.connect(symbol_thread.deleteLater)
+        symbol_thread.finished.connect(lambda: self.symbol_threads.remove(symbol_thread))
+        self.symbol_threads.append(symbol_thread)
+        symbol_thread.start()
+
+    def on_symbols_refreshed(self, engine, error):
+        # Only one refresh runs at a time; the worker has already deleted itself
+        self.symbol_worker = None
+        if error:
+            self.statusBar().showMessage(f"Symbol indexing failed: {error}", 5000)
+        finder_open = self.symbol_finder is not None and self.symbol_finder.isVisible()
+        if engine is not self.engine:
+            # The project changed meanwhile; index the new one if someone is waiting for it
+            if finder_open or self.pending_definition:
+                self.refresh_symbols()
+            return
+        if finder_open:
+            self.symbol_finder.set_indexing(False)
+            self.symbol_finder.update_results()
+        if self.pending_definition:
+            name, from_path = self.pending_definition
+            self.pending_definition = None
+            self.show_definitions(name, from_path)
+
+    # --- Project statistics ---
+    def show_project_stats(self):
+        if self.stats_dialog is None:
+            self.stats_dialog = ProjectStatsDialog(self, self.open_location, self.refresh_stats)
+        stats = self.engine.project_stats
+        # Statistics loaded earlier in the session show at once; the refresh only catches up on changes
+        if stats.loaded and self.stats_worker is None:
+            self.stats_dialog.show_summary(stats.summary(ProjectStatsDialog.TOP_ROWS), self.engine.root_path)
+        self.refresh_stats()
+        self.stats_dialog.show()
+        self.stats_dialog.raise_()
+        self.stats_dialog.activateWindow()
+
+    def refresh_stats(self):
+        """Rescans the project statistics in the background, unless that is already running."""
+        if self.stats_dialog is not None:
+            self.stats_dialog.set_scanning(True)
+        if self.stats_worker is not None:
+            return
+        stats_thread = QThread()
+        self.stats_worker = StatsWorker(self.engine, self.search_pool, ProjectStatsDialog.TOP_ROWS)
+        self.stats_worker.moveToThread(stats_thread)
+        stats_thread.started.connect(self.stats_worker.run)
+        self.stats_worker.finished.connect(self.on_stats_refreshed)
+        self.stats_worker.finished.connect(stats_thread.quit)
+        self.stats_worker.finished.connect(self.stats_worker.deleteLater)
+        stats_thread.finished.connect(stats_thread.deleteLater)
+        stats_thread.finished.connect(lambda: self.stats_threads.remove(stats_thread))
+        self.stats_threads.append(stats_thread)
+        stats_thread.start()
+
+    def on_stats_refreshed(self, engine, summary, error):
+        # Only one scan runs at a time; the worker has already deleted itself
+        self.stats_worker = None
+        if self.stats_dialog is None or not self.stats_dialog.isVisible():
+            return
+        if engine is not self.engine:
+            # The project changed meanwhile; scan the new one instead
+            self.refresh_stats()
+            return
+        if error:
+            self.stats_dialog.status.setText(f"Scan failed: {error}")
+        elif summary is not None:
+            self.stats_dialog.show_summary(summary, self.engine.root_path)
+
+    def show_symbol_finder(self):
+        if self.symbol_finder is None:
+            self.symbol_finder = SymbolFinder(self, self.open_location)
+        self.refresh_symbols()
+        self.symbol_finder.open_for(self.engine, not self.engine.symbol_index.refreshed)
+
+    def go_to_definition(self):
+        """Jumps to the definition of the name under the editor cursor."""
+        cursor = self.editor.textCursor()
+        cursor.select(QTextCursor.WordUnderCursor)
+        name = cursor.selectedText()
+        if not name.isidentifier() or self.current_document is None:
+            return
+        if not self.engine.symbol_index.refreshed:
+            self.pending_definition = (name, self.current_file_path)
+            self.statusBar().showMessage("Indexing symbols...")
+            self.refresh_symbols()
+            return
+        self.show_definitions(name, self.current_file_path)
+
+    def show_definitions(self, name, from_path):
+        found = self.engine.definitions(name, from_path)
+        if not found:
+            self.statusBar().showMessage(f"No definition found for '{name}'", 5000)
+            return
+        self.statusBar().clearMessage()
+        if len(found) == 1:
+            symbol, path = found[0]
+            self.open_location(path, symbol.line, symbol.column + 1)
+            return
+        menu = QMenu(self)
+        root = self.engine.root_path
+        for symbol, path in found:
+            action = menu.addAction(f"{symbol.qualname} — {os.path.relpath(path, root)}:{symbol.line}")
+            action.setData((path, symbol.line, symbol.column + 1))
+        position = self.editor.viewport().mapToGlobal(self.editor.cursorRect().bottomLeft())
+        chosen = menu.exec_(position)
+        if chosen is not None:
+            self.open_location(*chosen.data())
+
+    def show_find(self):
+        self.find_dock.show()
+        self.find_dock.raise_()
+        self.find_bar.setFocus()
+        self.find_bar.selectAll()
+
+    @perf.timed()
+    def start_find(self):
+        """Runs the Find in Files query in the background, replacing earlier results."""
+        text = self.find_bar.text()
+        if self.find_worker:
+            self.find_worker.cancel()
+            self.find_worker = None
+        self.find_generation += 1
+        self.find_results.clear()
+        self.find_hit_count = 0
+        if not text:
+            self.find_status.clear()
+            return
+        options = (self.find_regex.isChecked(), self.find_case.isChecked(), self.find_word.isChecked())
+        if options[0]:
+            try:
+                re.compile(text)
+            except re.error as e:
+                self.find_status.setText(f"Invalid regular expression: {e}")
+                return
+        self.find_status.setText("Searching...")
+        find_thread = QThread()
+        self.find_worker = FindWorker(self.engine, text, options, self.find_generation, self.search_pool)
+        self.find_worker.moveToThread(find_thread)
+        find_thread.started.connect(self.find_worker.run)
+        self.find_worker.hits_found.connect(self.on_find_hits)
+        self.find_worker.finished.connect(self.on_find_finished)
+        self.find_worker.finished.connect(find_thread.quit)
+        self.find_worker.finished.connect(self.find_worker.deleteLater)
+        find_thread.finished.connect(find_thread.deleteLater)
+        find_thread.finished.connect(lambda: self.find_threads.remove(find_thread))
+        self.find_threads.append(find_thread)
+        find_thread.start()
+
+    @perf.timed()
+    def on_find_hits(self, generation, results):
+        if generation != self.find_generation:
+            return
+        root = self.engine.root_path
+        self.find_results.setUpdatesEnabled(False)
+        for path, hits, truncated in results:
+            label = f"{os.path.relpath(path, root)} ({len(hits)}{'+' if truncated else ''})"
+            file_item = QTreeWidgetItem([label, ""])
+            file_item.setData(0, Qt.UserRole, (path, 1, 1))
+            for hit in hits:
+                item = QTreeWidgetItem(file_item, [f"Line {hit.line}, Col {hit.column}", hit.snippet])
+                item.setData(0, Qt.UserRole, (path, hit.line, hit.column))
+            if truncated:
+                QTreeWidgetItem(file_item, ["", "More matches in this file are not shown"])
+            self.find_results.addTopLevelItem(file_item)
+            self.find_hit_count += len(hits)
+        self.find_results.setUpdatesEnabled(True)
+        self.find_status.setText(f"Searching... {self.find_hit_count} matches")
+
+    def on_find_finished(self, generation, error):
+        if generation != self.find_generation:
+            return
+        self.find_worker = None
+        if error:
+            self.find_status.setText(f"Search failed: {error}")
+        else:
+            self.find_status.setText(f"{self.find_hit_count} matches in {self.find_results.topLevelItemCount()} files")
+
+    def on_find_hit_activated(self, item, column=0):
+        location = item.data(0, Qt.UserRole)
+        if location:
+            self.open_location(*location)
 
     def create_venv(self):
-        venv_dir = os.path.join(self.model.rootPath(), "venv")
-        if os.path.exists(venv_dir):
+        if self.venv_run and self.venv_run.state in ('queued', 'running'):
+            QMessageBox.information(self, "Info", "A virtual environment is already being created.")
+            return
+        if os.path.exists(os.path.join(self.engine.root_path, "venv")):
             QMessageBox.warning(self, "Exists", "A 'venv' folder already exists.")
             return
-        try:
-            venv.create(venv_dir, with_pip=True)
-            self.venv_path = venv_dir
+        # ensurepip takes a while; run it like any other job instead of blocking the window
+        command = self.engine.venv_command()
+        self.venv_run = self.start_run("Create venv", command, on_finished=self.on_venv_created)
+
+    def on_venv_created(self, run):
+        venv_dir = run.command[-1]
+        self.venv_run = None
+        if run.state == 'finished' and self.engine.root_path == run.cwd:
             self.check_venv()
             QMessageBox.information(self, "Success", f"Virtual environment created at: {venv_dir}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to create virtual environment: {str(e)}")
+        elif run.state == 'failed':
+            QMessageBox.critical(self, "Error", "Failed to create virtual environment; see the run's output.")
 
     def search_files(self):
         """Triggers the search timer when text changes."""
         self.search_timer.start()
             
+    @perf.timed()
     def start_search_thread(self):
-        """Sets up and starts the background search worker."""
-        if self.search_thread and self.search_thread.isRunning():
-            return
+        """Cancels any running search and starts a background worker for the new query."""
+        if self.search_worker:
+            self.search_worker.cancel()
+            self.search_worker = None
+        self.search_generation += 1
+        self.search_matches = []
         search_text = self.search_bar.text().strip().lower()
         if not search_text:
-            self.model.setNameFilters(["*.py", "*.txt", "*.md", "*.markdown", "*.ini", "*.json", "*.zip", "requirements.txt"])
-            self.model.setNameFilterDisables(False)
+            self.proxy.clear_paths()
+            self.end_search_feedback()
             return
         self.statusBar().showMessage("Searching...")
-        QApplication.setOverrideCursor(Qt.WaitCursor)
-        self.search_thread = QThread()
-        self.search_worker = SearchWorker(self.model.rootPath(), search_text)
-        self.search_worker.moveToThread(self.search_thread)
-        self.search_thread.started.connect(self.search_worker.run)
-        self.search_worker.finished.connect(self.update_search_results)
-        self.search_worker.finished.connect(self.search_thread.quit)
+        if not QApplication.overrideCursor():
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+        search_thread = QThread()
+        self.search_worker = SearchWorker(self.engine, search_text, self.search_generation, self.search_pool)
+        self.search_worker.moveToThread(search_thread)
+        search_thread.started.connect(self.search_worker.run)
+        self.search_worker.matches_found.connect(self.update_search_results)
+        self.search_worker.finished.connect(self.on_search_finished)
+        self.search_worker.finished.connect(search_thread.quit)
         self.search_worker.finished.connect(self.search_worker.deleteLater)
-        self.search_thread.finished.connect(self.search_thread.deleteLater)
-        self.search_thread.finished.connect(self.on_search_thread_finished)
-        self.search_thread.start()
-
-    def update_search_results(self, matches):
-        """Updates the file tree filter with the search results."""
-        if matches:
-            self.model.setNameFilters(matches)
-        else:
-            self.model.setNameFilters(["*.nomatch"])
-        self.model.setNameFilterDisables(False)
+        search_thread.finished.connect(search_thread.deleteLater)
+        search_thread.finished.connect(lambda: self.on_search_thread_finished(search_thread))
+        # Keep a reference until the thread stops, even after it was cancelled
+        self.search_threads.append(search_thread)
+        search_thread.start()
+
+    @perf.timed()
+    def update_search_results(self, generation, matches):
+        """Adds a batch of streamed matches to the file tree filter."""
+        if generation != self.search_generation:
+            return
+        if not self.search_matches:
+            self.proxy.set_paths([], self.model.rootPath())
+        self.search_matches.extend(matches)
+        self.proxy.add_paths(matches)
+        self.statusBar().showMessage(f"Searching... {len(self.search_matches)} matches")
+
+    def on_search_finished(self, generation):
+        """Finalises the filter once the current search has completed."""
+        if generation != self.search_generation:
+            return
+        self.search_worker = None
+        if not self.search_matches:
+            self.proxy.set_paths([], self.model.rootPath())
+        self.end_search_feedback()
+
+    def end_search_feedback(self):
         self.statusBar().clearMessage()
-        QApplication.restoreOverrideCursor()    
+        if QApplication.overrideCursor():
+            QApplication.restoreOverrideCursor()
+
+    def on_search_thread_finished(self, thread):
+        """Drops the reference to a finished search thread."""
+        if thread in self.search_threads:
+            self.search_threads.remove(thread)
 
-    def on_search_thread_finished(self):
-        """Clears the reference to the finished search thread."""
-        self.search_thread = None
+    def closeEvent(self, event):
+        """Stops background searches before the window goes away."""
+        if self.search_worker:
+            self.search_worker.cancel()
+        if self.find_worker:
+            self.find_worker.cancel()
+        self.search_pool.shutdown(wait=False, cancel_futures=True)
+        if self.symbol_worker:
+            self.symbol_worker.cancel()
+        if self.stats_worker:
+            self.stats_worker.cancel()
+        if self.symbol_pool is not None:
+            self.symbol_pool.shutdown(wait=False, cancel_futures=True)
+        # Edits indexed since the last refresh are kept for the next session
+        self.engine.symbol_index.save()
+        if self.lint_worker:
+            self.lint_worker.cancel()
+        self.lint_pool.shutdown(wait=False, cancel_futures=True)
+        for worker, *_ in self.jobs.values():
+            worker.cancelled.set()
+        # No completion callbacks (and their message boxes) while closing
+        self.runs.run_changed.disconnect()
+        self.runs.shutdown()
+        for run in self.run_items:
+            run.console.stop_log()
+        self.output.stop_log()
+        for thread in (self.load_thread, self.render_thread):
+            thread.quit()
+            thread.wait()
+        super().closeEvent(event)
 
     def open_context_menu(self, position):
         index = self.tree.indexAt(position)
         if not index.isValid(): return
-        path = self.model.filePath(index)
+        path = self.source_path(index)
         menu = QMenu()
         if os.path.isdir(path):
             menu.addAction("New File...", lambda: self.create_new_file(path))
@@ -422,6 +2200,9 @@ class PythonProjectExplorer(QMainWindow):
         else:
             if path.endswith('.py'):
                 menu.addAction("Run Python File", self.run_python_file)
+                scripts = self.selected_scripts()
+                if len(scripts) > 1 and path in scripts:
+                    menu.addAction(f"Run {len(scripts)} Selected Files", lambda: self.run_python_files(scripts))
                 menu.addAction("Lint with flake8", self.lint_python_file)
             if path.endswith(('.md', '.markdown')):
                 menu.addAction("Toggle Markdown Preview", self.toggle_preview)
@@ -431,19 +2212,19 @@ class PythonProjectExplorer(QMainWindow):
                 menu.addAction("Zip File", lambda: self.zip_item(path))
             if path.endswith('requirements.txt'):
                  menu.addAction("Install Dependencies", lambda: self.install_requirements(path))
+                 menu.addAction("Install Dependencies (Offline)", lambda: self.install_requirements(path, True))
         menu.addSeparator()
         menu.addAction("Copy Path", lambda: QApplication.clipboard().setText(path))
         menu.addAction("Delete", lambda: self.delete_item(path))
         menu.exec_(self.tree.viewport().mapToGlobal(position))
         
-    def install_requirements(self, path):
-        if not self.venv_path:
+    def install_requirements(self, path, offline=False):
+        """Installs into the project venv, from the shared wheelhouse when it has the wheels."""
+        if not self.engine.venv_path:
             QMessageBox.critical(self, "Error", "No virtual environment found or selected.")
             return
-        self.output.clear()
-        self.output.append(f"--- Installing from {os.path.basename(path)} ---")
-        pip_cmd = os.path.join(self.venv_path, "Scripts" if sys.platform == "win32" else "bin", "pip")
-        self.process.start(pip_cmd, ["install", "-r", path])
+        title = f"pip install -r {os.path.basename(path)}" + (" (offline)" if offline else "")
+        self.start_run(title, self.engine.install_command(path, offline))
 
     def create_new_file(self, folder_path):
         file_name, ok = QInputDialog.getText(self, "New File", "Enter file name:")
@@ -470,59 +2251,142 @@ class PythonProjectExplorer(QMainWindow):
         reply = QMessageBox.question(self, "Delete", f"Are you sure you want to delete {os.path.basename(path)}?",
                                    QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
+            # Release the memory map first; an open mapping blocks deletion on Windows
+            self.show_large_view(False)
             try:
                 if os.path.isfile(path): os.remove(path)
                 else: shutil.rmtree(path)
-                self.editor.clear()
-                self.preview_frame.setHtml("")
-                self.preview_frame.setVisible(False)
+                for cached_path in list(self.document_cache.entries):
+                    if cached_path == path or cached_path.startswith(os.path.join(path, "")):
+                        self.document_cache.discard(cached_path, keep=self.current_document)
+                self.show_editor_message()
+                self.clear_preview()
+                self.hide_preview_frame()
                 self.file_info.setText("Select a file to view details")
                 QMessageBox.information(self, "Success", "Item deleted successfully")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to delete: {str(e)}")
     
-    def get_unique_path(self, path):
-        base, ext = os.path.splitext(path)
-        counter = 1
-        new_path = path
-        while os.path.exists(new_path):
-            new_path = f"{base}_{counter}{ext}"
-            counter += 1
-        return new_path
+    def run_job(self, title, job, on_success):
+        """Runs `job` on a background thread behind a cancellable progress dialog."""
+        dialog = QProgressDialog(title, "Cancel", 0, 1000, self)
+        dialog.setWindowTitle(title)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        dialog.setMinimumDuration(300)
+        job_thread = QThread()
+        self.job_count += 1
+        worker = JobWorker(self.job_count, job)
+        worker.moveToThread(job_thread)
+        # Event.set is called directly; the worker's own thread is busy running the job
+        dialog.canceled.connect(worker.cancelled.set)
+        job_thread.started.connect(worker.run)
+        worker.progress.connect(self.on_job_progress)
+        worker.finished.connect(self.on_job_finished)
+        worker.finished.connect(job_thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        job_thread.finished.connect(job_thread.deleteLater)
+        job_thread.finished.connect(lambda: self.job_threads.remove(job_thread))
+        self.jobs[worker.job_id] = (worker, dialog, title, on_success)
+        self.job_threads.append(job_thread)
+        job_thread.start()
+
+    def on_job_progress(self, job_id, fraction, text):
+        job = self.jobs.get(job_id)
+        if job:
+            _, dialog, title, _ = job
+            dialog.setValue(int(fraction * 1000))
+            dialog.setLabelText(f"{title}\n{text}")
 
+    def on_job_finished(self, job_id, result, error):
+        worker, dialog, title, on_success = self.jobs.pop(job_id)
+        dialog.close()
+        dialog.deleteLater()
+        if worker.cancelled.is_set():
+            self.statusBar().showMessage(f"{title} cancelled", 5000)
+        elif error:
+            QMessageBox.critical(self, "Error", f"{title} failed: {error}")
+        else:
+            on_success(result)
+
+    @perf.timed()
     def zip_item(self, path):
-        base_name = os.path.splitext(path)[0] if os.path.isfile(path) else path
-        zip_path = self.get_unique_path(base_name + ".zip")
-        try:
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                if os.path.isfile(path):
-                    zipf.write(path, os.path.basename(path))
-                else:
-                    for root, _, files in os.walk(path):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            arcname = os.path.relpath(file_path, os.path.dirname(path))
-                            zipf.write(file_path, arcname)
-            QMessageBox.information(self, "Success", f"Created archive: {os.path.basename(zip_path)}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to zip: {str(e)}")
-            
+        zip_path = default_zip_path(path)
+        engine = self.engine
+
+        def job(report, cancelled):
+            with perf.span("archive.zip"):
+                return engine.zip(path, zip_path, cancelled=cancelled,
+                                  progress=lambda done, total, count, members: report(
+                                      done, total, f"{count}/{members} files, {done / (1024 * 1024):.1f} MB"))
+
+        self.run_job(f"Zipping {os.path.basename(path)}", job, lambda result: QMessageBox.information(
+            self, "Success", f"Created archive: {os.path.basename(zip_path)} ({result[1]} files)"))
+
+    @perf.timed()
     def unzip_file(self, path):
         if not path.endswith('.zip'):
             QMessageBox.critical(self, "Error", "Selected file is not a zip file")
             return
-        extract_dir = os.path.splitext(path)[0]
-        extract_dir = self.get_unique_path(extract_dir)
-        try:
-            with zipfile.ZipFile(path, 'r') as zipf:
-                zipf.extractall(extract_dir)
-            QMessageBox.information(self, "Success", f"Extracted to: {extract_dir}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to unzip: {str(e)}")
+        extract_dir = default_extract_dir(path)
+        engine = self.engine
+
+        def job(report, cancelled):
+            with perf.span("archive.unzip"):
+                return engine.unzip(path, extract_dir, cancelled=cancelled,
+                                    progress=lambda done, total, count, members: report(
+                                        done, total, f"{count}/{members} files, {done / (1024 * 1024):.1f} MB"))
+
+        self.run_job(f"Unzipping {os.path.basename(path)}", job, lambda result: QMessageBox.information(
+            self, "Success", f"Extracted to: {extract_dir}"))
+
+class StartupReport(QObject):
+    """Prints where start-up time went once the main window has first painted."""
+
+    def __init__(self, window, phases):
+        super().__init__(window)
+        self.window = window
+        self.phases = phases  # (label, start, end) measured before the window was shown
+        self.shown = time.perf_counter()
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QEvent.Paint:
+            self.window.removeEventFilter(self)
+            # Report once this paint has been processed
+            QTimer.singleShot(0, self.report)
+        return False
+
+    def report(self):
+        painted = time.perf_counter()
+        lines = ["Startup report:"]
+        for label, start, end in self.phases + [("show to first paint", self.shown, painted)]:
+            lines.append(f"  {label:<22}{(end - start) * 1000:9.1f} ms")
+        lines.append(f"  {'total':<22}{(painted - STARTUP_BEGIN) * 1000:9.1f} ms")
+        # These are meant to load on first use; any listed here were pulled in at start-up
+        loaded = [name for name in ('PyQt5.QtWebEngineWidgets', 'markdown2', 'pygments') if name in sys.modules]
+        lines.append("  deferred modules loaded: " + (", ".join(loaded) if loaded else "none"))
+        print("\n".join(lines), flush=True)
 
 if __name__ == '__main__':
+    startup_report = '--startup-report' in sys.argv
+    if startup_report:
+        sys.argv.remove('--startup-report')
+    # --perf starts with instrumentation recording, so start-up work shows up too
+    if '--perf' in sys.argv:
+        sys.argv.remove('--perf')
+        perf.set_enabled(True)
+    # Importing QtWebEngine after the QApplication exists requires shared GL contexts
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app_start = time.perf_counter()
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
+    window_start = time.perf_counter()
     window = PythonProjectExplorer()
+    window_built = time.perf_counter()
+    if startup_report:
+        StartupReport(window, [("imports", STARTUP_BEGIN, STARTUP_IMPORTED),
+                               ("QApplication", app_start, window_start),
+                               ("window construction", window_start, window_built)])
     window.show()
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,233 @@
+import os
+import zlib
+import shutil
+import zipfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+
+from ignore_rules import shared_rules
+
+# Formats that are already compressed gain nothing from deflate, so they are stored
+STORED_EXTENSIONS = {
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.7z', '.rar', '.whl', '.jar', '.egg',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.mp3', '.ogg', '.flac', '.mp4',
+    '.mkv', '.avi', '.mov', '.webm', '.pdf', '.docx', '.xlsx', '.pptx', '.woff', '.woff2',
+}
+COMPRESS_LEVEL = 6
+# Members at least this big are streamed by zipfile on the writer thread rather
+# than compressed whole in memory by a pool worker
+MAX_PARALLEL_MEMBER = 16 * 1024 * 1024
+# Read buffer per extracting worker; bounds memory however large the members are
+EXTRACT_CHUNK = 1024 * 1024
+
+
+class ArchiveCancelled(Exception):
+    """Raised when an archive job is cancelled; partial output is removed."""
+
+
+def collect_members(path, rules=None):
+    """Returns (file_path, arcname, size) for every file to archive under `path`.
+
+    Ignored files and directories are skipped, using `rules` or else the ignore
+    rules of the folder being archived.
+    """
+    if os.path.isfile(path):
+        return [(path, os.path.basename(path), os.path.getsize(path))]
+    rules = rules or shared_rules(path)
+    members = []
+    base = os.path.dirname(path)
+    for root, _, files in rules.walk(path):
+        for file in files:
+            file_path = os.path.join(root, file)
+            try:
+                members.append((file_path, os.path.relpath(file_path, base), os.path.getsize(file_path)))
+            except OSError:
+                continue
+    return members
+
+
+def compress_member(file_path):
+    """Reads and compresses one file; returns (raw size, crc, compress type, data)."""
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    crc = zlib.crc32(raw)
+    if os.path.splitext(file_path)[1].lower() not in STORED_EXTENSIONS:
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -15)
+        data = compressor.compress(raw) + compressor.flush()
+        if len(data) < len(raw):
+            return len(raw), crc, zipfile.ZIP_DEFLATED, data
+    return len(raw), crc, zipfile.ZIP_STORED, raw
+
+
+def write_compressed(zf, file_path, arcname, compressed):
+    """Appends an already compressed member to an open ZipFile.
+
+    Mirrors what ZipFile.write does for directory entries: the local header and
+    data go straight to the archive and the entry is registered for the central
+    directory, which ZipFile writes on close.
+    """
+    size, crc, compress_type, data = compressed
+    zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+    zinfo.compress_type = compress_type
+    zinfo.file_size = size
+    zinfo.compress_size = len(data)
+    zinfo.CRC = crc
+    zip64 = size > zipfile.ZIP64_LIMIT or len(data) > zipfile.ZIP64_LIMIT
+    zinfo.header_offset = zf.fp.tell()
+    zf._writecheck(zinfo)
+    zf._didModify = True
+    zf.fp.write(zinfo.FileHeader(zip64))
+    zf.fp.write(data)
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[zinfo.filename] = zinfo
+    zf.start_dir = zf.fp.tell()
+
+
+def create_zip(path, zip_path, rules=None, workers=None, progress=None, cancelled=None):
+    """Archives a file or folder into `zip_path`, compressing members in parallel.
+
+    Members are compressed on a thread pool (zlib releases the GIL) a bounded
+    window ahead of the writer, which appends them in order. `progress` is called
+    as progress(done_bytes, total_bytes, done_members, total_members). Returns the
+    number of members written.
+    """
+    members = collect_members(path, rules)
+    total_bytes = sum(size for _, _, size in members)
+    done_bytes = 0
+    workers = workers or os.cpu_count() or 1
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool, \
+                zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL) as zf:
+            window = deque()
+            pending = iter(members)
+
+            def fill():
+                while len(window) < workers * 2:
+                    member = next(pending, None)
+                    if member is None:
+                        return
+                    file_path, _, size = member
+                    future = pool.submit(compress_member, file_path) if size < MAX_PARALLEL_MEMBER else None
+                    window.append((member, future))
+
+            fill()
+            for count in range(1, len(members) + 1):
+                if cancelled is not None and cancelled.is_set():
+                    for _, future in window:
+                        if future:
+                            future.cancel()
+                    raise ArchiveCancelled()
+                (file_path, arcname, size), future = window.popleft()
+                fill()
+                if future is None:
+                    compress_type = (zipfile.ZIP_STORED if os.path.splitext(file_path)[1].lower() in STORED_EXTENSIONS
+                                     else zipfile.ZIP_DEFLATED)
+                    zf.write(file_path, arcname, compress_type)
+                else:
+                    write_compressed(zf, file_path, arcname, future.result())
+                done_bytes += size
+                if progress:
+                    progress(done_bytes, total_bytes, count, len(members))
+    except BaseException:
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+        raise
+    return len(members)
+
+
+def member_target(extract_dir, info):
+    """Maps a member to a path inside `extract_dir`, dropping drive, absolute and '..' parts."""
+    arcname = info.filename.replace('/', os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    parts = [part for part in arcname.split(os.path.sep) if part not in ('', os.path.curdir, os.path.pardir)]
+    return os.path.join(extract_dir, *parts) if parts else None
+
+
+def extract_zip(zip_path, extract_dir, workers=None, progress=None, cancelled=None):
+    """Extracts an archive with members streamed to disk concurrently.
+
+    Each pool worker opens its own handle on the archive and copies members in
+    EXTRACT_CHUNK reads. `progress` is called from this thread as
+    progress(done_bytes, total_bytes, done_members, total_members). On failure or
+    cancellation `extract_dir` is removed if this call created it. Returns the
+    number of members extracted.
+    """
+    created = not os.path.exists(extract_dir)
+    with zipfile.ZipFile(zip_path) as zf:
+        infos = zf.infolist()
+    files = []
+    for info in infos:
+        target = member_target(extract_dir, info)
+        if target is None:
+            continue
+        if info.is_dir():
+            os.makedirs(target, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            files.append((info, target))
+    # Largest members first so one huge file does not start last
+    files.sort(key=lambda item: item[0].file_size, reverse=True)
+    total_bytes = sum(info.file_size for info, _ in files)
+    lock = threading.Lock()
+    done = {'bytes': 0, 'members': 0}
+    handles = threading.local()
+    opened = []
+    # Set when a member fails; the caller's `cancelled` is only ever read, so a
+    # failure is not mistaken for a cancellation
+    stop = threading.Event()
+
+    def stopped():
+        return stop.is_set() or (cancelled is not None and cancelled.is_set())
+
+    def extract(item):
+        info, target = item
+        if stopped():
+            return
+        if not hasattr(handles, 'zf'):
+            handles.zf = zipfile.ZipFile(zip_path)
+            with lock:
+                opened.append(handles.zf)
+        with handles.zf.open(info) as src, open(target, 'wb') as dst:
+            while not stopped():
+                chunk = src.read(EXTRACT_CHUNK)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                with lock:
+                    done['bytes'] += len(chunk)
+        with lock:
+            done['members'] += 1
+
+    def report():
+        if progress:
+            with lock:
+                progress(done['bytes'], total_bytes, done['members'], len(files))
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1)) as pool:
+            futures = [pool.submit(extract, item) for item in files]
+            pending = set(futures)
+            while pending:
+                finished, pending = wait(pending, timeout=0.1, return_when=FIRST_EXCEPTION)
+                report()
+                for future in finished:
+                    if future.exception() is not None:
+                        stop.set()
+                        raise future.exception()
+                if stopped():
+                    for future in pending:
+                        future.cancel()
+            if stopped():
+                raise ArchiveCancelled()
+    except BaseException:
+        if created:
+            shutil.rmtree(extract_dir, ignore_errors=True)
+        raise
+    finally:
+        for handle in opened:
+            handle.close()
+    report()
+    return len(files)
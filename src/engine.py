@@ -0,0 +1,503 @@
+import os
+import sys
+import json
+import shlex
+import venv
+import tempfile
+import argparse
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from search_index import ContentIndex, compile_query
+from lint_service import LintService
+from symbol_index import SymbolIndex
+from project_stats import ProjectStats, format_bytes
+from archive import create_zip, extract_zip
+from ignore_rules import shared_rules
+from run_stats import run_with_stats
+import wheelhouse
+
+# Folders checked, in order, for a project's virtual environment
+VENV_DIRS = ('venv', '.venv')
+
+
+def venv_executable(venv_path, name):
+    """Returns the path of an executable inside a virtual environment."""
+    return os.path.join(venv_path, "Scripts" if sys.platform == "win32" else "bin", name)
+
+
+def find_venv(root_path):
+    """Returns the project's virtual environment folder, or None."""
+    for venv_dir in VENV_DIRS:
+        path = os.path.join(root_path, venv_dir)
+        if os.path.isdir(path):
+            return path
+    return None
+
+
+def unique_path(path):
+    """Returns `path`, or `path` with a _N suffix if it already exists."""
+    base, ext = os.path.splitext(path)
+    counter = 1
+    new_path = path
+    while os.path.exists(new_path):
+        new_path = f"{base}_{counter}{ext}"
+        counter += 1
+    return new_path
+
+
+def default_zip_path(path):
+    base_name = os.path.splitext(path)[0] if os.path.isfile(path) else path.rstrip(os.sep)
+    return unique_path(base_name + ".zip")
+
+
+def default_extract_dir(zip_path):
+    return unique_path(os.path.splitext(zip_path)[0])
+
+
+class Engine:
+    """The operations of the explorer on one project, independent of any UI.
+
+    The GUI is a client of this class, and `main` exposes it on the command line.
+    The content index and lint results are kept between calls, so an engine
+    reused for several operations (as in batch mode) only redoes changed work.
+    """
+
+    def __init__(self, root_path):
+        self.root_path = os.path.abspath(root_path)
+        self.content_index = ContentIndex(self.root_path)
+        self.symbol_index = SymbolIndex(self.root_path)
+        self.project_stats = ProjectStats(self.root_path)
+        self.venv_path = find_venv(self.root_path)
+        self._lint_service = None
+
+    # --- Environment ---
+    def detect_venv(self):
+        self.venv_path = find_venv(self.root_path)
+        return self.venv_path
+
+    def python_command(self):
+        """Returns the interpreter of the project's venv, or the running one."""
+        if self.venv_path:
+            return venv_executable(self.venv_path, "python")
+        return sys.executable
+
+    def create_venv(self, name="venv"):
+        """Creates a venv with pip in the project; returns its path."""
+        venv_dir = os.path.join(self.root_path, name)
+        if os.path.exists(venv_dir):
+            raise FileExistsError(f"'{name}' already exists")
+        venv.create(venv_dir, with_pip=True)
+        self.detect_venv()
+        return venv_dir
+
+    def venv_command(self, name="venv"):
+        """Returns the command line that creates a venv with pip in the project, for a background run."""
+        venv_dir = os.path.join(self.root_path, name)
+        if os.path.exists(venv_dir):
+            raise FileExistsError(f"'{name}' already exists")
+        return [sys.executable, "-m", "venv", venv_dir]
+
+    def run_command(self, script, args=()):
+        """Returns the command line that runs a script with the project interpreter."""
+        return [self.python_command(), script, *args]
+
+    def install_command(self, requirements, offline=False):
+        """Returns the command line that installs a requirements file into the venv.
+
+        Wheels come from the shared wheelhouse first (see wheelhouse.install);
+        `offline` never contacts a package index.
+        """
+        if not self.venv_path:
+            raise RuntimeError("No virtual environment found in the project")
+        command = [sys.executable, wheelhouse.SCRIPT_PATH, "--python", venv_executable(self.venv_path, "python")]
+        if offline:
+            command.append("--offline")
+        return command + [requirements]
+
+    def install(self, requirements, offline=False, stdout=None):
+        """Installs a requirements file into the venv now; returns pip's exit code."""
+        if not self.venv_path:
+            raise RuntimeError("No virtual environment found in the project")
+        return wheelhouse.install(venv_executable(self.venv_path, "python"), os.path.abspath(requirements),
+                                  offline=offline, cwd=self.root_path, stdout=stdout)
+
+    # --- Search ---
+    def search_batches(self, text, executor=None, cancelled=None):
+        """Yields lists of files containing `text`, refreshing the content index on the way.
+
+        The index is searched as it stands first, so the first results never wait
+        for the tree walk; the files the refresh then finds new or changed are
+        searched after it. Matching ignores case and surrounding whitespace, as
+        in the search bar.
+        """
+        text = text.strip().lower()
+        if not text:
+            return
+        index = self.content_index
+        try:
+            found = set()
+            for batch in index.search_batches(text, executor, cancelled):
+                found.update(batch)
+                yield batch
+            changed = set()
+            if index.refresh(executor, cancelled, changed) and changed - found:
+                yield from index.search_batches(text, executor, cancelled, only=changed - found)
+        finally:
+            index.save()
+
+    def search(self, text, executor=None, cancelled=None):
+        matches = []
+        for batch in self.search_batches(text, executor, cancelled):
+            matches.extend(batch)
+        return sorted(matches)
+
+    def find_batches(self, text, regex=False, case_sensitive=False, whole_word=False,
+                     executor=None, cancelled=None):
+        """Yields lists of (path, hits, truncated), refreshing the content index as search_batches does.
+
+        Raises re.error up front if `text` is not a valid regular expression.
+        """
+        pattern = compile_query(text, regex, case_sensitive, whole_word)
+        index = self.content_index
+        try:
+            found = set()
+            for batch in index.find_batches(text, pattern, regex, executor, cancelled):
+                found.update(path for path, _, _ in batch)
+                yield batch
+            changed = set()
+            if index.refresh(executor, cancelled, changed) and changed - found:
+                yield from index.find_batches(text, pattern, regex, executor, cancelled, only=changed - found)
+        finally:
+            index.save()
+
+    def find(self, text, regex=False, case_sensitive=False, whole_word=False, executor=None, cancelled=None):
+        """Returns [(path, hits, truncated)] sorted by path."""
+        results = []
+        for batch in self.find_batches(text, regex, case_sensitive, whole_word, executor, cancelled):
+            results.extend(batch)
+        return sorted(results)
+
+    # --- Symbols ---
+    def refresh_symbols(self, executor=None, cancelled=None):
+        """Updates the symbol index (parsing on `executor`, ideally a process pool) and saves it."""
+        try:
+            return self.symbol_index.refresh(executor, cancelled)
+        finally:
+            self.symbol_index.save()
+
+    # --- Statistics ---
+    def statistics(self, top=20, executor=None, cancelled=None):
+        """Refreshes the project statistics incrementally and returns their summary (see ProjectStats)."""
+        try:
+            self.project_stats.refresh(executor, cancelled)
+        finally:
+            self.project_stats.save()
+        return self.project_stats.summary(top)
+
+    def find_symbols(self, query, limit=100):
+        """Returns fuzzy matches of `query` as (symbol, path); call refresh_symbols first."""
+        return self.symbol_index.find(query, limit)
+
+    def definitions(self, name, from_path=None):
+        """Returns where `name`, as used in `from_path`, is defined, as (symbol, path)."""
+        return self.symbol_index.definitions(name, from_path)
+
+    def file_saved(self, path):
+        """Keeps the per-file indexes current after the editor wrote `path`."""
+        self.symbol_index.update_file(path)
+
+    # --- Lint ---
+    def lint_service(self):
+        """Returns the lint service for the current interpreter, reusing its cache."""
+        python_cmd = self.python_command()
+        if self._lint_service is None or self._lint_service.python_cmd != python_cmd:
+            self._lint_service = LintService(self.root_path, python_cmd)
+        return self._lint_service
+
+    def lint(self, paths=None, executor=None, cancelled=None):
+        """Returns {path: problems} for `paths`, or every Python file of the project."""
+        service = self.lint_service()
+        try:
+            return dict(service.lint(paths, executor, cancelled))
+        finally:
+            service.save()
+
+    # --- Archives ---
+    def zip(self, path, zip_path=None, progress=None, cancelled=None):
+        """Archives a file or folder; returns (zip path, member count).
+
+        Paths inside the project honour its ignore rules; the archive defaults
+        to a free name next to `path`.
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No such file or folder: {path}")
+        zip_path = zip_path or default_zip_path(path)
+        inside_project = os.path.abspath(path).startswith(os.path.join(self.root_path, ""))
+        rules = shared_rules(self.root_path) if inside_project else None
+        return zip_path, create_zip(path, zip_path, rules=rules, progress=progress, cancelled=cancelled)
+
+    def unzip(self, zip_path, extract_dir=None, progress=None, cancelled=None):
+        """Extracts an archive; returns (folder, member count)."""
+        if not zip_path.endswith('.zip'):
+            raise ValueError(f"{os.path.basename(zip_path)} is not a zip file")
+        extract_dir = extract_dir or default_extract_dir(zip_path)
+        return extract_dir, extract_zip(zip_path, extract_dir, progress=progress, cancelled=cancelled)
+
+    # --- Run ---
+    def run(self, script, args=(), capture=False):
+        """Runs a script with the project interpreter from the project folder.
+
+        Returns a dict with the exit code, wall time, CPU time and peak RSS of
+        the script (None where the platform cannot tell), plus the output when
+        `capture` is set; otherwise output goes to this process's streams.
+        """
+        command = self.run_command(script, args)
+        if not capture:
+            stats = run_with_stats(command, cwd=self.root_path)
+            return {'script': script, 'seconds': stats.pop('wall_seconds'), **stats}
+        # Files rather than pipes: the child is reaped with its own resource usage
+        with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+            stats = run_with_stats(command, cwd=self.root_path, stdout=stdout, stderr=stderr)
+            outcome = {'script': script, 'seconds': stats.pop('wall_seconds'), **stats}
+            for name, stream in (('stdout', stdout), ('stderr', stderr)):
+                stream.seek(0)
+                outcome[name] = stream.read().decode(errors='replace')
+        return outcome
+
+
+# --- Command line ---
+def build_parser():
+    parser = argparse.ArgumentParser(prog="engine.py", description="PyCentric project operations without the GUI.")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="list files containing some text")
+    search.add_argument("project")
+    search.add_argument("text")
+
+    find = commands.add_parser("find", help="list matching lines, with line and column")
+    find.add_argument("project")
+    find.add_argument("pattern")
+    find.add_argument("--regex", action="store_true", help="treat PATTERN as a regular expression")
+    find.add_argument("--case", action="store_true", help="match case")
+    find.add_argument("--word", action="store_true", help="match whole words only")
+
+    symbols = commands.add_parser("symbols", help="fuzzy-find classes, functions and modules")
+    symbols.add_argument("project")
+    symbols.add_argument("query")
+    symbols.add_argument("--limit", type=int, default=50)
+
+    definition = commands.add_parser("definition", help="show where a name is defined")
+    definition.add_argument("project")
+    definition.add_argument("name")
+    definition.add_argument("--from", dest="from_file", help="file the name is used in")
+
+    stats = commands.add_parser("stats", help="lines per language, folder sizes, largest and duplicate files")
+    stats.add_argument("project")
+    stats.add_argument("--top", type=int, default=20, help="rows per table (default: 20)")
+
+    lint = commands.add_parser("lint", help="run flake8 over the project or some of its files")
+    lint.add_argument("project")
+    lint.add_argument("files", nargs="*")
+
+    zip_cmd = commands.add_parser("zip", help="archive a file or folder")
+    zip_cmd.add_argument("path")
+    zip_cmd.add_argument("-o", "--output", help="archive path (default: next to PATH)")
+    zip_cmd.add_argument("--project", help="project whose ignore rules apply (default: PATH's folder)")
+
+    unzip = commands.add_parser("unzip", help="extract an archive")
+    unzip.add_argument("archive")
+    unzip.add_argument("-o", "--output", help="target folder (default: next to ARCHIVE)")
+
+    run = commands.add_parser("run", help="run a script with the project's interpreter")
+    run.add_argument("project")
+    run.add_argument("script")
+    run.add_argument("args", nargs=argparse.REMAINDER)
+
+    venv_cmd = commands.add_parser("venv", help="create a virtual environment in the project")
+    venv_cmd.add_argument("project")
+    venv_cmd.add_argument("--name", default="venv")
+
+    install = commands.add_parser("install", help="install requirements into the project's venv, wheelhouse first")
+    install.add_argument("project")
+    install.add_argument("requirements")
+    install.add_argument("--offline", action="store_true", help="only use wheels already in the wheelhouse")
+
+    batch = commands.add_parser("batch", help="run one command per line from a file ('-' for stdin)")
+    batch.add_argument("file")
+    return parser
+
+
+class CommandRunner:
+    """Executes parsed commands, sharing engines and worker pools between them."""
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.engines = {}
+        self._process_pool = None
+
+    def process_pool(self):
+        if self._process_pool is None:
+            # Spawned, not forked: this process already runs pool threads
+            self._process_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+        return self._process_pool
+
+    def close(self):
+        if self._process_pool is not None:
+            self._process_pool.shutdown(cancel_futures=True)
+
+    def engine(self, project):
+        root = os.path.abspath(project)
+        if not os.path.isdir(root):
+            raise NotADirectoryError(f"No such project folder: {project}")
+        if root not in self.engines:
+            self.engines[root] = Engine(root)
+        return self.engines[root]
+
+    def execute(self, args):
+        """Runs one command; returns (exit code, JSON-able result, text lines)."""
+        if args.command == "search":
+            matches = self.engine(args.project).search(args.text, self.executor)
+            return (0 if matches else 1), {'matches': matches}, matches
+        if args.command == "find":
+            engine = self.engine(args.project)
+            results = engine.find(args.pattern, args.regex, args.case, args.word, self.executor)
+            lines = []
+            files = {}
+            for path, hits, truncated in results:
+                rel_path = os.path.relpath(path, engine.root_path)
+                lines += [f"{rel_path}:{hit.line}:{hit.column}: {hit.snippet}" for hit in hits]
+                if truncated:
+                    lines.append(f"{rel_path}: more matches not shown")
+                files[path] = {'hits': [hit._asdict() for hit in hits], 'truncated': truncated}
+            return (0 if results else 1), {'files': files}, lines
+        if args.command in ("symbols", "definition"):
+            engine = self.engine(args.project)
+            engine.refresh_symbols(self.process_pool())
+            if args.command == "symbols":
+                found = engine.find_symbols(args.query, args.limit)
+            else:
+                found = engine.definitions(args.name, args.from_file)
+            lines = [f"{os.path.relpath(path, engine.root_path)}:{symbol.line}:{symbol.column + 1}: "
+                     f"{symbol.kind} {symbol.qualname}" for symbol, path in found]
+            symbols = [dict(symbol._asdict(), path=path) for symbol, path in found]
+            return (0 if found else 1), {'symbols': symbols}, lines
+        if args.command == "stats":
+            summary = self.engine(args.project).statistics(args.top, self.executor)
+            lines = [f"{summary['files']} files, {format_bytes(summary['bytes'])}", "", "Languages:"]
+            lines += [f"  {name:<18}{files:>8} files{code_lines:>10} lines{blank:>9} blank{format_bytes(size):>12}"
+                      for name, files, code_lines, blank, size in summary['languages']]
+            lines += ["", "Largest folders:"]
+            lines += [f"  {format_bytes(size):>10}  {files:>7} files  {folder}" for folder, size, files in summary['directories']]
+            lines += ["", "Largest files:"]
+            lines += [f"  {format_bytes(size):>10}  {path}" for path, size in summary['largest']]
+            lines += ["", f"Duplicates ({format_bytes(summary['wasted_bytes'])} reclaimable):"]
+            for size, paths in summary['duplicates']:
+                lines.append(f"  {len(paths)} x {format_bytes(size)}")
+                lines += [f"      {path}" for path in paths]
+            return 0, summary, lines
+        if args.command == "lint":
+            engine = self.engine(args.project)
+            paths = [os.path.abspath(path) for path in args.files] or None
+            results = engine.lint(paths, self.executor)
+            lines = [f"{os.path.relpath(path, engine.root_path)}:{p.line}:{p.col}: {p.code} {p.message}"
+                     for path in sorted(results) for p in results[path]]
+            problems = {path: [p._asdict() for p in found] for path, found in sorted(results.items()) if found}
+            return (1 if lines else 0), {'files': len(results), 'problems': problems}, lines
+        if args.command == "zip":
+            path = os.path.abspath(args.path)
+            engine = self.engine(args.project or os.path.dirname(path))
+            zip_path, count = engine.zip(path, args.output)
+            return 0, {'archive': zip_path, 'members': count}, [f"Created archive: {zip_path} ({count} files)"]
+        if args.command == "unzip":
+            archive = os.path.abspath(args.archive)
+            extract_dir, count = self.engine(os.path.dirname(archive)).unzip(archive, args.output)
+            return 0, {'folder': extract_dir, 'members': count}, [f"Extracted {count} files to: {extract_dir}"]
+        if args.command == "run":
+            outcome = self.engine(args.project).run(args.script, args.args, capture=args.json)
+            return outcome['returncode'], outcome, []
+        if args.command == "venv":
+            venv_dir = self.engine(args.project).create_venv(args.name)
+            return 0, {'venv': venv_dir}, [f"Virtual environment created at: {venv_dir}"]
+        if args.command == "install":
+            engine = self.engine(args.project)
+            engine.detect_venv()
+            # In JSON mode pip's output goes to stderr, keeping stdout one record per line
+            code = engine.install(args.requirements, args.offline, sys.stderr if args.json else None)
+            return code, {'requirements': args.requirements, 'offline': args.offline}, []
+        raise ValueError(f"Unknown command: {args.command}")
+
+
+def exit_status(code):
+    """Maps the -N of a program killed by a signal to the shell's 128 + N."""
+    return code if code >= 0 else 128 - code
+
+
+def emit(as_json, command, code, result, lines, error=None):
+    if as_json:
+        # The record reports the status the process itself exits with
+        record = {'command': command, 'exit_code': exit_status(code), 'result': result}
+        if error:
+            record['error'] = error
+        print(json.dumps(record), flush=True)
+    else:
+        for line in lines:
+            print(line)
+        if error:
+            print(f"error: {error}", file=sys.stderr)
+
+
+def run_batch(parser, runner, source, as_json):
+    """Runs every non-empty, non-comment line of `source` as a command; returns the worst exit code."""
+    worst = 0
+    for line in source:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            args = parser.parse_args(shlex.split(line))
+        except SystemExit:
+            emit(as_json, line, 2, None, [], "invalid command")
+            worst = max(worst, 2)
+            continue
+        if args.command == "batch":
+            emit(as_json, line, 2, None, [], "batch files cannot be nested")
+            worst = max(worst, 2)
+            continue
+        args.json = as_json
+        try:
+            code, result, lines = runner.execute(args)
+            emit(as_json, line, code, result, lines)
+        except Exception as e:
+            code = 2
+            emit(as_json, line, code, None, [], str(e) or type(e).__name__)
+        # Signal-killed programs report negative codes; they must still count as failures
+        worst = max(worst, exit_status(code))
+    return worst
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4)) as executor:
+        runner = CommandRunner(executor)
+        try:
+            if args.command == "batch":
+                if args.file == "-":
+                    return run_batch(parser, runner, sys.stdin, args.json)
+                with open(args.file, 'r', encoding='utf-8') as f:
+                    return run_batch(parser, runner, f, args.json)
+            try:
+                code, result, lines = runner.execute(args)
+            except Exception as e:
+                emit(args.json, args.command, 2, None, [], str(e) or type(e).__name__)
+                return 2
+            emit(args.json, args.command, code, result, lines)
+            return exit_status(code)
+        finally:
+            runner.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+import os
+import re
+import threading
+
+# Always ignored, in .gitignore syntax: environments, VCS metadata and caches
+DEFAULT_PATTERNS = ('venv/', '.venv/', '.git/', 'node_modules/', '__pycache__/', '*.pyc')
+# Project-specific patterns on top of .gitignore, same syntax
+USER_IGNORE_FILE = '.pycentricignore'
+
+
+def file_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def glob_to_regex(glob):
+    """Translates a .gitignore glob (without leading/trailing slashes) to a regex."""
+    out = []
+    i = 0
+    while i < len(glob):
+        char = glob[i]
+        if glob.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if glob.startswith('/**', i) and i + 3 == len(glob):
+            out.append('/.*')
+            i += 3
+            continue
+        if char == '*':
+            out.append('.*' if glob.startswith('**', i) else '[^/]*')
+            i += 2 if glob.startswith('**', i) else 1
+            continue
+        if char == '?':
+            out.append('[^/]')
+        elif char == '[':
+            end = glob.find(']', i + 2)
+            if end < 0:
+                out.append(re.escape(char))
+            else:
+                body = glob[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif char == '\\' and i + 1 < len(glob):
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return ''.join(out)
+
+
+class IgnoreRules:
+    """Compiled ignore rules for a project: defaults, .gitignore files and user patterns.
+
+    Paths are matched relative to the project root. Rules without negations are
+    folded into a single regex per kind (any entry / directories only); with
+    negations the last matching rule wins, as in git. `walk` prunes ignored
+    directories before descending into them and picks up nested .gitignore files
+    on the way. Matching takes no lock: rules added by another thread are
+    published as a whole, in one attribute assignment.
+    """
+
+    def __init__(self, root_path, extra_patterns=()):
+        self.root_path = os.path.abspath(root_path)
+        self.rules = []  # (regex, negate, dir_only)
+        # (ordered rules or None without negations, any entry regex, directory regex)
+        self.matcher = (None, None, None)
+        self.loaded_dirs = {}  # folder -> mtime_ns of its .gitignore when loaded, None if absent
+        self.lock = threading.Lock()
+        self.add_patterns(DEFAULT_PATTERNS)
+        self.load_ignore_file(self.root_path)
+        self.add_patterns(self.read_lines(os.path.join(self.root_path, USER_IGNORE_FILE)))
+        self.add_patterns(extra_patterns)
+
+    @staticmethod
+    def read_lines(path):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read().splitlines()
+        except OSError:
+            return []
+
+    def load_ignore_file(self, folder):
+        """Adds the rules of `folder`/.gitignore once; they apply below that folder."""
+        path = os.path.join(folder, '.gitignore')
+        with self.lock:
+            if folder in self.loaded_dirs:
+                return
+            self.loaded_dirs[folder] = file_mtime(path)
+        base = os.path.relpath(folder, self.root_path).replace(os.sep, '/')
+        self.add_patterns(self.read_lines(path), '' if base == '.' else base)
+
+    def ignore_files_changed(self):
+        """Returns True if a .gitignore loaded so far was edited, created or removed since."""
+        with self.lock:
+            loaded = list(self.loaded_dirs.items())
+        return any(file_mtime(os.path.join(folder, '.gitignore')) != mtime for folder, mtime in loaded)
+
+    def add_patterns(self, lines, base=''):
+        """Adds .gitignore-style patterns relative to the `base` folder."""
+        rules = []
+        prefix = re.escape(base + '/') if base else ''
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            # A leading or inner slash anchors the pattern to its base folder
+            anchored = '/' in line
+            line = line.lstrip('/')
+            if not line:
+                continue
+            pattern = glob_to_regex(line)
+            regex = prefix + (pattern if anchored else '(?:.*/)?' + pattern)
+            rules.append((regex + '$', negate, dir_only))
+        if rules:
+            with self.lock:
+                self.rules.extend(rules)
+                self.compile()
+
+    def compile(self):
+        """Rebuilds the matcher; called with the lock held."""
+        if any(negate for _, negate, _ in self.rules):
+            self.matcher = ([(re.compile(regex), negate, dir_only) for regex, negate, dir_only in self.rules],
+                            None, None)
+            return
+        any_entry = [regex for regex, _, dir_only in self.rules if not dir_only]
+        dirs = [regex for regex, _, dir_only in self.rules if dir_only]
+        self.matcher = (None,
+                        re.compile('|'.join(f'(?:{regex})' for regex in any_entry)) if any_entry else None,
+                        re.compile('|'.join(f'(?:{regex})' for regex in dirs)) if dirs else None)
+
+    def match_relative(self, rel_path, is_dir):
+        """Returns True if a '/'-separated path relative to the root is ignored."""
+        ordered, any_regex, dir_regex = self.matcher
+        if ordered is None:
+            if any_regex is not None and any_regex.match(rel_path):
+                return True
+            return is_dir and dir_regex is not None and dir_regex.match(rel_path) is not None
+        ignored = False
+        for regex, negate, dir_only in ordered:
+            if (is_dir or not dir_only) and regex.match(rel_path):
+                ignored = not negate
+        return ignored
+
+    def is_ignored(self, path, is_dir):
+        """Returns True if `path` itself is ignored; paths outside the root never are."""
+        rel_path = os.path.relpath(os.path.abspath(path), self.root_path)
+        if rel_path == '.' or rel_path.startswith('..'):
+            return False
+        return self.match_relative(rel_path.replace(os.sep, '/'), is_dir)
+
+    def walk(self, top=None):
+        """Like os.walk, but ignored directories are pruned and ignored files dropped."""
+        for root, dirs, files in os.walk(top or self.root_path):
+            if '.gitignore' in files and root != self.root_path:
+                self.load_ignore_file(root)
+            rel_root = os.path.relpath(root, self.root_path).replace(os.sep, '/')
+            if rel_root.startswith('..'):
+                yield root, dirs, files
+                continue
+            prefix = '' if rel_root == '.' else rel_root + '/'
+            dirs[:] = [d for d in dirs if not self.match_relative(prefix + d, True)]
+            files = [f for f in files if not self.match_relative(prefix + f, False)]
+            yield root, dirs, files
+
+
+_shared_rules = {}
+_shared_lock = threading.Lock()
+
+
+def shared_rules(root_path):
+    """Returns the IgnoreRules of a project, rebuilt when its ignore files change.
+
+    Besides the user ignore file, every .gitignore loaded so far is checked,
+    nested ones included, so editing any of them takes effect on the next call.
+    """
+    root_path = os.path.abspath(root_path)
+    signature = file_mtime(os.path.join(root_path, USER_IGNORE_FILE))
+    with _shared_lock:
+        cached = _shared_rules.get(root_path)
+        if cached is None or cached[0] != signature or cached[1].ignore_files_changed():
+            cached = _shared_rules[root_path] = (signature, IgnoreRules(root_path))
+        return cached[1]
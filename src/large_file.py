@@ -0,0 +1,109 @@
+import os
+import mmap
+from array import array
+from itertools import accumulate
+
+# Files at least this big are opened in the read-only large-file viewer.
+LARGE_FILE_THRESHOLD = 8 * 1024 * 1024
+# Bytes of the file scanned for newlines per indexing step.
+INDEX_CHUNK_BYTES = 4 * 1024 * 1024
+# Bytes decoded per line and per window; longer lines are cut short with a marker,
+# so a file that is one huge line (e.g. a JSON dump) still reads as a small window.
+MAX_LINE_BYTES = 64 * 1024
+MAX_WINDOW_BYTES = 4 * 1024 * 1024
+
+
+class LineIndex:
+    """Sparse line index over a memory-mapped file.
+
+    Only the start offset of every STRIDE-th line is kept, so the index stays
+    small even for files with hundreds of millions of lines; a line is located by
+    jumping to its checkpoint and skipping at most STRIDE - 1 newlines. The index
+    is built incrementally with `index_more`, and lines past the indexed part can
+    still be read approximately through `read_at_offset`.
+    """
+    STRIDE = 64
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        self.checkpoints = array('Q', [0])
+        self.lines_seen = 0  # newlines found before `scanned`
+        self.scanned = 0
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.file.close()
+
+    @property
+    def complete(self):
+        return self.scanned >= self.size
+
+    def index_more(self, nbytes=INDEX_CHUNK_BYTES):
+        """Scans the next `nbytes` for line starts; returns True once the file is indexed."""
+        if self.complete:
+            return True
+        start = self.scanned
+        end = min(self.size, start + nbytes)
+        parts = self.buffer[start:end].split(b'\n')
+        # Offsets just after each newline in the chunk, i.e. where new lines begin
+        starts = list(accumulate((length + 1 for length in map(len, parts[:-1])), initial=start))[1:]
+        first = (-self.lines_seen - 1) % self.STRIDE
+        self.checkpoints.extend(starts[first::self.STRIDE])
+        self.lines_seen += len(starts)
+        self.scanned = end
+        return self.complete
+
+    def line_count(self):
+        """Returns the exact line count once indexed, an estimate before that."""
+        if self.complete:
+            if self.size and self.buffer[self.size - 1:self.size] == b'\n':
+                return max(self.lines_seen, 1)
+            return self.lines_seen + 1
+        if not self.scanned:
+            return 1
+        return max(int(self.lines_seen * self.size / self.scanned), self.lines_seen + 1)
+
+    def indexed_lines(self):
+        """Returns how many leading lines can be located exactly."""
+        return self.lines_seen + 1
+
+    def _read_from(self, pos, count):
+        buf = self.buffer
+        pieces = []
+        budget = MAX_WINDOW_BYTES
+        for _ in range(count):
+            if pos >= self.size or budget <= 0:
+                break
+            newline = buf.find(b'\n', pos)
+            end = self.size if newline < 0 else newline + 1
+            take = min(end - pos, MAX_LINE_BYTES, budget)
+            text = buf[pos:pos + take].decode('utf-8', errors='replace')
+            if take < end - pos:
+                # One output line per file line, so line numbers stay right
+                text += f" … [{end - pos - take:,} more bytes on this line]\n"
+            pieces.append(text)
+            budget -= take
+            pos = end
+        return ''.join(pieces)
+
+    def line_offset(self, line):
+        """Returns the byte offset where an indexed line starts."""
+        pos = self.checkpoints[line // self.STRIDE]
+        for _ in range(line % self.STRIDE):
+            pos = self.buffer.find(b'\n', pos) + 1
+        return pos
+
+    def read_lines(self, first, count):
+        """Returns `count` lines starting at an indexed line, as text."""
+        return self._read_from(self.line_offset(first), count)
+
+    def read_at_offset(self, offset, count):
+        """Returns `count` lines starting at the first line beginning at or after `offset`."""
+        if offset > 0:
+            newline = self.buffer.find(b'\n', offset - 1)
+            offset = self.size if newline < 0 else newline + 1
+        return self._read_from(offset, count)
@@ -0,0 +1,161 @@
+import os
+import re
+import hashlib
+import subprocess
+import threading
+from collections import namedtuple
+
+from project_cache import cache_file, load_cache, save_cache
+from search_index import run_tasks
+from ignore_rules import shared_rules
+
+LINT_VERSION = 2
+# Files handed to one flake8 process; each batch runs on its own pool worker
+BATCH_FILES = 20
+BATCH_TIMEOUT = 120
+# Config files whose content changes invalidate every cached result
+CONFIG_FILES = ('setup.cfg', 'tox.ini', '.flake8')
+
+FLAKE8_LINE = re.compile(r'^(?P<path>.*?):(?P<line>\d+):(?P<col>\d+): (?P<code>\w+) (?P<message>.*)$')
+
+Problem = namedtuple('Problem', 'line col code message')
+
+
+class LintError(Exception):
+    """Raised when flake8 itself fails rather than reporting problems."""
+
+
+def content_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def find_python_files(root_path):
+    for root, _, files in shared_rules(root_path).walk():
+        for file in files:
+            if file.endswith('.py'):
+                yield os.path.join(root, file)
+
+
+def flake8_version(python_cmd):
+    """Returns what `flake8 --version` prints (flake8, plugins and Python), or '' if it cannot run."""
+    try:
+        result = subprocess.run([python_cmd, "-m", "flake8", "--version"], capture_output=True, text=True,
+                                timeout=BATCH_TIMEOUT)
+    except (OSError, subprocess.SubprocessError):
+        return ''
+    return result.stdout.strip()
+
+
+def run_flake8(python_cmd, paths, cwd=None):
+    """Runs flake8 over `paths` and returns {path: [Problem, ...]}."""
+    result = subprocess.run([python_cmd, "-m", "flake8", "--jobs=1", *paths], cwd=cwd,
+                            capture_output=True, text=True, timeout=BATCH_TIMEOUT)
+    # flake8 exits with 1 when it found problems; anything else is a failure
+    if result.returncode not in (0, 1) or (result.returncode == 1 and not result.stdout):
+        raise LintError(result.stderr.strip() or f"flake8 exited with code {result.returncode}")
+    problems = {path: [] for path in paths}
+    by_norm = {os.path.normcase(os.path.abspath(path)): path for path in paths}
+    for line in result.stdout.splitlines():
+        match = FLAKE8_LINE.match(line)
+        if not match:
+            continue
+        path = by_norm.get(os.path.normcase(os.path.abspath(os.path.join(cwd or "", match['path']))))
+        if path is not None:
+            problems[path].append(Problem(int(match['line']), int(match['col']), match['code'], match['message']))
+    return problems
+
+
+class LintService:
+    """Lints a project with flake8, reusing results for files whose content is unchanged.
+
+    Results are cached per relative path and content hash in the project cache, so
+    only new or edited files reach flake8; those are linted in batches spread over
+    an executor. The path is part of the key because settings such as
+    per-file-ignores give identical files different results.
+    """
+
+    def __init__(self, root_path, python_cmd):
+        self.root_path = os.path.abspath(root_path)
+        self.python_cmd = python_cmd
+        self.cache_path = cache_file(self.root_path, "lint")
+        self.lock = threading.Lock()
+        self.config_key = None
+        self.results = {}  # (relative path, content hash) -> problems
+        self.dirty = False
+        self.loaded = False
+
+    def _load(self):
+        # Deferred to the first lint, which runs in the background: the flake8 version
+        # in the config key takes a process start to find out
+        self.loaded = True
+        self.config_key = self.read_config_key()
+        payload = load_cache(self.cache_path, LINT_VERSION)
+        if payload and payload.get('config') == self.config_key and payload.get('python') == self.python_cmd:
+            self.results = payload['results']
+
+    def read_config_key(self):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(flake8_version(self.python_cmd).encode() + b'\0')
+        for name in CONFIG_FILES:
+            try:
+                with open(os.path.join(self.root_path, name), 'rb') as f:
+                    digest.update(name.encode() + b'\0' + f.read())
+            except OSError:
+                continue
+        return digest.hexdigest()
+
+    def lint(self, paths=None, executor=None, cancelled=None):
+        """Yields (path, problems) for every file, cached results first.
+
+        `paths` defaults to every Python file in the project. Files that cannot be
+        read are skipped; a flake8 failure raises LintError.
+        """
+        with self.lock:
+            if not self.loaded:
+                self._load()
+        whole_project = paths is None
+        if whole_project:
+            paths = list(find_python_files(self.root_path))
+        stale = []
+        seen = set()
+        for path in paths:
+            try:
+                key = (os.path.relpath(path, self.root_path).replace(os.sep, '/'), content_hash(path))
+            except OSError:
+                continue
+            seen.add(key)
+            with self.lock:
+                problems = self.results.get(key)
+            if problems is None:
+                stale.append((path, key))
+            else:
+                yield path, problems
+        batches = [stale[i:i + BATCH_FILES] for i in range(0, len(stale), BATCH_FILES)]
+        for batch, problems in run_tasks(self.lint_batch, batches, executor, cancelled):
+            with self.lock:
+                for path, key in batch:
+                    self.results[key] = problems[path]
+                self.dirty = True
+            for path, _ in batch:
+                yield path, problems[path]
+        if whole_project and (cancelled is None or not cancelled.is_set()):
+            # Forget results of file versions that no longer exist
+            with self.lock:
+                if len(self.results) > len(seen):
+                    self.results = {key: value for key, value in self.results.items() if key in seen}
+                    self.dirty = True
+
+    def lint_batch(self, batch):
+        return batch, run_flake8(self.python_cmd, [path for path, _ in batch], cwd=self.root_path)
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            payload = {'config': self.config_key, 'python': self.python_cmd, 'results': self.results}
+            try:
+                save_cache(self.cache_path, LINT_VERSION, payload)
+                self.dirty = False
+            except OSError:
+                pass
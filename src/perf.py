@@ -0,0 +1,160 @@
+import os
+import json
+import bisect
+import inspect
+import functools
+import threading
+from collections import deque
+from time import perf_counter_ns
+
+# Upper bounds of the latency histogram buckets, in milliseconds; the last bucket is open
+BUCKET_BOUNDS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+_BUCKET_BOUNDS_NS = tuple(int(bound * 1e6) for bound in BUCKET_BOUNDS_MS)
+# Most recent spans kept for trace export
+TRACE_CAPACITY = 200000
+STALL_NAME = "event loop stall"
+
+# Read on every instrumented call; a plain module global keeps the disabled path cheap
+_enabled = False
+_lock = threading.Lock()
+_origin = perf_counter_ns()
+_stats = {}  # name -> OperationStats
+_trace = deque(maxlen=TRACE_CAPACITY)  # (name, thread id, start ns, end ns)
+_threads = {}  # thread id -> thread name
+
+
+class OperationStats:
+    """Call count, total and max duration, and latency histogram of one operation."""
+    __slots__ = ('count', 'total_ns', 'max_ns', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, duration_ns):
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        self.buckets[bisect.bisect_left(_BUCKET_BOUNDS_NS, duration_ns)] += 1
+
+    def percentile_ms(self, fraction):
+        """Returns the upper bound of the bucket holding the given fraction of calls."""
+        wanted = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= wanted:
+                return BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max_ns / 1e6
+        return 0.0
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_enabled(enabled):
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def reset():
+    """Forgets all statistics and trace events."""
+    global _origin
+    with _lock:
+        _stats.clear()
+        _trace.clear()
+        _threads.clear()
+        _origin = perf_counter_ns()
+
+
+def record(name, start_ns, end_ns):
+    """Records one span of `name` on the current thread."""
+    thread = threading.current_thread()
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = OperationStats()
+        stats.add(end_ns - start_ns)
+        _trace.append((name, thread.ident, start_ns, end_ns))
+        if thread.ident not in _threads:
+            _threads[thread.ident] = thread.name
+
+
+def timed(name=None):
+    """Decorator recording the duration of every call while instrumentation is enabled.
+
+    When disabled the wrapper only checks a flag before calling through.
+    Positional arguments beyond what `fn` accepts are dropped: Qt signals pass
+    arguments (such as clicked's checked flag) a slot may not take, and PyQt
+    only drops them itself when the slot is called directly.
+    """
+    def decorate(fn):
+        label = name or fn.__qualname__
+        code = fn.__code__
+        max_args = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if max_args is not None and len(args) > max_args:
+                args = args[:max_args]
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, start, perf_counter_ns())
+        return wrapper
+    return decorate
+
+
+class span:
+    """Context manager recording the duration of a block while instrumentation is enabled."""
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if _enabled:
+            self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start is not None:
+            record(self.name, self.start, perf_counter_ns())
+
+
+def snapshot():
+    """Returns {name: OperationStats copy} for display."""
+    with _lock:
+        copies = {}
+        for name, stats in _stats.items():
+            copy = OperationStats()
+            copy.count, copy.total_ns, copy.max_ns = stats.count, stats.total_ns, stats.max_ns
+            copy.buckets = list(stats.buckets)
+            copies[name] = copy
+        return copies
+
+
+def export_chrome_trace(path):
+    """Writes the recorded spans in the Chrome trace event format (chrome://tracing, Perfetto)."""
+    with _lock:
+        spans = list(_trace)
+        threads = dict(_threads)
+        origin = _origin
+    pid = os.getpid()
+    tids = {ident: index for index, ident in enumerate(threads, 1)}
+    events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tids[ident], 'args': {'name': name}}
+              for ident, name in threads.items()]
+    for name, ident, start, end in spans:
+        events.append({'name': name, 'cat': 'stall' if name == STALL_NAME else 'op', 'ph': 'X',
+                       'pid': pid, 'tid': tids.get(ident, 0),
+                       'ts': (start - origin) / 1000, 'dur': (end - start) / 1000})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return len(spans)
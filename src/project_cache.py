@@ -0,0 +1,40 @@
+import os
+import pickle
+import hashlib
+import tempfile
+
+# All per-project caches live under the user's home so project trees stay clean.
+CACHE_ROOT = os.path.join(os.path.expanduser("~"), ".pycentric", "cache")
+
+
+def cache_file(root_path, kind):
+    """Returns the cache file path used for `kind` data of a project root."""
+    key = hashlib.sha1(os.path.abspath(root_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(CACHE_ROOT, kind, key + ".pickle")
+
+
+def load_cache(path, version):
+    """Loads a cache payload, or None if it is missing, corrupt or outdated."""
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(data, dict) or data.get('version') != version:
+        return None
+    return data.get('payload')
+
+
+def save_cache(path, version, payload):
+    """Atomically writes a cache payload so readers never see a partial file."""
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump({'version': version, 'payload': payload}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
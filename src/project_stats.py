@@ -0,0 +1,236 @@
+import os
+import re
+import heapq
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from project_cache import cache_file, load_cache, save_cache
+from search_index import run_tasks
+from ignore_rules import shared_rules
+
+STATS_VERSION = 1
+# Files bigger than this are sized but not read for line counts
+MAX_COUNTED_BYTES = 8 * 1024 * 1024
+HASH_CHUNK = 1024 * 1024
+LANGUAGES = {
+    '.py': 'Python', '.pyi': 'Python', '.pyx': 'Cython', '.ipynb': 'Jupyter',
+    '.md': 'Markdown', '.markdown': 'Markdown', '.rst': 'reStructuredText', '.txt': 'Text',
+    '.json': 'JSON', '.toml': 'TOML', '.ini': 'INI', '.cfg': 'INI', '.yaml': 'YAML', '.yml': 'YAML',
+    '.html': 'HTML', '.css': 'CSS', '.js': 'JavaScript', '.ts': 'TypeScript', '.xml': 'XML',
+    '.c': 'C', '.h': 'C', '.cpp': 'C++', '.hpp': 'C++', '.sql': 'SQL',
+    '.sh': 'Shell', '.bat': 'Batch', '.ps1': 'PowerShell',
+}
+BLANK_LINE_RE = re.compile(rb'^[ \t\f\v\r]*\n', re.M)
+
+
+def format_bytes(count):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if count < 1024 or unit == 'GB':
+            return f"{count:.0f} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+def language_of(path):
+    return LANGUAGES.get(os.path.splitext(path)[1].lower(), 'Other')
+
+
+def scan_folder(rules, folder, rel_folder):
+    """Lists one folder with os.scandir, dropping ignored entries.
+
+    Returns (subfolders as (path, relative path), files as (path, mtime_ns, size)).
+    Symbolic links are skipped so nothing is counted twice.
+    """
+    folders, files = [], []
+    try:
+        with os.scandir(folder) as it:
+            entries = list(it)
+    except OSError:
+        return folders, files
+    if folder != rules.root_path and any(entry.name == '.gitignore' for entry in entries):
+        rules.load_ignore_file(folder)
+    prefix = rel_folder + '/' if rel_folder else ''
+    for entry in entries:
+        try:
+            if entry.is_symlink():
+                continue
+            is_dir = entry.is_dir()
+            rel_path = prefix + entry.name
+            if rules.match_relative(rel_path, is_dir):
+                continue
+            if is_dir:
+                folders.append((entry.path, rel_path))
+            else:
+                stat = entry.stat()
+                files.append((entry.path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            continue
+    return folders, files
+
+
+def scan_tree(root_path, executor=None, cancelled=None):
+    """Yields (path, mtime_ns, size) for every file the ignore rules keep.
+
+    With an executor, folders are listed in parallel as soon as their parent is.
+    """
+    rules = shared_rules(root_path)
+    if executor is None:
+        pending = deque([(rules.root_path, '')])
+        while pending:
+            if cancelled is not None and cancelled.is_set():
+                return
+            folders, files = scan_folder(rules, *pending.popleft())
+            pending.extend(folders)
+            yield from files
+        return
+    running = {executor.submit(scan_folder, rules, rules.root_path, '')}
+    try:
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            if cancelled is not None and cancelled.is_set():
+                return
+            for future in done:
+                folders, files = future.result()
+                running |= {executor.submit(scan_folder, rules, *folder) for folder in folders}
+                yield from files
+    finally:
+        for future in running:
+            future.cancel()
+
+
+def measure_file(item):
+    """Returns (path, entry) with the line and blank line counts of a source file."""
+    path, mtime_ns, size = item
+    lines = blank = None
+    if language_of(path) != 'Other' and size <= MAX_COUNTED_BYTES:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            lines = data.count(b'\n') + (1 if data and not data.endswith(b'\n') else 0)
+            blank = len(BLANK_LINE_RE.findall(data))
+        except OSError:
+            pass
+    return path, (mtime_ns, size, lines, blank, None)
+
+
+def hash_file(path):
+    """Returns (path, blake2b digest of the content), or (path, None) if unreadable."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                digest.update(chunk)
+    except OSError:
+        return path, None
+    return path, digest.hexdigest()
+
+
+class ProjectStats:
+    """Cached per-file sizes, line counts and content hashes of a project.
+
+    A refresh re-reads only files whose mtime or size changed. Content is hashed
+    only for files sharing their size with another file, the only possible
+    duplicates, and the hash is kept until the file changes.
+    """
+
+    def __init__(self, root_path):
+        self.root_path = os.path.abspath(root_path)
+        self.cache_path = cache_file(self.root_path, "project-stats")
+        # path -> (mtime_ns, size, lines, blank lines, hash); counts None when not read
+        self.entries = {}
+        self.dirty = False
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def refresh(self, executor=None, cancelled=None):
+        """Brings the statistics up to date; returns False if cancelled first."""
+        with self.lock:
+            if not self.loaded:
+                self.loaded = True
+                self.entries = load_cache(self.cache_path, STATS_VERSION) or {}
+            seen = set()
+            stale = []
+            for item in scan_tree(self.root_path, executor, cancelled):
+                path, mtime_ns, size = item
+                seen.add(path)
+                entry = self.entries.get(path)
+                if not entry or entry[0] != mtime_ns or entry[1] != size:
+                    stale.append(item)
+            if cancelled is not None and cancelled.is_set():
+                return False
+            for path in set(self.entries) - seen:
+                del self.entries[path]
+                self.dirty = True
+            for path, entry in run_tasks(measure_file, stale, executor, cancelled):
+                self.entries[path] = entry
+                self.dirty = True
+
+            # Only files of the same size can be duplicates; empty files are not interesting
+            by_size = {}
+            for path, entry in self.entries.items():
+                if entry[1]:
+                    by_size.setdefault(entry[1], []).append(path)
+            unhashed = [path for paths in by_size.values() if len(paths) > 1
+                        for path in paths if self.entries[path][4] is None]
+            for path, digest in run_tasks(hash_file, unhashed, executor, cancelled):
+                if digest is not None:
+                    self.entries[path] = self.entries[path][:4] + (digest,)
+                    self.dirty = True
+            return cancelled is None or not cancelled.is_set()
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            try:
+                save_cache(self.cache_path, STATS_VERSION, self.entries)
+                self.dirty = False
+            except OSError:
+                pass
+
+    def summary(self, top=20):
+        """Returns the statistics as a JSON-able dict.
+
+        'languages' holds (language, files, lines, blank lines, bytes), most lines
+        first; 'directories' (relative folder, bytes, files) with each file counted
+        in every folder above it; 'largest' (path, bytes); 'duplicates'
+        (bytes per copy, paths), most wasted space first.
+        """
+        with self.lock:
+            entries = dict(self.entries)
+        languages = {}
+        directories = {}
+        groups = {}
+        total = 0
+        for path, (_, size, lines, blank, digest) in entries.items():
+            total += size
+            counts = languages.setdefault(language_of(path), [0, 0, 0, 0])
+            counts[0] += 1
+            counts[1] += lines or 0
+            counts[2] += blank or 0
+            counts[3] += size
+            folder = os.path.dirname(os.path.relpath(path, self.root_path))
+            while True:
+                sizes = directories.setdefault(folder or '.', [0, 0])
+                sizes[0] += size
+                sizes[1] += 1
+                if not folder:
+                    break
+                folder = os.path.dirname(folder)
+            if digest is not None:
+                groups.setdefault((size, digest), []).append(path)
+        duplicates = sorted(((size, sorted(paths)) for (size, _), paths in groups.items() if len(paths) > 1),
+                            key=lambda group: group[0] * (len(group[1]) - 1), reverse=True)
+        return {
+            'files': len(entries),
+            'bytes': total,
+            'languages': sorted(((name, *counts) for name, counts in languages.items()),
+                                key=lambda row: (-row[2], -row[4], row[0])),
+            'directories': heapq.nlargest(top, ((folder, *sizes) for folder, sizes in directories.items()),
+                                          key=lambda row: row[1]),
+            'largest': [(path, size) for size, path in
+                        heapq.nlargest(top, ((entry[1], path) for path, entry in entries.items()))],
+            'duplicates': duplicates[:top],
+            'wasted_bytes': sum(size * (len(paths) - 1) for size, paths in duplicates),
+        }
@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import time
+import signal
+import tempfile
+import subprocess
+
+# Wrapper mode: python run_stats.py STATS_FILE -- PROGRAM [ARGS ...]
+# The program inherits this process's streams; its exit status and resource
+# usage are written to STATS_FILE as JSON once it has finished.
+SCRIPT_PATH = os.path.abspath(__file__)
+
+
+def wrap_command(command, stats_path):
+    """Returns a command line that runs `command` under this wrapper."""
+    return [sys.executable, SCRIPT_PATH, stats_path, "--", *command]
+
+
+def windows_usage(handle):
+    """Returns (cpu seconds, peak working set bytes) of a finished Windows process."""
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    peak = None
+    if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+        peak = counters.PeakWorkingSetSize
+    creation, exit_time, kernel, user = (wintypes.FILETIME() for _ in range(4))
+    cpu = None
+    if ctypes.windll.kernel32.GetProcessTimes(handle, ctypes.byref(creation), ctypes.byref(exit_time),
+                                              ctypes.byref(kernel), ctypes.byref(user)):
+        # FILETIME counts 100 ns ticks
+        ticks = sum((t.dwHighDateTime << 32) + t.dwLowDateTime for t in (kernel, user))
+        cpu = ticks / 1e7
+    return cpu, peak
+
+
+def wait_with_usage(child):
+    """Waits for a Popen child; returns (exit code, cpu seconds, peak RSS bytes).
+
+    On POSIX, os.wait4 reports the usage of exactly this child (not of every
+    child this process had). Values that the platform cannot provide are None.
+    """
+    if hasattr(os, 'wait4'):
+        _, status, usage = os.wait4(child.pid, 0)
+        child.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak = usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+        return child.returncode, usage.ru_utime + usage.ru_stime, peak
+    returncode = child.wait()
+    if sys.platform == 'win32':
+        try:
+            # Popen keeps the process handle open until it is garbage collected
+            cpu, peak = windows_usage(int(child._handle))
+            return returncode, cpu, peak
+        except (OSError, AttributeError, ValueError):
+            pass
+    return returncode, None, None
+
+
+def run_with_stats(command, cwd=None, stdout=None, stderr=None, on_start=None):
+    """Runs `command` to completion; returns a dict with its exit code and resource usage.
+
+    `on_start` is called with the Popen object once the process is running.
+    """
+    start = time.perf_counter()
+    child = subprocess.Popen(command, cwd=cwd, stdout=stdout, stderr=stderr)
+    if on_start:
+        on_start(child)
+    returncode, cpu, peak = wait_with_usage(child)
+    return {'returncode': returncode, 'wall_seconds': round(time.perf_counter() - start, 4),
+            'cpu_seconds': None if cpu is None else round(cpu, 4), 'peak_rss_bytes': peak}
+
+
+def write_stats(path, stats):
+    """Writes the stats atomically, so a reader never sees a partial file."""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(stats, f)
+    os.replace(tmp_path, path)
+
+
+def read_stats(path):
+    """Returns the stats written by the wrapper, or None if there are none."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def describe(stats):
+    """Returns a one-line summary such as 'exit 0, 1.20 s wall, 0.95 s CPU, 58.9 MB peak RSS'."""
+    parts = [f"exit {stats['returncode']}" if stats.get('returncode') is not None else "no exit code"]
+    if stats.get('wall_seconds') is not None:
+        parts.append(f"{stats['wall_seconds']:.2f} s wall")
+    if stats.get('cpu_seconds') is not None:
+        parts.append(f"{stats['cpu_seconds']:.2f} s CPU")
+    if stats.get('peak_rss_bytes') is not None:
+        parts.append(f"{stats['peak_rss_bytes'] / (1024 * 1024):.1f} MB peak RSS")
+    return ", ".join(parts)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 3 or argv[1] != "--":
+        print("usage: run_stats.py STATS_FILE -- PROGRAM [ARGS ...]", file=sys.stderr)
+        return 2
+    stats_path, command = argv[0], argv[2:]
+    children = []
+
+    def forward(signum, frame):
+        # Stopping the wrapper stops the program; the wrapper still records its stats
+        for child in children:
+            child.send_signal(signum)
+
+    for name in ('SIGTERM', 'SIGINT', 'SIGBREAK'):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), forward)
+    try:
+        stats = run_with_stats(command, on_start=children.append)
+    except OSError as e:
+        print(f"Failed to start {command[0]}: {e}", file=sys.stderr)
+        write_stats(stats_path, {'returncode': 127, 'error': str(e)})
+        return 127
+    write_stats(stats_path, stats)
+    returncode = stats['returncode']
+    # A program killed by a signal reports -N; shells use 128 + N
+    return returncode if returncode >= 0 else 128 - returncode
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,412 @@
+import os
+import sys
+import re
+import mmap
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import as_completed
+
+from project_cache import cache_file, load_cache, save_cache
+from ignore_rules import shared_rules
+
+SEARCH_EXTENSIONS = ('.py', '.txt', '.md', '.markdown', '.ini', '.json')
+
+INDEX_VERSION = 2
+# Files are indexed by the set of ASCII word runs they contain. Every word run of
+# a query must appear inside some word of a matching file, and as a whole word
+# when the query has non-word characters on both sides of it, so candidates are
+# the intersection of the files holding each run.
+WORD_RE = re.compile(r'\w+', re.ASCII)
+# Files above this size are not indexed; they are always treated as candidates
+# and verified directly.
+MAX_INDEXED_BYTES = 4 * 1024 * 1024
+# Files at least this big are scanned through mmap instead of being read whole.
+MMAP_THRESHOLD = 1024 * 1024
+# Streamed results are flushed after this many matches or seconds, whichever first.
+BATCH_SIZE = 200
+BATCH_INTERVAL = 0.05
+# Line-level hits reported per file before the rest of the file is skipped
+MAX_HITS_PER_FILE = 100
+# Longest context snippet shown for a hit, in characters
+SNIPPET_CHARS = 160
+
+# A match at a 1-based line and column (in characters), with the line as context
+Hit = namedtuple('Hit', 'line column length snippet')
+
+
+def read_lowered(path):
+    """Reads a file the same way the search matches it: decoded and lowercased."""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read().lower()
+
+
+def file_contains(path, search_text, size=None):
+    """Returns True if the lowercased file content contains `search_text`."""
+    if size is None:
+        size = os.path.getsize(path)
+    if size >= MMAP_THRESHOLD and search_text.isascii():
+        # ASCII queries can be matched case-insensitively on the raw bytes,
+        # which avoids decoding and copying the whole file.
+        pattern = re.compile(re.escape(search_text.encode('ascii')), re.IGNORECASE)
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return pattern.search(buf) is not None
+    return search_text in read_lowered(path)
+
+
+def compile_query(text, regex=False, case_sensitive=False, whole_word=False):
+    """Compiles a Find in Files query; raises re.error for an invalid regex.
+
+    Patterns are compiled to bytes so files can be matched on their raw mmapped
+    content. Bytes patterns only fold ASCII case, so a case-insensitive query
+    with other characters is compiled to str and matched on decoded text.
+    """
+    source = text if regex else re.escape(text)
+    if whole_word:
+        source = rf'\b(?:{source})\b'
+    flags = re.MULTILINE | (0 if case_sensitive else re.IGNORECASE)
+    if case_sensitive or text.isascii():
+        return re.compile(source.encode('utf-8'), flags)
+    return re.compile(source, flags)
+
+
+def snippet_around(line, start, end):
+    """Returns `line` cut to SNIPPET_CHARS around the [start, end) match."""
+    line = line.rstrip('\r\n')
+    if len(line) <= SNIPPET_CHARS:
+        return line.strip()
+    begin = max(0, min(start - SNIPPET_CHARS // 3, len(line) - SNIPPET_CHARS))
+    return ('…' if begin else '') + line[begin:begin + SNIPPET_CHARS].strip() + ('…' if begin + SNIPPET_CHARS < len(line) else '')
+
+
+def find_hits(path, pattern, max_hits=MAX_HITS_PER_FILE):
+    """Returns (hits, truncated) for the matches of a compiled query in a file.
+
+    Files of MMAP_THRESHOLD or more are matched through mmap. Line numbers are
+    counted incrementally between matches, and at most `max_hits` are returned.
+    """
+    size = os.path.getsize(path)
+    if not size:
+        return [], False
+    with open(path, 'rb') as f:
+        if size >= MMAP_THRESHOLD:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buf = f.read()
+    try:
+        if isinstance(pattern.pattern, str):
+            buf = buf[:].decode('utf-8', errors='replace')
+            newline = '\n'
+        else:
+            newline = b'\n'
+        hits = []
+        line = 1
+        last = 0
+        for match in pattern.finditer(buf):
+            start = match.start()
+            if len(hits) >= max_hits:
+                return hits, True
+            # mmap has no count(); the slices add up to one copy of the scanned part
+            line += buf[last:start].count(newline)
+            last = start
+            line_start = buf.rfind(newline, 0, start) + 1
+            line_end = buf.find(newline, start)
+            if line_end < 0:
+                line_end = len(buf)
+            text = buf[line_start:line_end]
+            if isinstance(text, bytes):
+                prefix = len(buf[line_start:start].decode('utf-8', errors='replace'))
+                matched = len(buf[start:match.end()].decode('utf-8', errors='replace'))
+                text = text.decode('utf-8', errors='replace')
+            else:
+                prefix = start - line_start
+                matched = match.end() - start
+            hits.append(Hit(line, prefix + 1, matched, snippet_around(text, prefix, prefix + matched)))
+        return hits, False
+    finally:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+
+
+def run_tasks(fn, items, executor=None, cancelled=None):
+    """Yields `fn(item)` for every item, in completion order when an executor is given.
+
+    Pending tasks are cancelled as soon as `cancelled` is set.
+    """
+    if executor is None:
+        for item in items:
+            if cancelled is not None and cancelled.is_set():
+                return
+            yield fn(item)
+        return
+    futures = [executor.submit(fn, item) for item in items]
+    try:
+        for future in as_completed(futures):
+            if cancelled is not None and cancelled.is_set():
+                return
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def extract_words(path, size):
+    """Returns the interned word runs of a file, or None if it is too big to index."""
+    if size > MAX_INDEXED_BYTES:
+        return None
+    return frozenset(map(sys.intern, WORD_RE.findall(read_lowered(path))))
+
+
+class ContentIndex:
+    """Persistent inverted word index of the searchable files under a project root.
+
+    The index is refreshed incrementally: only files whose mtime or size changed
+    since the last refresh are re-read, so repeat searches mostly cost a tree
+    stat plus postings lookups. The tree is walked without the index lock, so
+    queries keep answering from the previous state during a refresh.
+    """
+
+    def __init__(self, root_path):
+        self.root_path = os.path.abspath(root_path)
+        self.cache_path = cache_file(self.root_path, "content-index")
+        # path -> (mtime_ns, size, words or None)
+        self.entries = {}
+        # word -> paths of the files containing it
+        self.postings = {}
+        # Files too large to index; always candidates
+        self.unindexed = set()
+        # The words between newlines, and the words found in it per query run;
+        # both are dropped when a word is added or removed
+        self.vocabulary = None
+        self.word_cache = {}
+        self.dirty = False
+        self.loaded = False
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+
+    def load(self):
+        """Reads the saved index, once; queries can answer from it before any refresh."""
+        with self.lock:
+            if not self.loaded:
+                self._load()
+
+    def _load(self):
+        # Deferred to the first use so constructing an index never touches disk
+        self.loaded = True
+        for path, entry in (load_cache(self.cache_path, INDEX_VERSION) or {}).items():
+            self._add(path, entry)
+
+    def _add(self, path, entry):
+        self.entries[path] = entry
+        words = entry[2]
+        if words is None:
+            self.unindexed.add(path)
+            return
+        for word in words:
+            holders = self.postings.get(word)
+            if holders is None:
+                holders = self.postings[word] = set()
+                self.vocabulary = None
+                self.word_cache.clear()
+            holders.add(path)
+
+    def _remove(self, path):
+        entry = self.entries.pop(path)
+        words = entry[2]
+        if words is None:
+            self.unindexed.discard(path)
+            return
+        for word in words:
+            holders = self.postings[word]
+            holders.discard(path)
+            if not holders:
+                del self.postings[word]
+                self.vocabulary = None
+                self.word_cache.clear()
+
+    def iter_files(self):
+        for root, _, files in shared_rules(self.root_path).walk():
+            for file in files:
+                if file.endswith(SEARCH_EXTENSIONS):
+                    yield os.path.join(root, file)
+
+    def index_file(self, item):
+        """Computes the index entry of a single file, or None if it cannot be read."""
+        path, stat = item
+        try:
+            return path, (stat.st_mtime_ns, stat.st_size, extract_words(path, stat.st_size))
+        except OSError:
+            return path, None
+
+    def refresh(self, executor=None, cancelled=None, changed=None):
+        """Brings the index up to date with the files currently on disk.
+
+        Changed files are re-indexed on `executor` when one is given, and their
+        paths are added to the `changed` set if one is given. Returns False if
+        `cancelled` was set before the refresh completed.
+        """
+        self.load()
+        with self.refresh_lock:
+            # Entries only change under refresh_lock, so the walk can read them unlocked
+            seen = set()
+            stale = []
+            for path in self.iter_files():
+                if cancelled is not None and cancelled.is_set():
+                    return False
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                seen.add(path)
+                entry = self.entries.get(path)
+                if not entry or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+                    stale.append((path, stat))
+            with self.lock:
+                for path in set(self.entries) - seen:
+                    self._remove(path)
+                    self.dirty = True
+
+            for path, entry in run_tasks(self.index_file, stale, executor, cancelled):
+                with self.lock:
+                    if path in self.entries:
+                        self._remove(path)
+                    if entry is not None:
+                        self._add(path, entry)
+                    self.dirty = True
+                if changed is not None:
+                    changed.add(path)
+            return cancelled is None or not cancelled.is_set()
+
+    def save(self):
+        """Writes the index to disk if it changed since it was loaded."""
+        with self.lock:
+            if not self.dirty:
+                return
+            try:
+                save_cache(self.cache_path, INDEX_VERSION, self.entries)
+                self.dirty = False
+            except OSError:
+                pass
+
+    def word_matches(self, piece, whole_start, whole_end):
+        """Returns the words of the vocabulary a query word run can be part of.
+
+        A run that must be a whole word is a plain postings lookup. Otherwise the
+        words starting with, ending with or containing it are found with str.find
+        over the newline-joined vocabulary, and cached until a word is added or
+        removed. Called with the lock held.
+        """
+        if whole_start and whole_end:
+            return (piece,)
+        key = (piece, whole_start, whole_end)
+        words = self.word_cache.get(key)
+        if words is None:
+            if self.vocabulary is None:
+                self.vocabulary = '\n' + '\n'.join(self.postings) + '\n'
+            vocabulary = self.vocabulary
+            needle = ('\n' if whole_start else '') + piece + ('\n' if whole_end else '')
+            offset = 1 if whole_start else 0
+            words = self.word_cache[key] = []
+            found = vocabulary.find(needle)
+            while found >= 0:
+                start = vocabulary.rfind('\n', 0, found + offset) + 1
+                end = vocabulary.find('\n', found + offset + len(piece))
+                words.append(vocabulary[start:end])
+                # The next word starts after `end`; a needle starting with a newline may begin at it
+                found = vocabulary.find(needle, end)
+        return words
+
+    def candidates(self, search_text):
+        """Returns the indexed files that may contain the lowercased search text."""
+        # A run preceded (followed) by a non-word character in the query starts (ends)
+        # a word wherever the query matches
+        runs = {(match.group(), match.start() > 0, match.end() < len(search_text))
+                for match in WORD_RE.finditer(search_text)}
+        with self.lock:
+            if not runs:
+                return list(self.entries)
+            found = None
+            # Whole words first, then longest runs: they match the fewest files
+            for piece, whole_start, whole_end in sorted(runs, key=lambda run: (not (run[1] and run[2]), -len(run[0]))):
+                paths = set()
+                for word in self.word_matches(piece, whole_start, whole_end):
+                    paths.update(self.postings.get(word, ()))
+                found = paths if found is None else found & paths
+                if not found:
+                    break
+            return list(found | self.unindexed)
+
+    def find_batches(self, text, pattern, regex=False, executor=None, cancelled=None, only=None):
+        """Yields lists of (path, hits, truncated) for the files matching a compiled query.
+
+        Literal queries are narrowed down through the index like plain searches;
+        regular expressions have to scan every indexed file. `only` restricts the
+        scan to a set of paths.
+        """
+        self.load()
+        if regex:
+            with self.lock:
+                paths = list(self.entries)
+        else:
+            paths = self.candidates(text.lower())
+        if only is not None:
+            paths = [path for path in paths if path in only]
+
+        def scan(path):
+            try:
+                hits, truncated = find_hits(path, pattern)
+            except (OSError, ValueError):
+                return None
+            return (path, hits, truncated) if hits else None
+
+        batch = []
+        last_flush = 0.0
+        for result in run_tasks(scan, sorted(paths), executor, cancelled):
+            if result is not None:
+                batch.append(result)
+            now = time.monotonic()
+            if batch and (len(batch) >= BATCH_SIZE or now - last_flush >= BATCH_INTERVAL):
+                yield batch
+                batch = []
+                last_flush = now
+        if batch:
+            yield batch
+
+    def search(self, search_text):
+        """Returns the files whose lowercased content contains `search_text`."""
+        matches = []
+        for batch in self.search_batches(search_text):
+            matches.extend(batch)
+        return matches
+
+    def search_batches(self, search_text, executor=None, cancelled=None, only=None):
+        """Yields lists of matching files as they are found.
+
+        Candidates, restricted to the `only` set of paths if given, are verified
+        on `executor` when one is given; scanning stops early once `cancelled` is set.
+        """
+        self.load()
+        paths = self.candidates(search_text)
+        if only is not None:
+            paths = [path for path in paths if path in only]
+        with self.lock:
+            sizes = {path: entry[1] for path, entry in self.entries.items()}
+
+        def check(path):
+            try:
+                return path if file_contains(path, search_text, sizes.get(path)) else None
+            except (OSError, ValueError):
+                return None
+
+        batch = []
+        last_flush = 0.0  # flush the first match immediately
+        for path in run_tasks(check, paths, executor, cancelled):
+            if path is not None:
+                batch.append(path)
+            now = time.monotonic()
+            if batch and (len(batch) >= BATCH_SIZE or now - last_flush >= BATCH_INTERVAL):
+                yield batch
+                batch = []
+                last_flush = now
+        if batch:
+            yield batch
@@ -0,0 +1,340 @@
+import os
+import re
+import ast
+import hashlib
+import threading
+from collections import namedtuple
+
+from project_cache import cache_file, load_cache, save_cache
+from search_index import run_tasks
+from ignore_rules import shared_rules
+
+SYMBOL_VERSION = 1
+# Files parsed per pool task; keeps inter-process traffic low
+PARSE_BATCH = 32
+# Fewer stale files than this are parsed in-process; a process pool would cost more to start
+PROCESS_THRESHOLD = 64
+# Kinds listed by the symbol finder; imports only serve go-to-definition
+DEFINITION_KINDS = ('module', 'class', 'function', 'method')
+
+# `detail` holds the imported dotted name for imports and is empty otherwise.
+# Lines are 1-based, columns 0-based as in ast.
+Symbol = namedtuple('Symbol', 'name kind qualname line column detail')
+
+
+def module_name(root_path, path):
+    """Returns the dotted module name of a .py file relative to the project root."""
+    rel_path = os.path.splitext(os.path.relpath(path, root_path))[0]
+    parts = rel_path.split(os.sep)
+    if parts[-1] == '__init__':
+        parts.pop()
+    return '.'.join(parts)
+
+
+def extract_symbols(tree):
+    """Returns the classes, functions, methods and imports of a parsed module."""
+    symbols = []
+
+    def visit(node, prefix, in_class):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                qualname = prefix + child.name
+                symbols.append(Symbol(child.name, 'class', qualname, child.lineno, child.col_offset, ''))
+                visit(child, qualname + '.', True)
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                qualname = prefix + child.name
+                kind = 'method' if in_class else 'function'
+                symbols.append(Symbol(child.name, kind, qualname, child.lineno, child.col_offset, ''))
+                visit(child, qualname + '.<locals>.', False)
+            elif isinstance(child, ast.Import) and not prefix:
+                for alias in child.names:
+                    name = alias.asname or alias.name.split('.')[0]
+                    target = alias.name if alias.asname else name
+                    symbols.append(Symbol(name, 'import', name, child.lineno, child.col_offset, target))
+            elif isinstance(child, ast.ImportFrom) and not prefix:
+                base = '.' * child.level + (child.module or '')
+                for alias in child.names:
+                    if alias.name == '*':
+                        continue
+                    name = alias.asname or alias.name
+                    symbols.append(Symbol(name, 'import', name, child.lineno, child.col_offset,
+                                          f"{base}:{alias.name}"))
+            elif not isinstance(child, (ast.Lambda, ast.expr)):
+                # Definitions nested in if/try/with blocks keep the enclosing prefix
+                visit(child, prefix, in_class)
+
+    visit(tree, '', False)
+    return symbols
+
+
+def parse_files(items):
+    """Parses a batch of (path, previous hash) pairs; runs in pool worker processes.
+
+    Returns (path, hash, symbols) per readable file, with symbols None when the
+    content hash is unchanged. Files with syntax errors yield no symbols.
+    """
+    results = []
+    for path, old_hash in items:
+        try:
+            with open(path, 'rb') as f:
+                source = f.read()
+        except OSError:
+            continue
+        digest = hashlib.blake2b(source, digest_size=16).hexdigest()
+        if digest == old_hash:
+            results.append((path, digest, None))
+            continue
+        try:
+            symbols = extract_symbols(ast.parse(source, filename=path))
+        except (SyntaxError, ValueError, RecursionError):
+            symbols = []
+        results.append((path, digest, symbols))
+    return results
+
+
+def fuzzy_score(query, name):
+    """Scores how well a lowercase query matches a name; None if it is not a subsequence."""
+    lower = name.lower()
+    if lower == query:
+        return 1000
+    if lower.startswith(query):
+        return 600 - len(name)
+    found = lower.find(query)
+    if found >= 0:
+        boundary = found == 0 or name[found - 1] == '_' or name[found].isupper()
+        return (450 if boundary else 300) - found - len(name)
+    score = 0
+    pos = -1
+    for char in query:
+        nxt = lower.find(char, pos + 1)
+        if nxt < 0:
+            return None
+        if nxt == pos + 1:
+            score += 5
+        if nxt == 0 or name[nxt - 1] == '_' or (name[nxt].isupper() and name[nxt - 1].islower()):
+            score += 10
+        pos = nxt
+    return score - len(name)
+
+
+class SymbolIndex:
+    """Persistent index of the modules, classes, functions and imports of a project.
+
+    Files whose mtime or size changed are re-hashed, and only those whose
+    content hash changed are parsed again, in batches spread over an executor
+    (a process pool pays off since parsing holds the GIL). `update_file` re-indexes
+    a single file in place, e.g. right after it was saved.
+    """
+
+    def __init__(self, root_path):
+        self.root_path = os.path.abspath(root_path)
+        self.cache_path = cache_file(self.root_path, "symbols")
+        # path -> (mtime_ns, size, hash, symbols)
+        self.entries = {}
+        self.modules = {}  # dotted module name -> path
+        self.dirty = False
+        self.loaded = False
+        self.refreshed = False
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self._finder_rows = None
+
+    def _load(self):
+        self.loaded = True
+        for path, entry in (load_cache(self.cache_path, SYMBOL_VERSION) or {}).items():
+            self._set(path, entry)
+
+    def _set(self, path, entry):
+        self.entries[path] = entry
+        self.modules[module_name(self.root_path, path)] = path
+        self._finder_rows = None
+
+    def _remove(self, path):
+        del self.entries[path]
+        self.modules.pop(module_name(self.root_path, path), None)
+        self._finder_rows = None
+
+    def iter_files(self):
+        for root, _, files in shared_rules(self.root_path).walk():
+            for file in files:
+                if file.endswith('.py'):
+                    yield os.path.join(root, file)
+
+    def refresh(self, executor=None, cancelled=None):
+        """Brings the index up to date; returns False if cancelled first.
+
+        `executor` is only used when enough files changed to be worth it. The
+        index lock is only taken to apply results, so queries keep answering
+        from the previous state while files are being parsed.
+        """
+        with self.refresh_lock:
+            with self.lock:
+                if not self.loaded:
+                    self._load()
+            stale = []
+            seen = set()
+            for path in self.iter_files():
+                if cancelled is not None and cancelled.is_set():
+                    return False
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                seen.add(path)
+                entry = self.entries.get(path)
+                if not entry or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+                    stale.append((path, stat, entry[2] if entry else None))
+            with self.lock:
+                for path in set(self.entries) - seen:
+                    self._remove(path)
+                    self.dirty = True
+            stats = {path: stat for path, stat, _ in stale}
+            items = [(path, old_hash) for path, _, old_hash in stale]
+            batches = [items[i:i + PARSE_BATCH] for i in range(0, len(items), PARSE_BATCH)]
+            pool = executor if len(items) >= PROCESS_THRESHOLD else None
+            for results in run_tasks(parse_files, batches, pool, cancelled):
+                with self.lock:
+                    for path, digest, symbols in results:
+                        stat = stats[path]
+                        if symbols is None:
+                            entry = self.entries.get(path)
+                            if entry is None:
+                                continue
+                            symbols = entry[3]
+                        self._set(path, (stat.st_mtime_ns, stat.st_size, digest, symbols))
+                        self.dirty = True
+            done = cancelled is None or not cancelled.is_set()
+            self.refreshed = self.refreshed or done
+            return done
+
+    def update_file(self, path):
+        """Re-indexes one file now; returns its symbols, or None if it is not indexed."""
+        path = os.path.abspath(path)
+        if not path.endswith('.py') or not path.startswith(os.path.join(self.root_path, '')):
+            return None
+        with self.lock:
+            if not self.loaded:
+                self._load()
+            try:
+                stat = os.stat(path)
+            except OSError:
+                if path in self.entries:
+                    self._remove(path)
+                    self.dirty = True
+                return None
+            entry = self.entries.get(path)
+            results = parse_files([(path, entry[2] if entry else None)])
+            if not results:
+                return None
+            _, digest, symbols = results[0]
+            if symbols is None:
+                symbols = entry[3]
+            self._set(path, (stat.st_mtime_ns, stat.st_size, digest, symbols))
+            self.dirty = True
+            return symbols
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            try:
+                save_cache(self.cache_path, SYMBOL_VERSION, self.entries)
+                self.dirty = False
+            except OSError:
+                pass
+
+    # --- Queries ---
+    def finder_rows(self):
+        """Returns (lowercase name, symbol, path) for every definition, cached until the index changes."""
+        rows = self._finder_rows
+        if rows is None:
+            rows = []
+            for path, entry in self.entries.items():
+                module = module_name(self.root_path, path)
+                if module:
+                    rows.append((module.rsplit('.', 1)[-1].lower(), Symbol(module, 'module', module, 1, 0, ''), path))
+                rows += [(symbol.name.lower(), symbol, path) for symbol in entry[3] if symbol.kind in DEFINITION_KINDS]
+            self._finder_rows = rows
+        return rows
+
+    def find(self, query, limit=100):
+        """Returns the best fuzzy matches of `query` as (symbol, path), best first."""
+        query = query.strip().lower()
+        with self.lock:
+            rows = self.finder_rows()
+        if not query:
+            return [(symbol, path) for _, symbol, path in rows[:limit]]
+        # The regex rejects non-matching names in C before any Python-level scoring
+        prefilter = re.compile('.*?'.join(map(re.escape, query)))
+        scored = []
+        for lower, symbol, path in rows:
+            if prefilter.search(lower):
+                short = symbol.name.rsplit('.', 1)[-1]
+                score = fuzzy_score(query, short)
+                if score is not None:
+                    scored.append((-score, len(symbol.qualname), symbol.qualname, path, symbol))
+        scored.sort(key=lambda row: row[:4])
+        return [(symbol, path) for *_, path, symbol in scored[:limit]]
+
+    def resolve_module(self, dotted, from_path=None):
+        """Returns the file of a module imported as `dotted` (may be relative), or None."""
+        if dotted.startswith('.') and from_path:
+            level = len(dotted) - len(dotted.lstrip('.'))
+            package = module_name(self.root_path, from_path).split('.')
+            if not from_path.endswith('__init__.py'):
+                package.pop()
+            package = package[:len(package) - (level - 1)] if level > 1 else package
+            dotted = '.'.join(part for part in package + [dotted.lstrip('.')] if part)
+        parts = dotted.split('.')
+        # Projects often keep their modules in a src/ folder imported without the prefix
+        for candidate in ('.'.join(parts), 'src.' + '.'.join(parts)):
+            if candidate in self.modules:
+                return self.modules[candidate]
+        return None
+
+    def definitions(self, name, from_path=None):
+        """Returns the definitions `name` refers to as (symbol, path), most likely first.
+
+        Definitions in `from_path` win, then whatever it imports under that name;
+        otherwise every definition of the name in the project is returned.
+        """
+        with self.lock:
+            if from_path:
+                from_path = os.path.abspath(from_path)
+                local = self.entries.get(from_path)
+                if local:
+                    found = [(symbol, from_path) for symbol in local[3]
+                             if symbol.name == name and symbol.kind != 'import']
+                    if found:
+                        return found
+                    for symbol in local[3]:
+                        if symbol.name == name and symbol.kind == 'import':
+                            target = self.resolve_import(symbol.detail, from_path)
+                            if target:
+                                return [target]
+            found = [(symbol, path) for path, entry in self.entries.items()
+                     for symbol in entry[3] if symbol.name == name and symbol.kind in ('class', 'function')]
+            if not found:
+                found = [(symbol, path) for path, entry in self.entries.items()
+                         for symbol in entry[3] if symbol.name == name and symbol.kind == 'method']
+            return sorted(found, key=lambda item: (item[1], item[0].line))
+
+    def resolve_import(self, detail, from_path, depth=0):
+        """Resolves an import symbol's detail to (symbol, path), or None outside the project."""
+        module, _, attr = detail.partition(':')
+        path = self.resolve_module(module, from_path)
+        if attr:
+            if path is not None:
+                for symbol in self.entries[path][3]:
+                    if symbol.name == attr and symbol.kind != 'import':
+                        return symbol, path
+                # A re-export from a package __init__ or a submodule of the package
+                for symbol in self.entries[path][3]:
+                    if symbol.name == attr and symbol.kind == 'import' and depth < 8:
+                        return self.resolve_import(symbol.detail, path, depth + 1)
+            submodule = self.resolve_module(f"{module}.{attr}" if module.strip('.') else module + attr, from_path)
+            path = submodule
+        if path is None:
+            return None
+        name = module_name(self.root_path, path)
+        return Symbol(name, 'module', name, 1, 0, ''), path
@@ -0,0 +1,58 @@
+import os
+import sys
+import argparse
+import subprocess
+
+# Wheels shared by every project; read at call time so it can be redirected
+WHEELHOUSE = os.path.join(os.path.expanduser("~"), ".pycentric", "wheelhouse")
+SCRIPT_PATH = os.path.abspath(__file__)
+
+
+def pip_command(python, *args):
+    # No version check: it would reach out to PyPI even for an offline install
+    return [python, "-m", "pip", *args, "--disable-pip-version-check"]
+
+
+def install(python, requirements, wheelhouse=None, offline=False, cwd=None, stdout=None):
+    """Installs a requirements file into the environment of `python`; returns pip's exit code.
+
+    The wheelhouse alone is tried first. Online, missing wheels are then
+    downloaded or built into it and the local install is retried; plain pip,
+    still preferring local wheels, is the last resort. Progress and pip's
+    output go to `stdout` (default: this process's).
+    """
+    wheelhouse = wheelhouse or WHEELHOUSE
+    os.makedirs(wheelhouse, exist_ok=True)
+    out = stdout or sys.stdout
+
+    def step(description, command):
+        print(f"--- {description} ---", file=out, flush=True)
+        return subprocess.call(command, cwd=cwd, stdout=stdout)
+
+    local = pip_command(python, "install", "--no-index", "--find-links", wheelhouse, "-r", requirements)
+    returncode = step(f"Installing from the wheelhouse ({wheelhouse})", local)
+    if returncode == 0:
+        return 0
+    if offline:
+        print("--- Offline install failed: some requirements have no wheel in the wheelhouse ---", file=out, flush=True)
+        return returncode
+    wheel = pip_command(python, "wheel", "--find-links", wheelhouse, "-w", wheelhouse, "-r", requirements)
+    if step("Adding missing wheels to the wheelhouse", wheel) == 0:
+        if step("Installing from the updated wheelhouse", local) == 0:
+            return 0
+    return step("Falling back to a regular pip install",
+                pip_command(python, "install", "--find-links", wheelhouse, "-r", requirements))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Install requirements, preferring the shared wheelhouse.")
+    parser.add_argument("--python", default=sys.executable, help="interpreter of the target environment")
+    parser.add_argument("--wheelhouse", help=f"wheel folder (default: {WHEELHOUSE})")
+    parser.add_argument("--offline", action="store_true", help="never contact a package index")
+    parser.add_argument("requirements")
+    args = parser.parse_args(argv)
+    return install(args.python, args.requirements, args.wheelhouse, args.offline)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
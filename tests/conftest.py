@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+import project_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_root(tmp_path, monkeypatch):
+    """Keeps the project caches written by a test out of the user's home."""
+    root = tmp_path / "cache"
+    monkeypatch.setattr(project_cache, 'CACHE_ROOT', str(root))
+    return root
+
+
+@pytest.fixture
+def make_tree(tmp_path):
+    """Returns a function creating files from {relative path: text or bytes}; it returns the root."""
+
+    def make(files, name="project"):
+        root = tmp_path / name
+        root.mkdir(exist_ok=True)
+        for rel_path, content in files.items():
+            path = root / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(content, bytes):
+                path.write_bytes(content)
+            else:
+                path.write_text(content, encoding='utf-8')
+        return str(root)
+
+    return make
@@ -0,0 +1,111 @@
+import os
+import zipfile
+import threading
+
+import pytest
+
+import archive
+from archive import create_zip, extract_zip, member_target, ArchiveCancelled
+
+
+@pytest.fixture
+def project(make_tree):
+    return make_tree({
+        '.gitignore': "*.log\n",
+        'main.py': "print('hello')\n" * 200,
+        'pkg/__init__.py': "",
+        'pkg/data.bin': os.urandom(256 * 1024),
+        'pkg/image.png': os.urandom(1024),
+        'debug.log': "ignored\n",
+    })
+
+
+def read_tree(root):
+    contents = {}
+    for folder, _, files in os.walk(root):
+        for file in files:
+            path = os.path.join(folder, file)
+            with open(path, 'rb') as f:
+                contents[os.path.relpath(path, root).replace(os.sep, '/')] = f.read()
+    return contents
+
+
+def test_round_trip_keeps_content_and_drops_ignored_files(project, tmp_path):
+    zip_path = str(tmp_path / "project.zip")
+    calls = []
+    assert create_zip(project, zip_path, progress=lambda *args: calls.append(args)) == 5
+    assert calls[-1][2:] == (5, 5)
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.testzip() is None
+        types = {info.filename: info.compress_type for info in zf.infolist()}
+    assert types['project/main.py'] == zipfile.ZIP_DEFLATED
+    assert types['project/pkg/image.png'] == zipfile.ZIP_STORED
+
+    extract_dir = str(tmp_path / "out")
+    assert extract_zip(zip_path, extract_dir, workers=3) == 5
+    expected = read_tree(project)
+    del expected['debug.log']
+    assert read_tree(os.path.join(extract_dir, 'project')) == expected
+
+
+def test_large_members_are_streamed_by_the_writer(project, tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, 'MAX_PARALLEL_MEMBER', 1024)
+    zip_path = str(tmp_path / "project.zip")
+    create_zip(project, zip_path)
+    extract_zip(zip_path, str(tmp_path / "out"))
+    with open(os.path.join(project, 'pkg', 'data.bin'), 'rb') as f:
+        original = f.read()
+    with open(tmp_path / "out" / "project" / "pkg" / "data.bin", 'rb') as f:
+        assert f.read() == original
+
+
+def corrupt_member(zip_path, name):
+    """Flips a byte in the stored data of one member, leaving the headers intact."""
+    with zipfile.ZipFile(zip_path) as zf:
+        info = zf.getinfo(name)
+    with open(zip_path, 'r+b') as f:
+        f.seek(info.header_offset + 26)
+        name_length, extra_length = int.from_bytes(f.read(2), 'little'), int.from_bytes(f.read(2), 'little')
+        f.seek(info.header_offset + 30 + name_length + extra_length + info.compress_size // 2)
+        byte = f.read(1)
+        f.seek(-1, os.SEEK_CUR)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+
+def test_corrupt_member_fails_and_removes_the_output(project, tmp_path):
+    zip_path = str(tmp_path / "project.zip")
+    create_zip(project, zip_path)
+    corrupt_member(zip_path, 'project/pkg/data.bin')
+    extract_dir = str(tmp_path / "out")
+    cancelled = threading.Event()
+    with pytest.raises(zipfile.BadZipFile):
+        extract_zip(zip_path, extract_dir, cancelled=cancelled)
+    assert not os.path.exists(extract_dir)
+    assert not cancelled.is_set()
+
+
+def test_existing_extract_dir_is_kept_on_failure(project, tmp_path):
+    zip_path = str(tmp_path / "project.zip")
+    create_zip(project, zip_path)
+    corrupt_member(zip_path, 'project/pkg/data.bin')
+    extract_dir = tmp_path / "out"
+    extract_dir.mkdir()
+    with pytest.raises(zipfile.BadZipFile):
+        extract_zip(zip_path, str(extract_dir))
+    assert extract_dir.is_dir()
+
+
+def test_cancelled_create_removes_the_partial_archive(project, tmp_path):
+    zip_path = str(tmp_path / "project.zip")
+    cancelled = threading.Event()
+    cancelled.set()
+    with pytest.raises(ArchiveCancelled):
+        create_zip(project, zip_path, cancelled=cancelled)
+    assert not os.path.exists(zip_path)
+
+
+def test_member_target_stays_inside_the_extract_dir(tmp_path):
+    extract_dir = str(tmp_path)
+    assert member_target(extract_dir, zipfile.ZipInfo('../../evil.txt')) == os.path.join(extract_dir, 'evil.txt')
+    assert member_target(extract_dir, zipfile.ZipInfo('/etc/passwd')) == os.path.join(extract_dir, 'etc', 'passwd')
+    assert member_target(extract_dir, zipfile.ZipInfo('./..')) is None
@@ -0,0 +1,128 @@
+import os
+import shutil
+import threading
+import subprocess
+
+import pytest
+
+from ignore_rules import IgnoreRules, shared_rules
+
+GITIGNORE = """\
+# comments and blank lines are skipped
+
+*.log
+!keep.log
+build/
+/top.txt
+docs/**/*.tmp
+data/[ab].csv
+cache?/
+"""
+
+FILES = [
+    'main.py', 'debug.log', 'keep.log', 'nested/deep/trace.log',
+    'build/out.bin', 'src/build/gen.py', 'build.py',
+    'top.txt', 'sub/top.txt',
+    'docs/a.tmp', 'docs/x/y/b.tmp', 'other/c.tmp',
+    'data/a.csv', 'data/b.csv', 'data/c.csv',
+    'cache1/x.py', 'cache12/x.py',
+    'sub/secret.txt', 'sub/public.txt', 'sub/inner/secret.txt', 'secret.txt',
+]
+
+
+def kept_files(root):
+    return sorted(os.path.relpath(os.path.join(folder, file), root).replace(os.sep, '/')
+                  for folder, _, files in shared_rules(root).walk() for file in files)
+
+
+def git_kept_files(root):
+    """Lists the files git would add: untracked ones that no ignore rule excludes."""
+    subprocess.run(['git', 'init', '-q', root], check=True)
+    listed = subprocess.run(['git', 'ls-files', '--others', '--exclude-standard'], cwd=root,
+                            capture_output=True, text=True, check=True).stdout
+    return sorted(listed.splitlines())
+
+
+def test_walk_keeps_what_git_keeps(make_tree):
+    if shutil.which('git') is None:
+        pytest.skip("git is not installed")
+    files = {path: "" for path in FILES}
+    files['.gitignore'] = GITIGNORE
+    files['sub/.gitignore'] = "secret.txt\n"
+    root = make_tree(files)
+    assert kept_files(root) == git_kept_files(root)
+
+
+def test_is_ignored_follows_git_check_ignore(make_tree):
+    if shutil.which('git') is None:
+        pytest.skip("git is not installed")
+    files = {path: "" for path in FILES}
+    files['.gitignore'] = GITIGNORE
+    root = make_tree(files)
+    subprocess.run(['git', 'init', '-q', root], check=True)
+    checked = subprocess.run(['git', 'check-ignore', '--no-index', *FILES], cwd=root,
+                             capture_output=True, text=True).stdout.splitlines()
+    rules = IgnoreRules(root)
+
+    def ignored(path):
+        # git reports a path when the path or one of its folders is excluded
+        parts = path.split('/')
+        return any(rules.is_ignored(os.path.join(root, *parts[:depth]), depth < len(parts))
+                   for depth in range(1, len(parts) + 1))
+
+    assert sorted(path for path in FILES if ignored(path)) == sorted(checked)
+
+
+def test_defaults_prune_environments_and_caches(make_tree):
+    root = make_tree({'app.py': "", 'venv/lib/site.py': "", '.venv/x.py': "", 'pkg/__pycache__/m.pyc': "",
+                      'pkg/m.pyc': "", 'node_modules/a.js': "", 'pkg/m.py': ""})
+    assert kept_files(root) == ['app.py', 'pkg/m.py']
+
+
+def test_user_ignore_file_adds_patterns(make_tree):
+    root = make_tree({'.pycentricignore': "*.csv\n", 'a.csv': "", 'a.py': ""})
+    assert kept_files(root) == ['.pycentricignore', 'a.py']
+
+
+def test_paths_outside_the_root_are_never_ignored(make_tree):
+    root = make_tree({'.gitignore': "*.log\n"})
+    assert not IgnoreRules(root).is_ignored(os.path.join(os.path.dirname(root), 'x.log'), False)
+
+
+def test_shared_rules_follow_nested_gitignore_edits(make_tree):
+    root = make_tree({'sub/.gitignore': "secret.txt\n", 'sub/secret.txt': "", 'sub/public.txt': ""})
+    assert kept_files(root) == ['sub/.gitignore', 'sub/public.txt']
+    nested = os.path.join(root, 'sub', '.gitignore')
+    with open(nested, 'w') as f:
+        f.write("public.txt\n")
+    stat = os.stat(nested)
+    os.utime(nested, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert kept_files(root) == ['sub/.gitignore', 'sub/secret.txt']
+    os.remove(nested)
+    assert kept_files(root) == ['sub/public.txt', 'sub/secret.txt']
+
+
+def test_matching_while_other_threads_add_rules(make_tree):
+    rules = IgnoreRules(make_tree({}))
+    errors = []
+    stop = threading.Event()
+
+    def match():
+        try:
+            while not stop.is_set():
+                rules.match_relative('d7/x.tmp', False)
+                rules.match_relative('d8/keep', True)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=match) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(200):
+        rules.add_patterns(['*.tmp', '!keep/'] if i % 2 else ['*.tmp'], base=f'd{i}')
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert rules.match_relative('d7/x.tmp', False)
+    assert not rules.match_relative('d7/keep', True)
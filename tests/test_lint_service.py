@@ -0,0 +1,107 @@
+import os
+import sys
+import importlib.util
+
+import pytest
+
+import lint_service
+from lint_service import LintService
+
+if importlib.util.find_spec('flake8') is None:
+    pytest.skip("flake8 is not installed", allow_module_level=True)
+
+
+@pytest.fixture
+def project(make_tree):
+    return make_tree({
+        'clean.py': "print('clean')\n",
+        'unused.py': "import os\n",
+        'pkg/style.py': "x=1\n",
+        'venv/lib/ignored.py': "import sys\n",
+    })
+
+
+@pytest.fixture
+def flake8_runs(monkeypatch):
+    """Records the files each flake8 process was started for."""
+    runs = []
+    run = lint_service.run_flake8
+
+    def recording(python_cmd, paths, cwd=None):
+        runs.append(sorted(os.path.basename(path) for path in paths))
+        return run(python_cmd, paths, cwd)
+
+    monkeypatch.setattr(lint_service, 'run_flake8', recording)
+    return runs
+
+
+def codes(results):
+    return {os.path.basename(path): [problem.code for problem in problems] for path, problems in results}
+
+
+def test_lint_reports_problems_per_file(project, flake8_runs):
+    results = codes(LintService(project, sys.executable).lint())
+    assert results == {'clean.py': [], 'unused.py': ['F401'], 'style.py': ['E225']}
+    assert flake8_runs == [['clean.py', 'style.py', 'unused.py']]
+
+
+def test_unchanged_files_are_served_from_the_cache(project, flake8_runs):
+    service = LintService(project, sys.executable)
+    first = codes(service.lint())
+    service.save()
+    reloaded = LintService(project, sys.executable)
+    assert codes(reloaded.lint()) == first
+    assert len(flake8_runs) == 1
+
+
+def test_only_edited_files_are_linted_again(project, flake8_runs):
+    service = LintService(project, sys.executable)
+    list(service.lint())
+    with open(os.path.join(project, 'clean.py'), 'w') as f:
+        f.write("import json\n")
+    results = codes(service.lint())
+    assert results['clean.py'] == ['F401']
+    assert flake8_runs[-1] == ['clean.py']
+
+
+def test_config_changes_invalidate_the_cache(project, flake8_runs):
+    service = LintService(project, sys.executable)
+    list(service.lint())
+    service.save()
+    with open(os.path.join(project, 'setup.cfg'), 'w') as f:
+        f.write("[flake8]\nignore = E225\n")
+    results = codes(LintService(project, sys.executable).lint())
+    assert results['style.py'] == []
+    assert len(flake8_runs) == 2
+
+
+def test_identical_files_keep_their_own_results(make_tree, flake8_runs):
+    root = make_tree({'setup.cfg': "[flake8]\nper-file-ignores = __init__.py:F401\n",
+                      'pkg/__init__.py': "import os\n", 'mod.py': "import os\n"})
+    service = LintService(root, sys.executable)
+    assert codes(service.lint()) == {'__init__.py': [], 'mod.py': ['F401']}
+    with open(os.path.join(root, 'other.py'), 'w') as f:
+        f.write("import os\n")
+    assert codes(service.lint())['other.py'] == ['F401']
+    assert flake8_runs[-1] == ['other.py']
+
+
+def test_flake8_version_is_part_of_the_config_key(project, monkeypatch):
+    service = LintService(project, sys.executable)
+    key = service.read_config_key()
+    monkeypatch.setattr(lint_service, 'flake8_version', lambda python_cmd: "0.0.1")
+    assert service.read_config_key() != key
+
+
+def test_stale_results_are_forgotten(project):
+    service = LintService(project, sys.executable)
+    list(service.lint())
+    os.remove(os.path.join(project, 'unused.py'))
+    list(service.lint())
+    assert len(service.results) == 2
+
+
+def test_flake8_failure_raises_lint_error(project):
+    service = LintService(project, os.path.join(project, 'no-such-python'))
+    with pytest.raises((lint_service.LintError, OSError)):
+        list(service.lint())
@@ -0,0 +1,160 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import search_index
+from search_index import ContentIndex, compile_query, find_hits
+from engine import Engine
+
+
+@pytest.fixture
+def project(make_tree):
+    return make_tree({
+        'app.py': "import os\n\ndef load_config(path):\n    return open(path).read()\n",
+        'notes.md': "Remember to LOAD the Config before starting.\n",
+        'util/helpers.py': "def helper():\n    config = {}\n    return config\n",
+        'data.json': '{"config": true}\n',
+        'image.bin': "load_config\n",
+        'build.log': "load_config\n",
+        '.gitignore': "*.log\n",
+    })
+
+
+def relative(root, paths):
+    return sorted(os.path.relpath(path, root).replace(os.sep, '/') for path in paths)
+
+
+def test_search_is_case_insensitive_and_skips_other_files(project):
+    index = ContentIndex(project)
+    assert index.refresh()
+    assert relative(project, index.search("load_config")) == ['app.py']
+    assert relative(project, index.search("config")) == ['app.py', 'data.json', 'notes.md', 'util/helpers.py']
+    assert relative(project, index.search("the config")) == ['notes.md']
+    assert index.search("nowhere to be found") == []
+
+
+def test_inner_query_words_are_looked_up_whole(make_tree):
+    root = make_tree({'a.txt': "the configuration file\n", 'b.txt': "the config file\n"})
+    index = ContentIndex(root)
+    index.refresh()
+    assert relative(root, index.candidates("the config file")) == ['b.txt']
+    assert relative(root, index.candidates("the config")) == ['a.txt', 'b.txt']
+    assert relative(root, index.candidates("he confi")) == ['a.txt', 'b.txt']
+    assert relative(root, index.search("he configuration fi")) == ['a.txt']
+
+
+def test_new_words_reach_cached_lookups(make_tree):
+    root = make_tree({'a.txt': "config\n"})
+    index = ContentIndex(root)
+    index.refresh()
+    assert relative(root, index.candidates("onfi")) == ['a.txt']
+    with open(os.path.join(root, 'b.txt'), 'w') as f:
+        f.write("reconfigure\n")
+    index.refresh()
+    assert relative(root, index.candidates("onfi")) == ['a.txt', 'b.txt']
+    os.remove(os.path.join(root, 'a.txt'))
+    index.refresh()
+    assert relative(root, index.candidates("onfi")) == ['b.txt']
+
+
+def test_refresh_picks_up_edits_and_deletions(project):
+    index = ContentIndex(project)
+    index.refresh()
+    with open(os.path.join(project, 'util', 'helpers.py'), 'a') as f:
+        f.write("# brand_new_word\n")
+    os.remove(os.path.join(project, 'notes.md'))
+    index.refresh()
+    assert relative(project, index.search("brand_new_word")) == ['util/helpers.py']
+    assert 'notes.md' not in relative(project, index.search("config"))
+
+
+def test_saved_index_is_reused(project):
+    index = ContentIndex(project)
+    index.refresh()
+    index.save()
+    reloaded = ContentIndex(project)
+    reloaded.refresh()
+    assert not reloaded.dirty
+    assert relative(project, reloaded.search("helper")) == ['util/helpers.py']
+
+
+def test_first_results_come_from_the_saved_index(project, monkeypatch):
+    index = ContentIndex(project)
+    index.refresh()
+    index.save()
+    with open(os.path.join(project, 'new.py'), 'w') as f:
+        f.write("config = None\n")
+    events = []
+    walk = ContentIndex.iter_files
+
+    def recording(self):
+        events.append('walk')
+        return walk(self)
+
+    monkeypatch.setattr(ContentIndex, 'iter_files', recording)
+    for batch in Engine(project).search_batches("config"):
+        events.append(relative(project, batch))
+    assert events[0] != 'walk' and 'walk' in events
+    found = [path for event in events if event != 'walk' for path in event]
+    assert sorted(found) == ['app.py', 'data.json', 'new.py', 'notes.md', 'util/helpers.py']
+
+
+def test_find_after_refresh_reports_each_file_once(project):
+    engine = Engine(project)
+    list(engine.find_batches("config"))
+    with open(os.path.join(project, 'app.py'), 'a') as f:
+        f.write("# config again\n")
+    found = [path for batch in engine.find_batches("config") for path, _, _ in batch]
+    assert relative(project, found) == ['app.py', 'data.json', 'notes.md', 'util/helpers.py']
+
+
+def test_parallel_search_matches_serial_search(project):
+    index = ContentIndex(project)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        index.refresh(executor)
+        batches = list(index.search_batches("config", executor))
+    assert relative(project, [path for batch in batches for path in batch]) == relative(project, index.search("config"))
+
+
+def test_files_too_large_to_index_are_still_searched(project, monkeypatch):
+    monkeypatch.setattr(search_index, 'MAX_INDEXED_BYTES', 16)
+    index = ContentIndex(project)
+    index.refresh()
+    assert index.unindexed
+    assert relative(project, index.search("load_config")) == ['app.py']
+
+
+def test_find_reports_lines_and_columns(project):
+    index = ContentIndex(project)
+    index.refresh()
+    pattern = compile_query("config", whole_word=True)
+    results = {os.path.basename(path): hits for batch in index.find_batches("config", pattern)
+               for path, hits, _ in batch}
+    assert sorted(results) == ['data.json', 'helpers.py', 'notes.md']
+    assert [(hit.line, hit.column, hit.length) for hit in results['helpers.py']] == [(2, 5, 6), (3, 12, 6)]
+    assert results['notes.md'][0].snippet == "Remember to LOAD the Config before starting."
+
+
+def test_find_with_regex_and_case(project):
+    index = ContentIndex(project)
+    index.refresh()
+    pattern = compile_query(r"def \w+\(", regex=True, case_sensitive=True)
+    found = sorted(os.path.basename(path) for batch in index.find_batches("", pattern, regex=True)
+                   for path, _, _ in batch)
+    assert found == ['app.py', 'helpers.py']
+    pattern = compile_query("CONFIG", case_sensitive=True)
+    assert list(index.find_batches("CONFIG", pattern)) == []
+
+
+def test_find_hits_caps_the_hits_per_file(tmp_path):
+    path = tmp_path / "many.txt"
+    path.write_text("x\n" * 10)
+    hits, truncated = find_hits(str(path), compile_query("x"), max_hits=3)
+    assert [hit.line for hit in hits] == [1, 2, 3]
+    assert truncated
+
+
+def test_invalid_regex_raises_up_front():
+    with pytest.raises(Exception):
+        compile_query("(", regex=True)
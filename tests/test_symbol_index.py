@@ -0,0 +1,115 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import symbol_index
+from symbol_index import SymbolIndex, fuzzy_score
+
+SOURCES = {
+    'pkg/__init__.py': "from .widgets import Widget\n",
+    'pkg/widgets.py': (
+        "import os\n"
+        "\n"
+        "class Widget:\n"
+        "    def render(self):\n"
+        "        def helper():\n"
+        "            pass\n"
+        "\n"
+        "class WidgetFactory:\n"
+        "    def build(self):\n"
+        "        return Widget()\n"
+    ),
+    'app.py': (
+        "from pkg import Widget\n"
+        "from pkg.widgets import WidgetFactory as Factory\n"
+        "\n"
+        "def main():\n"
+        "    return Widget().render()\n"
+    ),
+    'broken.py': "def oops(:\n",
+}
+
+
+@pytest.fixture
+def index(make_tree):
+    index = SymbolIndex(make_tree(SOURCES))
+    assert index.refresh()
+    return index
+
+
+def names(results):
+    return [symbol.qualname for symbol, _ in results]
+
+
+def test_symbols_are_extracted_with_qualified_names(index):
+    path = os.path.join(index.root_path, 'pkg', 'widgets.py')
+    symbols = {symbol.qualname: symbol for symbol in index.entries[path][3]}
+    assert symbols['Widget'].kind == 'class'
+    assert symbols['Widget.render'].kind == 'method'
+    assert symbols['Widget.render.<locals>.helper'].kind == 'function'
+    assert (symbols['WidgetFactory'].line, symbols['WidgetFactory'].column) == (8, 0)
+    assert symbols['os'].kind == 'import'
+
+
+def test_files_with_syntax_errors_have_no_symbols(index):
+    assert index.entries[os.path.join(index.root_path, 'broken.py')][3] == []
+
+
+def test_find_ranks_exact_and_prefix_matches_first(index):
+    assert names(index.find("widget")) == ['Widget', 'pkg.widgets', 'WidgetFactory']
+    assert names(index.find("wf")) == ['WidgetFactory']
+    assert 'pkg.widgets' in names(index.find("widgets"))
+    assert index.find("zzz") == []
+
+
+def test_fuzzy_score_prefers_word_boundaries():
+    assert fuzzy_score("render", "render") > fuzzy_score("render", "render_all") > fuzzy_score("render", "prerender")
+    assert fuzzy_score("rdr", "render") is not None
+    assert fuzzy_score("xyz", "render") is None
+
+
+def test_definitions_follow_imports(index):
+    app = os.path.join(index.root_path, 'app.py')
+    [(symbol, path)] = index.definitions('Widget', app)
+    assert (symbol.qualname, os.path.basename(path)) == ('Widget', 'widgets.py')
+    [(symbol, path)] = index.definitions('Factory', app)
+    assert symbol.qualname == 'WidgetFactory'
+    [(symbol, path)] = index.definitions('main', app)
+    assert path == app
+
+
+def test_definitions_without_context_search_the_project(index):
+    assert names(index.definitions('render')) == ['Widget.render']
+    assert index.definitions('missing') == []
+
+
+def test_update_file_reindexes_a_saved_file(index):
+    path = os.path.join(index.root_path, 'app.py')
+    with open(path, 'a') as f:
+        f.write("\nclass Application:\n    pass\n")
+    index.update_file(path)
+    assert names(index.find("application")) == ['Application']
+
+
+def test_unchanged_content_is_not_parsed_again(index, monkeypatch):
+    index.save()
+    path = os.path.join(index.root_path, 'app.py')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    parsed = []
+    extract = symbol_index.extract_symbols
+    monkeypatch.setattr(symbol_index, 'extract_symbols', lambda tree: parsed.append(tree) or extract(tree))
+    reloaded = SymbolIndex(index.root_path)
+    reloaded.refresh()
+    assert parsed == []
+    assert names(reloaded.find("main")) == ['main']
+
+
+def test_parallel_refresh_matches_serial_refresh(make_tree, index, monkeypatch):
+    monkeypatch.setattr(symbol_index, 'PROCESS_THRESHOLD', 1)
+    monkeypatch.setattr(symbol_index, 'PARSE_BATCH', 1)
+    parallel = SymbolIndex(make_tree(SOURCES, name="copy"))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parallel.refresh(executor)
+    assert names(parallel.find("")) and sorted(names(parallel.find(""))) == sorted(names(index.find("")))
@@ -0,0 +1,209 @@
+import os
+import time
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+pytest.importorskip("PyQt5.QtWidgets")
+
+from PyQt5.QtCore import QObject, QThread, QTimer, QEventLoop
+from PyQt5.QtWidgets import QApplication
+
+import Py_Project_Explorer as explorer
+from engine import Engine
+from ignore_rules import shared_rules
+
+TIMEOUT_MS = 30000
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+@pytest.fixture
+def engine(make_tree):
+    return Engine(make_tree({
+        'app.py': "import os\n\n\ndef load_config():\n    return {'config': True}\n",
+        'notes.md': "The config lives in app.py\n",
+    }))
+
+
+@pytest.fixture
+def window(qapp):
+    window = explorer.PythonProjectExplorer()
+    yield window
+    window.close()
+
+
+def wait_until(qapp, condition):
+    deadline = time.monotonic() + TIMEOUT_MS / 1000
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        qapp.processEvents()
+
+
+class Recorder(QObject):
+    """Receives a worker's signals on the GUI thread, as the window's slots do."""
+
+    def __init__(self):
+        super().__init__()
+        self.items = []
+        self.result = None
+        self.loop = QEventLoop()
+
+    def add(self, *args):
+        self.items.append(args)
+
+    def done(self, *args):
+        self.result = args
+        self.loop.quit()
+
+
+def run_worker(worker, start, finished, stream=None):
+    """Runs `start` on a QThread wired like the window does; returns (streamed args, finished args).
+
+    The worker deletes itself once finished, so the slots cannot rely on sender().
+    """
+    recorder = Recorder()
+    thread = QThread()
+    worker.moveToThread(thread)
+    thread.started.connect(start)
+    if stream is not None:
+        stream.connect(recorder.add)
+    finished.connect(recorder.done)
+    finished.connect(worker.deleteLater)
+    QTimer.singleShot(TIMEOUT_MS, recorder.loop.quit)
+    thread.start()
+    recorder.loop.exec_()
+    # Called directly: a quit queued to this thread would only arrive after wait() returned
+    thread.quit()
+    assert thread.wait(TIMEOUT_MS), "the worker thread did not stop"
+    assert recorder.result is not None, "the worker did not finish"
+    return recorder.items, recorder.result
+
+
+def test_search_worker_streams_matches(qapp, engine, executor):
+    worker = explorer.SearchWorker(engine, "config", 7, executor)
+    batches, result = run_worker(worker, worker.run, worker.finished, worker.matches_found)
+    assert result == (7,)
+    assert {generation for generation, _ in batches} == {7}
+    assert sorted(os.path.basename(path) for _, batch in batches for path in batch) == ['app.py', 'notes.md']
+
+
+def test_find_worker_streams_hits(qapp, engine, executor):
+    worker = explorer.FindWorker(engine, "config", (False, False, True), 3, executor)
+    batches, result = run_worker(worker, worker.run, worker.finished, worker.hits_found)
+    assert result == (3, "")
+    assert sum(len(batch) for _, batch in batches) == 2
+
+
+def test_find_worker_reports_invalid_regex(qapp, engine, executor):
+    worker = explorer.FindWorker(engine, "(", (True, False, False), 4, executor)
+    _, (generation, error) = run_worker(worker, worker.run, worker.finished)
+    assert generation == 4 and error
+
+
+def test_symbol_worker_refreshes_the_index(qapp, engine):
+    worker = explorer.SymbolWorker(engine, None)
+    _, result = run_worker(worker, worker.run, worker.finished)
+    assert result == (engine, "")
+    assert [symbol.name for symbol, _ in engine.find_symbols("load_config")] == ['load_config']
+
+
+def test_stats_worker_returns_a_summary(qapp, engine, executor):
+    worker = explorer.StatsWorker(engine, executor, 5)
+    _, (finished_engine, summary, error) = run_worker(worker, worker.run, worker.finished)
+    assert finished_engine is engine and error == ""
+    assert summary['files'] == 2
+
+
+def test_file_load_worker_reads_files(qapp, engine):
+    worker = explorer.FileLoadWorker()
+    recorder = Recorder()
+    worker.loaded.connect(recorder.done)
+    path = os.path.join(engine.root_path, 'notes.md')
+    worker.load(1, path)
+    request_id, loaded_path, (content, _), error = recorder.result
+    assert (request_id, loaded_path, content, error) == (1, path, "The config lives in app.py\n", "")
+    worker.load(2, path + ".missing")
+    assert recorder.result[2] is None and recorder.result[3]
+
+
+def test_markdown_worker_skips_superseded_requests(qapp):
+    worker = explorer.MarkdownRenderWorker()
+    recorder = Recorder()
+    worker.rendered.connect(recorder.done)
+    worker.latest_request = 2
+    worker.render(1, "old", "# Old\n")
+    assert recorder.result is None
+    worker.render(2, "new", "# One\ntext\n\n# Two\n")
+    request_id, key, sections = recorder.result
+    assert (request_id, key) == (2, "new") and sections
+
+
+def test_saving_while_a_file_loads_keeps_both_files(qapp, window, engine):
+    first, second = (os.path.join(engine.root_path, name) for name in ('app.py', 'notes.md'))
+    window.load_file_content(first)
+    wait_until(qapp, lambda: window.current_document is not None)
+    # The second file misses the cache, so the first stays in the editor until it is read
+    window.current_file_path = second
+    window.load_file_content(second)
+    window.save_file()
+    with open(second) as f:
+        assert f.read() == "The config lives in app.py\n"
+    wait_until(qapp, lambda: window.current_document.path == second)
+    window.editor.setPlainText("edited\n")
+    window.save_file()
+    with open(second) as f:
+        assert f.read() == "edited\n"
+    with open(first) as f:
+        assert f.read().startswith("import os")
+
+
+@pytest.mark.skipif(importlib.util.find_spec('flake8') is None, reason="flake8 is not installed")
+def test_lint_worker_streams_results(qapp, engine, executor):
+    worker = explorer.LintWorker(engine.lint_service(), None, 2, executor)
+    linted, result = run_worker(worker, worker.run, worker.finished, worker.file_linted)
+    assert result == (2, 1, "")
+    [(generation, path, problems)] = linted
+    assert generation == 2 and [problem.code for problem in problems] == ['F401']
+
+
+def test_job_worker_reports_progress_and_result(qapp):
+    def job(report, cancelled):
+        for done in range(1, 4):
+            report(done, 3, f"step {done}")
+        return "done"
+
+    worker = explorer.JobWorker(5, job)
+    progress, result = run_worker(worker, worker.run, worker.finished, worker.progress)
+    assert result == (5, "done", "")
+    assert progress[-1] == (5, 1.0, "step 3")
+
+
+def test_job_worker_reports_failures(qapp):
+    def job(report, cancelled):
+        raise ValueError("boom")
+
+    worker = explorer.JobWorker(6, job)
+    _, result = run_worker(worker, worker.run, worker.finished)
+    assert result == (6, None, "boom")
+
+
+def test_tree_follows_ignore_file_edits(qapp, window, engine):
+    window.set_tree_root(engine.root_path)
+    gitignore = os.path.join(engine.root_path, '.gitignore')
+    with open(gitignore, 'w') as f:
+        f.write("*.md\n")
+    window.refresh_ignore_rules()
+    assert window.proxy.ignore_rules is shared_rules(engine.root_path)
+    assert window.proxy.ignore_rules.is_ignored(os.path.join(engine.root_path, 'notes.md'), False)